@@ -0,0 +1,255 @@
+# Бенчмарки AddressBook і NotesBook на синтетичних даних.
+# Запуск: python -m personal_assistant.bench [--sizes 1000 100000 1000000]
+import argparse
+from datetime import date, datetime
+from itertools import islice
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+try:
+    import numpy as np
+except ImportError:  # без NumPy стовпці днів народження не міряються
+    np = None
+
+from personal_assistant.main import (
+    PARALLEL_MIN,
+    AddressBook,
+    NotesBook,
+    Record,
+    load_data,
+    load_notes,
+    save_data,
+    save_notes,
+)
+
+
+DEFAULT_SIZES = (1_000, 100_000, 1_000_000)
+FIRST_NAMES = ("Ivan", "Olena", "Petro", "Anna", "Andrii", "Oksana", "Taras", "Iryna", "Maksym", "Sofiia")
+LAST_NAMES = ("Shevchenko", "Kovalenko", "Bondarenko", "Tkachenko", "Kravchenko", "Melnyk", "Boiko", "Koval")
+STREETS = ("Khreshchatyk", "Shevchenka", "Franka", "Lesi Ukrainky", "Sadova", "Zelena", "Naberezhna")
+CITIES = ("Kyiv", "Lviv", "Odesa", "Kharkiv", "Dnipro", "Poltava")
+DOMAINS = ("gmail.com", "ukr.net", "i.ua", "example.com")
+WORDS = (
+    "meeting", "project", "budget", "report", "call", "deadline", "idea", "review", "plan", "travel",
+    "invoice", "client", "design", "release", "bug", "family", "doctor", "birthday", "gift", "shopping",
+)
+TAGS = ("work", "home", "urgent", "done", "idea", "todo", "later", "travel", "finance", "health")
+
+
+def generate_contacts(count, seed=1):
+    rnd = random.Random(seed)
+    start = date(1950, 1, 1).toordinal()
+    span = date(2010, 12, 31).toordinal() - start
+    for i in range(count):
+        name = f"{rnd.choice(FIRST_NAMES)}{rnd.choice(LAST_NAMES)}{i}"
+        phones = [f"0{rnd.randrange(10**9):09d}" for _ in range(rnd.randint(0, 2))]
+        birthday = start + rnd.randrange(span) if rnd.random() < 0.8 else None
+        address = f"{rnd.choice(CITIES)}, {rnd.choice(STREETS)} {rnd.randint(1, 200)}" if rnd.random() < 0.6 else None
+        emails = [f"{name.lower()}@{rnd.choice(DOMAINS)}"] if rnd.random() < 0.7 else []
+        yield Record.from_values(name, phones, birthday, address, emails)
+
+
+def generate_notes(count, seed=2):
+    rnd = random.Random(seed)
+    for _ in range(count):
+        title = " ".join(rnd.choices(WORDS, k=rnd.randint(1, 3)))
+        content = " ".join(rnd.choices(WORDS, k=rnd.randint(5, 40)))
+        tags = rnd.sample(TAGS, rnd.randint(0, 3))
+        yield title, content, tags
+
+
+def build_book(count):
+    book = AddressBook()
+    book._cache.maxsize = 0  # міряємо самі запити, а не кеш результатів
+    book.add_records(enumerate(generate_contacts(count), 1))
+    return book
+
+
+def build_notes(count):
+    notes = NotesBook()
+    notes._cache.maxsize = 0
+    for title, content, tags in generate_notes(count):
+        key = notes.add_note(title, content)
+        for tag in tags:
+            notes.data[key].add_tag(tag)
+    return notes
+
+
+def resave(save, book, filename):
+    # save_snapshot не переписує незмінену книгу: без цього працював би лише перший запис
+    book.generation += 1
+    save(book, filename)
+
+
+def measure(op, size, func, repeat):
+    latencies = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        latencies.append(time.perf_counter() - started)
+    latencies.sort()
+    total = sum(latencies)
+
+    # пікова пам'ять — окремим запуском, бо tracemalloc сповільнює виклик
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "op": op,
+        "size": size,
+        "repeat": repeat,
+        "mean_ms": total / repeat * 1000,
+        "p50_ms": latencies[len(latencies) // 2] * 1000,
+        "p95_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000,
+        "ops_per_sec": repeat / total if total else float("inf"),
+        "peak_kb": peak / 1024,
+    }
+
+
+def run_size(size, repeat, workdir):
+    results = []
+    # побудова книги — одна операція на весь розмір, тому repeat=1
+    # і пропускна здатність рахується у записах за секунду
+    started = time.perf_counter()
+    book = build_book(size)
+    elapsed = time.perf_counter() - started
+    results.append({
+        "op": "AddressBook.add_record", "size": size, "repeat": size,
+        "mean_ms": elapsed / size * 1000, "p50_ms": None, "p95_ms": None,
+        "ops_per_sec": size / elapsed, "peak_kb": None,
+    })
+    started = time.perf_counter()
+    notes = build_notes(size)
+    elapsed = time.perf_counter() - started
+    results.append({
+        "op": "NotesBook.add_note", "size": size, "repeat": size,
+        "mean_ms": elapsed / size * 1000, "p50_ms": None, "p95_ms": None,
+        "ops_per_sec": size / elapsed, "peak_kb": None,
+    })
+
+    rnd = random.Random(3)
+    names = rnd.sample(list(book.data), min(len(book.data), 100))
+    results.append(measure("AddressBook.find", size, lambda: [book.find(n) for n in names], repeat))
+    results.append(measure("AddressBook.search", size, lambda: book.search("olena kyiv"), repeat))
+    results.append(measure("AddressBook.get_upcoming_birthdays", size, book.get_upcoming_birthdays, repeat))
+    results.append(measure("AddressBook.get_upcoming_birthdays(30)", size, lambda: book.get_upcoming_birthdays(30), repeat))
+    # назви з переставленими сусідніми літерами; індекс імен будується при першому виклику
+    typos = [n[:2] + n[3] + n[2] + n[4:] for n in names[:20]]
+    book.find_closest(typos[0])
+    results.append(measure("AddressBook.find_closest", size, lambda: [book.find_closest(t) for t in typos], repeat))
+    if np is not None:
+        today = date.today()
+        book.birthday_columns()  # стовпці будуються при першому виклику
+        results.append(measure("BirthdayColumns.window(365)", size, lambda: book.birthday_columns().window(today, 365), repeat))
+        results.append(measure("BirthdayColumns.month_histogram", size, lambda: book.birthday_columns().month_histogram(), repeat))
+        results.append(measure("BirthdayColumns.age_histogram", size, lambda: book.birthday_columns().age_histogram(today), repeat))
+    prefixes = [n[:3] for n in names[:20]]
+    results.append(measure("AddressBook.complete_names", size, lambda: [book.complete_names(p) for p in prefixes], repeat))
+    results.append(measure("AddressBook.find_duplicates", size, book.find_duplicates, max(1, repeat // 10)))
+
+    results.append(measure("NotesBook.search", size, lambda: notes.search("deadline"), repeat))
+    notes._cache.maxsize = 1
+    results.append(measure("NotesBook.search (cached)", size, lambda: notes.search("deadline"), repeat))
+    notes._cache.maxsize = 0
+    notes.rank("deadline")  # індекс BM25 будується при першому виклику
+    results.append(measure("NotesBook.rank", size, lambda: notes.rank("deadline budget"), repeat))
+    results.append(measure("NotesBook.search_by_tags", size, lambda: notes.search_by_tags(["urgent", "finance"]), repeat))
+    results.append(measure("NotesBook.filter_by_tags", size, lambda: notes.filter_by_tags(["+work", "urgent", "-done"]), repeat))
+    results.append(measure("NotesBook.all_notes", size, notes.all_notes, max(1, repeat // 5)))
+    results.append(measure(
+        "NotesBook.by_time (10 recent)", size,
+        lambda: list(islice(notes.by_time(field="modified", newest_first=True), 10)), repeat,
+    ))
+    workers = os.cpu_count() or 1
+    if workers > 1 and size >= PARALLEL_MIN:
+        notes.enable_parallel(workers)
+        results.append(measure(f"NotesBook.search ({workers} workers)", size, lambda: notes.search("deadline"), repeat))
+        results.append(measure(f"NotesBook.search_by_tags ({workers} workers)", size, lambda: notes.search_by_tags(["urgent", "finance"]), repeat))
+        notes.close_parallel()
+
+    book_file = os.path.join(workdir, f"addressbook-{size}.pkl")
+    notes_file = os.path.join(workdir, f"notes-{size}.pkl")
+    io_repeat = max(1, repeat // 10)
+    results.append(measure("save_data", size, lambda: resave(save_data, book, book_file), io_repeat))
+    results.append(measure("load_data", size, lambda: load_data(book_file), io_repeat))
+    results.append(measure("save_notes", size, lambda: resave(save_notes, notes, notes_file), io_repeat))
+    results.append(measure("load_notes", size, lambda: load_notes(notes_file), io_repeat))
+
+    # бінарний знімок: завантаження лише читає заголовок, запис декодується при зверненні
+    book_snap = os.path.join(workdir, f"addressbook-{size}.snap")
+    notes_snap = os.path.join(workdir, f"notes-{size}.snap")
+    results.append(measure("save_data (.snap)", size, lambda: resave(save_data, book, book_snap), io_repeat))
+    results.append(measure("load_data (.snap) + find", size, lambda: load_data(book_snap).find(names[0]), repeat))
+    results.append(measure("save_notes (.snap)", size, lambda: resave(save_notes, notes, notes_snap), io_repeat))
+    results.append(measure("load_notes (.snap) + get", size, lambda: load_notes(notes_snap).data.get("1"), repeat))
+    return results
+
+
+def _fmt(value, digits=3):
+    return "-" if value is None else f"{value:.{digits}f}"
+
+
+def print_results(results, baseline=None):
+    previous = {(r["op"], r["size"]): r for r in baseline["results"]} if baseline else {}
+    header = f"{'size':>9}  {'operation':<40} {'mean ms':>10} {'p50 ms':>10} {'p95 ms':>10} {'ops/s':>12} {'peak KB':>10}"
+    if previous:
+        header += f" {'vs base':>8}"
+    print(header)
+    for r in results:
+        line = (
+            f"{r['size']:>9}  {r['op']:<40} {_fmt(r['mean_ms']):>10} {_fmt(r['p50_ms']):>10} "
+            f"{_fmt(r['p95_ms']):>10} {_fmt(r['ops_per_sec'], 1):>12} {_fmt(r['peak_kb'], 1):>10}"
+        )
+        old = previous.get((r["op"], r["size"]))
+        if old:
+            line += f" {r['mean_ms'] / old['mean_ms']:>7.2f}x"
+        print(line)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m personal_assistant.bench",
+        description="Benchmark AddressBook and NotesBook operations on synthetic data.",
+    )
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES), help="book sizes to test")
+    parser.add_argument("--repeat", type=int, default=20, help="timed calls per query operation")
+    parser.add_argument("--output", metavar="FILE", help="write JSON results to FILE")
+    parser.add_argument("--compare", metavar="FILE", help="show ratios against a previous JSON result")
+    options = parser.parse_args(argv)
+
+    baseline = None
+    if options.compare:
+        with open(options.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for size in options.sizes:
+            print(f"Running size {size}...", file=sys.stderr)
+            results += run_size(size, options.repeat, workdir)
+
+    print_results(results, baseline)
+
+    if options.output:
+        report = {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "sizes": options.sizes,
+            "repeat": options.repeat,
+            "results": results,
+        }
+        with open(options.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
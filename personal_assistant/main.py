@@ -1,10 +1,50 @@
-from collections import UserDict
-from datetime import datetime, timedelta
+import argparse
+import asyncio
+from bisect import bisect_left, bisect_right, insort
+from collections import Counter, OrderedDict, UserDict
+from collections.abc import Mapping, MutableMapping
+from concurrent.futures import ProcessPoolExecutor
+from contextvars import ContextVar
+import csv
+from datetime import date, datetime, timedelta
+from functools import wraps
+from heapq import merge, nlargest
+from itertools import combinations, groupby, islice
+import json
+import math
+import mmap
+import os
 import pickle
 import re
+import socket
+import sqlite3
+import struct
+import sys
+import threading
+import time
+import tracemalloc
+from types import GeneratorType
+from urllib.parse import quote, unquote
+from weakref import WeakValueDictionary
 
 from colorama import init, Fore, Style
 
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+try:
+    import readline
+except ImportError:  # Windows без pyreadline
+    readline = None
+
+try:
+    import numpy as np
+except ImportError:  # необов'язкова залежність: лише для звітів по днях народження
+    np = None
+
 
 # ІНІЦІАЛІЗАЦІЯ COLORAMA (ОБОВ'ЯЗКОВО!)
 init(autoreset=True)
@@ -17,33 +57,280 @@ C_INFO = Fore.CYAN
 C_BRIGHT = Style.BRIGHT
 C_RESET = Style.RESET_ALL
 
+# ==================== СТАТИСТИКА ====================
+# Кількість викликів, гістограма затримок, помилки за типом і (за бажанням)
+# приріст пам'яті за tracemalloc для кожної команди та load/save.
+
+HIST_BASE = 2 ** 0.125  # крок гістограми ~9%
+
+
+class OpStats:
+    def __init__(self):
+        self.calls = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.max_size = None   # розмір книги під час найповільнішого виклику
+        self.buckets = {}      # номер кошика -> кількість викликів
+        self.errors = {}       # тип винятку -> кількість
+        self.alloc_total = 0
+        self.alloc_max = 0
+
+    def add(self, seconds, alloc=None):
+        self.calls += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        us = max(seconds * 1e6, 1.0)
+        bucket = math.ceil(math.log(us, HIST_BASE))
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+        if alloc is not None:
+            self.alloc_total += alloc
+            self.alloc_max = max(self.alloc_max, alloc)
+
+    def error(self, exc):
+        name = type(exc).__name__
+        self.errors[name] = self.errors.get(name, 0) + 1
+
+    def percentile(self, p):
+        # верхня межа кошика, в який потрапляє p-й перцентиль, у мс
+        if not self.calls:
+            return 0.0
+        rank = p / 100 * self.calls
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= rank:
+                return min(HIST_BASE ** bucket / 1000, self.max * 1000)
+        return self.max * 1000
+
+    def to_dict(self):
+        return {
+            "calls": self.calls,
+            "errors": dict(self.errors),
+            "mean_ms": self.total / self.calls * 1000 if self.calls else 0.0,
+            "p50_ms": self.percentile(50),
+            "p95_ms": self.percentile(95),
+            "p99_ms": self.percentile(99),
+            "max_ms": self.max * 1000,
+            "size_at_max": self.max_size,
+            "alloc_mean_kb": self.alloc_total / self.calls / 1024 if self.calls else 0.0,
+            "alloc_max_kb": self.alloc_max / 1024,
+        }
+
+
+class Stats:
+    def __init__(self):
+        self.ops = {}
+        self.started = datetime.now()
+        self.trace_alloc = False
+
+    def enable_alloc_tracing(self):
+        self.trace_alloc = True
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def call(self, name, func, *args, size=None, **kwargs):
+        op = self.ops.get(name)
+        if op is None:
+            op = self.ops[name] = OpStats()
+        token = _current_op.set(op)
+        alloc = tracemalloc.get_traced_memory()[0] if self.trace_alloc else None
+        started = time.perf_counter()
+        streaming = False
+        try:
+            result = func(*args, **kwargs)
+            if isinstance(result, GeneratorType):
+                streaming = True
+                return self._stream(op, result, time.perf_counter() - started, alloc, size)
+            return result
+        except Exception as e:
+            op.error(e)
+            raise
+        finally:
+            _current_op.reset(token)
+            if not streaming:
+                self._finish(op, time.perf_counter() - started, alloc, size)
+
+    def _stream(self, op, lines, elapsed, alloc, size):
+        # Потоковий вивід: до часу команди додається час отримання кожного рядка
+        # (без часу, який витрачає на рядок той, хто його друкує)
+        try:
+            while True:
+                token = _current_op.set(op)
+                started = time.perf_counter()
+                try:
+                    line = next(lines)
+                except StopIteration:
+                    return
+                except Exception as e:
+                    op.error(e)
+                    raise
+                finally:
+                    elapsed += time.perf_counter() - started
+                    _current_op.reset(token)
+                yield line
+        finally:
+            self._finish(op, elapsed, alloc, size)
+
+    def _finish(self, op, elapsed, alloc, size):
+        if alloc is not None:
+            alloc = tracemalloc.get_traced_memory()[0] - alloc
+        if elapsed > op.max and size is not None:
+            op.max_size = size()
+        op.add(elapsed, alloc)
+
+    def to_dict(self):
+        return {
+            "started": self.started.isoformat(timespec="seconds"),
+            "trace_alloc": self.trace_alloc,
+            "ops": {name: op.to_dict() for name, op in sorted(self.ops.items())},
+        }
+
+    def dump(self, filename):
+        with open(filename, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2, ensure_ascii=False)
+
+
+STATS = Stats()
+_current_op = ContextVar("current_op", default=None)
+
+
+def instrumented(func):
+    @wraps(func)
+    def inner(*args, **kwargs):
+        return STATS.call(func.__name__, func, *args, **kwargs)
+    return inner
+
+
+def _note_error(exc):
+    # input_error перетворює виняток на рядок, але в статистиці він має лишитися
+    op = _current_op.get()
+    if op is not None:
+        op.error(exc)
+
+
+def _error_message(exc):
+    _note_error(exc)
+    if isinstance(exc, ValueError):
+        return str(exc)
+    if isinstance(exc, KeyError):
+        return "Contact not found."
+    if isinstance(exc, IndexError):
+        return "Not enough arguments."
+    return f"Error: {str(exc)}"
+
+
+def _guarded(lines):
+    # помилка посеред потокового виводу стає його останнім рядком
+    try:
+        yield from lines
+    except Exception as e:
+        yield _error_message(e)
+
+
 def input_error(func):
     def inner(*args, **kwargs):
         try:
-            return func(*args, **kwargs)
-        except ValueError as e:
-            return str(e)
-        except KeyError:
-            return "Contact not found."
-        except IndexError:
-            return "Not enough arguments."
+            result = func(*args, **kwargs)
         except Exception as e:
-            return f"Error: {str(e)}"
+            return _error_message(e)
+        if isinstance(result, GeneratorType):
+            return _guarded(result)
+        return result
+    return inner
+
+
+# ==================== КЕШ ЗАПИТІВ ====================
+CACHE_SIZE = 128  # скільки останніх результатів пам'ятає кожна книга
+
+
+class QueryCache:
+    # LRU-кеш результатів запитів до книги. Кеш пам'ятає generation книги,
+    # для якого пораховано результати; після будь-якої зміни він очищується,
+    # тож застарілий результат повернутись не може.
+
+    def __init__(self, maxsize=CACHE_SIZE):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.generation = None
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, generation, key, compute):
+        if generation != self.generation:
+            self.entries.clear()
+            self.generation = generation
+        try:
+            value = self.entries[key]
+        except KeyError:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return value
+        value = compute()
+        if self.maxsize > 0:
+            self.entries[key] = value
+            if len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+        return value
+
+
+def cached(method):
+    # Результат методу книги кешується за (назва, аргументи); списки
+    # в аргументах перетворюються на кортежі. Результат спільний для всіх
+    # викликів, тож змінювати його не можна.
+    @wraps(method)
+    def inner(self, *args):
+        key = (method.__name__, *(tuple(a) if isinstance(a, list) else a for a in args))
+        return self._cache.get(self.generation, key, lambda: method(self, *args))
     return inner
 
+
+def _restore_slots(obj, state):
+    # pickle старих версій зберігав __dict__, нових — словник слотів
+    if isinstance(state, tuple):
+        state = {**(state[0] or {}), **(state[1] or {})}
+    for name, value in state.items():
+        setattr(obj, name, value)
+
+
+# Дати зберігаємо цілими числами: день народження — як ordinal,
+# час створення нотатки — як секунди від 1970-01-01 (без часового поясу)
+EPOCH = datetime(1970, 1, 1)
+NOTE_TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def to_timestamp(dt):
+    return int((dt - EPOCH).total_seconds())
+
+
+def from_timestamp(ts):
+    return EPOCH + timedelta(seconds=ts)
+
+
 class Field:
+    __slots__ = ("value",)
+
     def __init__(self, value):
         self.value = value
 
     def __str__(self):
         return str(self.value)
 
+    def __getstate__(self):
+        return {"value": self.value}
+
+    def __setstate__(self, state):
+        _restore_slots(self, state)
+
 
 class Name(Field):
-    pass
+    __slots__ = ()
 
 
 class Phone(Field):
+    __slots__ = ()
+
     def __init__(self, value):
         if not value.isdigit() or len(value) != 10:
             raise ValueError("Phone must be 10 digits.")
@@ -51,24 +338,36 @@ class Phone(Field):
 
 
 class Birthday(Field):
-    def __init__(self, value):
+    __slots__ = ("ordinal",)
+
+    @property
+    def value(self):
+        d = date.fromordinal(self.ordinal)
+        return f"{d.day:02d}.{d.month:02d}.{d.year:04d}"
+
+    @value.setter
+    def value(self, value):
         try:
-            datetime.strptime(value, "%d.%m.%Y")
+            self.ordinal = datetime.strptime(value, "%d.%m.%Y").toordinal()
         except ValueError:
             raise ValueError("Invalid date format. Use DD.MM.YYYY")
-        super().__init__(value)
 
     def to_date(self):
-        day, month, year = map(int, self.value.split('.'))
-        return datetime(year, month, day).date()
+        return date.fromordinal(self.ordinal)
+
+    def __getstate__(self):
+        return {"ordinal": self.ordinal}
     
 class Address(Field):
+    __slots__ = ()
+
     def __init__(self, value):
         if not value.strip():
             raise ValueError("Address cannot be empty.")
         super().__init__(value.strip())
 
 class Email(Field):
+    __slots__ = ()
     regex = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
     
     def __init__(self, value):
@@ -78,290 +377,2130 @@ class Email(Field):
             raise ValueError("Invalid email format.")
         super().__init__(value.strip().lower())
 
+def _field(cls, value):
+    # Об'єкт поля для вже перевіреного значення, без повторної валідації
+    field = object.__new__(cls)
+    field.value = value
+    return field
+
+
+def _birthday_field(ordinal):
+    field = object.__new__(Birthday)
+    field.ordinal = ordinal
+    return field
+
+
+PHONE_LEN = 10
+
+
 class Record:
+    # Запис зберігає "сирі" значення: телефони одним рядком по PHONE_LEN цифр,
+    # день народження як ordinal, email кортежем рядків. Об'єкти Field
+    # створюються лише при зверненні до name/phones/birthday/address/emails.
+    __slots__ = ("_name", "_phones", "_birthday", "_address", "_emails", "_book", "__weakref__")
+
     def __init__(self, name):
-        self.name = Name(name)
-        self.phones = []
-        self.birthday = None
-        self.address = None        # Нове поле
-        self.emails = []           # Нове поле (можна кілька)
+        self._name = Name(name).value
+        self._phones = ""
+        self._birthday = None
+        self._address = None       # Нове поле
+        self._emails = ()          # Нове поле (можна кілька)
+        self._book = None          # AddressBook, якому належить запис (для оновлення індексів)
+
+    @classmethod
+    def from_values(cls, name, phones=(), birthday=None, address=None, emails=()):
+        # Для вже перевірених даних (імпорт): birthday — ordinal дати
+        record = cls(name)
+        record._phones = "".join(phones)
+        record._birthday = birthday
+        record._address = address
+        record._emails = tuple(emails)
+        return record
+
+    @property
+    def name(self):
+        return _field(Name, self._name)
+
+    @property
+    def phones(self):
+        p = self._phones
+        return tuple(_field(Phone, p[i:i + PHONE_LEN]) for i in range(0, len(p), PHONE_LEN))
+
+    @property
+    def birthday(self):
+        return None if self._birthday is None else _birthday_field(self._birthday)
+
+    @property
+    def address(self):
+        return None if self._address is None else _field(Address, self._address)
+
+    @property
+    def emails(self):
+        return tuple(_field(Email, e) for e in self._emails)
+
+    def __getstate__(self):
+        return {
+            "_name": self._name,
+            "_phones": self._phones,
+            "_birthday": self._birthday,
+            "_address": self._address,
+            "_emails": self._emails,
+        }
+
+    def __setstate__(self, state):
+        if isinstance(state, tuple):
+            state = {**(state[0] or {}), **(state[1] or {})}
+        if "name" in state:
+            # pickle старого формату: об'єкти Field у __dict__
+            birthday = state.get("birthday")
+            address = state.get("address")
+            state = {
+                "_name": state["name"].value,
+                "_phones": "".join(p.value for p in state.get("phones", ())),
+                "_birthday": birthday.ordinal if birthday else None,
+                "_address": address.value if address else None,
+                "_emails": tuple(e.value for e in state.get("emails", ())),
+            }
+        _restore_slots(self, state)
+        self._book = None
+
+    def _notify(self, op, *args):
+        if self._book is not None:
+            self._book._record_changed(self, op, *args)
 
     def add_phone(self, phone):
-        self.phones.append(Phone(phone))
+        phone = Phone(phone)
+        if self._book is not None:
+            self._book._check_unique(self, phones=[phone.value])
+        self._phones += phone.value
+        self._notify("add_phone", phone.value)
 
     def edit_phone(self, old_phone, new_phone):
-        for i, p in enumerate(self.phones):
-            if p.value == old_phone:
-                self.phones[i] = Phone(new_phone)
+        for i in range(0, len(self._phones), PHONE_LEN):
+            if self._phones[i:i + PHONE_LEN] == old_phone:
+                phone = Phone(new_phone)
+                if self._book is not None:
+                    self._book._check_unique(self, phones=[phone.value])
+                self._phones = self._phones[:i] + phone.value + self._phones[i + PHONE_LEN:]
+                self._notify("edit_phone", old_phone, new_phone)
                 return
         raise ValueError("Old phone not found.")
 
     def add_birthday(self, birthday_str):
-        if self.birthday is not None:
+        if self._birthday is not None:
             raise ValueError("Birthday already set.")
-        self.birthday = Birthday(birthday_str)
+        birthday = Birthday(birthday_str)
+        self._birthday = birthday.ordinal
+        self._notify("add_birthday", birthday.value)
 
     # Нові методи
     def add_address(self, address_str):
-        if self.address is not None:
+        if self._address is not None:
             raise ValueError("Address already set.")
-        self.address = Address(address_str)
+        self._address = Address(address_str).value
+        self._notify("add_address", self._address)
 
     def add_email(self, email_str):
         email = Email(email_str)
-        if email in self.emails:
+        if email.value in self._emails:
             raise ValueError(f"Email {email.value} already exists.")
-        self.emails.append(email)
+        if self._book is not None:
+            self._book._check_unique(self, emails=[email.value])
+        self._emails += (email.value,)
+        self._notify("add_email", email.value)
 
     def __str__(self):
-        phones_str = '; '.join(p.value for p in self.phones) if self.phones else "none"
-        birthday_str = f", birthday: {self.birthday.value}" if self.birthday else ""
-        address_str = f", address: {self.address.value}" if self.address else ""
-        emails_str = f", emails: {'; '.join(e.value for e in self.emails)}" if self.emails else ""
-        return f"Contact name: {self.name.value}, phones: {phones_str}{birthday_str}{address_str}{emails_str}"
+        phones_str = '; '.join(p.value for p in self.phones) if self._phones else "none"
+        birthday_str = f", birthday: {self.birthday.value}" if self._birthday is not None else ""
+        address_str = f", address: {self._address}" if self._address is not None else ""
+        emails_str = f", emails: {'; '.join(self._emails)}" if self._emails else ""
+        return f"Contact name: {self._name}, phones: {phones_str}{birthday_str}{address_str}{emails_str}"
 
 
-class AddressBook(UserDict):
-    def add_record(self, record):
-        self.data[record.name.value.lower()] = record 
+def record_to_row(record):
+    return [
+        record.name.value,
+        [p.value for p in record.phones],
+        record.birthday.value if record.birthday else None,
+        record.address.value if record.address else None,
+        [e.value for e in record.emails],
+    ]
 
-    def find(self, name):
-        return self.data.get(name.lower())
 
-    def delete(self, name):
-        key = name.lower()
-        if key in self.data:
-            del self.data[key]
+def record_from_row(row):
+    name, phones, birthday, address, emails = row
+    record = Record(name)
+    for phone in phones:
+        record.add_phone(phone)
+    if birthday:
+        record.add_birthday(birthday)
+    if address:
+        record.add_address(address)
+    for email in emails:
+        record.add_email(email)
+    return record
 
-    def get_upcoming_birthdays(self):
-        today = datetime.today().date()
-        upcoming = []
-        for record in self.data.values():
-            if not record.birthday:
-                continue
-            bday = record.birthday.to_date()
-            bday_this_year = bday.replace(year=today.year)
-            if bday_this_year < today:
-                bday_this_year = bday_this_year.replace(year=today.year + 1)
-            delta = (bday_this_year - today).days
-            if 0 <= delta <= 7:
-                congrats_date = bday_this_year
-                if congrats_date.weekday() >= 5:  # Сб или Нд → понедельник
-                    days_to_monday = 7 - congrats_date.weekday()
-                    congrats_date += timedelta(days=days_to_monday)
-                upcoming.append({
-                    "name": record.name.value,
-                    "congratulation_date": congrats_date.strftime("%Y.%m.%d")
-                })
-        return upcoming
 
+def _remove_sorted(items, entry):
+    i = bisect_left(items, entry)
+    if i < len(items) and items[i] == entry:
+        del items[i]
 
-# >>> START OF NOTES MODULE =========================================
 
-class Note:
-    def __init__(self, title, content):
-        self.title = title.strip()
-        self.content = content.strip()
-        self.tags = []
-        self.created_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+COMPLETE_LIMIT = 100  # скільки варіантів автодоповнення повертати за раз
 
-    def add_tag(self, tag):
-        tag = tag.strip().lower()
-        if tag and tag not in self.tags:
-            self.tags.append(tag)
 
-    def remove_tag(self, tag):
-        tag = tag.strip().lower()
-        if tag in self.tags:
-            self.tags.remove(tag)
-            return True
-        return False
-            
-    def __str__(self):
-        tags_str = f", tags: #{', #'.join(self.tags)}" if self.tags else ""
-        return f"[{self.title}] {self.content} (created {self.created_at}){tags_str}"
+def _complete_sorted(items, prefix, limit=COMPLETE_LIMIT):
+    # Рядки відсортованого списку, що починаються з prefix: O(log n + limit)
+    i = bisect_left(items, prefix)
+    found = []
+    while i < len(items) and len(found) < limit and items[i].startswith(prefix):
+        found.append(items[i])
+        i += 1
+    return found
 
 
-class NotesBook(UserDict):
-    def __init__(self):
-        super().__init__()
-        self.next_id = 1
+def _id_ranges(prefix, max_id):
+    # Діапазони id, запис яких починається з prefix: [p, p+1), [10p, 10p+10), ...
+    if not prefix:
+        yield 1, max_id + 1
+        return
+    if not prefix.isdigit() or prefix.startswith("0"):
+        return
+    lo, hi = int(prefix), int(prefix) + 1
+    while lo <= max_id:
+        yield lo, hi
+        lo, hi = lo * 10, hi * 10
 
-    def add_note(self, title, content):
-        note = Note(title.strip(), content.strip())
-        key = str(self.next_id)
-        self.data[key] = note
-        self.next_id += 1
-        return key
 
-    def edit_note(self, key, new_content):
-        if key in self.data:
-            self.data[key].content = new_content.strip()
-        else:
-            raise KeyError("Note not found.")
+# Токени для пошуку контактів за префіксом (команда find)
+PHONE_SUFFIX_MIN = 4  # частину номера шукаємо від 4 цифр
 
-    def delete_note(self, key):
-        if key in self.data:
-            del self.data[key]
-        else:
-            raise KeyError("Note not found.")
 
-    def all_notes(self):
-        return [(key, note) for key, note in sorted(self.data.items())]
+def _words(text):
+    return re.findall(r"\w+", text.lower())
 
-    def search(self, query):
-        query_lower = query.lower()
-        results = []
-        for key, note in self.data.items():
-            title_matches = note.title.lower().count(query_lower)
-            content_matches = note.content.lower().count(query_lower)
-            tags_matches = sum(1 for tag in note.tags if query_lower in tag)
 
-            total_matches = title_matches + content_matches + tags_matches
-            if total_matches > 0:
-                results.append((total_matches, key, note))
+def _name_tokens(name):
+    return list({name.lower(), *_words(name)})
 
-        results.sort(reverse=True, key=lambda x: x[0])
-        return [(key, note) for _, key, note in results]
 
-    def search_by_tags(self, tags):
-        tags = {t.strip().lower() for t in tags}
-        results = []
-        for key, note in self.data.items():
-            note_tags = {t.lower() for t in note.tags}
-            matches = len(note_tags.intersection(tags))
-            if matches > 0:
-                results.append((matches, key, note))
-        results.sort(reverse=True)  # за кількістю збігів тегів
-        return [(key, note) for _, key, note in results]
+def _phone_tokens(phone):
+    # номер повністю (пошук за початком) і його "хвости" з позначкою "~"
+    # (пошук за будь-якою частиною номера від PHONE_SUFFIX_MIN цифр)
+    return [phone] + ["~" + phone[i:] for i in range(1, len(phone) - PHONE_SUFFIX_MIN + 1)]
 
 
-def save_notes(notes, filename="notes.pkl"):
-    with open(filename, "wb") as f:
-        pickle.dump(notes, f)
+def _email_tokens(email):
+    return [email, email.partition("@")[2]]
 
-def load_notes(filename="notes.pkl"):
-    try:
-        with open(filename, "rb") as f:
-            notes = pickle.load(f)
-        if notes.data:
-            notes.next_id = max(map(int, notes.data.keys())) + 1
-        else:
-            notes.next_id = 1
-        return notes
-    except FileNotFoundError:
-        return NotesBook()
 
+def _address_tokens(address):
+    return list(set(_words(address)))
 
-# ==================== CLI Commands ====================
 
-def add_note(args, notes):
-    if len(args) < 2:
-        return "Usage: add-note <title> <content>"
-    title = args[0]
-    content = ' '.join(args[1:])
-    key = notes.add_note(title, content)
-    return f"Note '{title}' added with id {key}."
+def _contact_tokens(record):
+    tokens = _name_tokens(record.name.value)
+    for phone in record.phones:
+        tokens += _phone_tokens(phone.value)
+    if record.address:
+        tokens += _address_tokens(record.address.value)
+    for email in record.emails:
+        tokens += _email_tokens(email.value)
+    return tokens
 
-def show_note(args, notes):
-    if len(args) != 1:
-        return "Usage: show-note <id>"
-    key = args[0]
-    if key in notes.data:
-        return f"{key}: {notes.data[key]}"
-    return "Note not found."
 
-def all_notes_func(args, notes):
-    result = notes.all_notes()
-    if not result:
-        return "No notes found."
-    return "\n".join([f"{key}: {note}" for key, note in result])
+# Пошук імені з помилками: одна помилка — перебір варіантів запиту,
+# дві — кандидати за триграмами з перевіркою відстанню редагування
+FUZZY_CANDIDATES = 20000  # скільки входжень у списки триграм рахувати на один запит (бюджет часу)
+FUZZY_ALPHABET = "abcdefghijklmnopqrstuvwxyz0123456789абвгґдеєжзиіїйклмнопрстуфхцчшщьюя'-"
 
-def edit_note(args, notes):
-    if len(args) < 2:
-        return "Usage: edit-note <id> <new content>"
-    key = args[0]
-    new_content = ' '.join(args[1:])
-    notes.edit_note(key, new_content)
-    return "Note edited."
 
-def delete_note(args, notes):
-    if len(args) != 1:
-        return "Usage: delete-note <id>"
-    key = args[0]
-    notes.delete_note(key)
-    return "Note deleted."
+def _name_grams(key):
+    padded = f"^{key}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
 
-def find_notes(args, notes):
-    if not args:
-        return "Usage: find-notes <text>"
-    query = ' '.join(args)
-    found = notes.search(query)
-    if not found:
-        return "No matches."
-    return "\n".join([f"{key}: {note}" for key, note in found])
 
-def add_tag(args, notes):
-    if len(args) < 2:
-        return "Usage: add-tag <id> <tag1> [tag2]..."
-    key = args[0]
-    tags = args[1:]
-    if key not in notes.data:
-        return "Note not found."
-    for tag in tags:
-        notes.data[key].add_tag(tag)
-    return f"Tags added to note {key}: {', '.join(tags)}"
+def _fuzzy_limit(name):
+    # допустима кількість помилок залежно від довжини імені
+    return 1 if len(name) < 10 else 2
 
-def find_by_tag(args, notes):
-    if len(args) != 1:
-        return "Usage: find-by-tag <tag>"
-    results = notes.search_by_tags(args)
-    if not results:
-        return "No notes found with this tag."
-    return "\n".join([f"{key}: {note}" for key, note in results])
 
-def remove_tag(args, notes):
-    if len(args) != 2:
-        return "Usage: remove-tag <id> <tag>"
-    key, tag_to_remove = args
-    if key not in notes.data:
-        return "Note not found."
-    note = notes.data[key]
-    if note.remove_tag(tag_to_remove):
-        return f"Tag '#{tag_to_remove}' removed from note {key}."
-    return f"Tag '#{tag_to_remove}' not found in note {key}."
+def _edits1(word):
+    # Усі рядки на відстані 1: пропущена, зайва, замінена чи переставлена літера
+    letters = set(FUZZY_ALPHABET) | set(word)
+    splits = [(word[:i], word[i:]) for i in range(len(word) + 1)]
+    edits = {a + b[1:] for a, b in splits if b}
+    edits.update(a + b[1] + b[0] + b[2:] for a, b in splits if len(b) > 1)
+    edits.update(a + c + b[1:] for a, b in splits if b for c in letters)
+    edits.update(a + c + b for a, b in splits for c in letters)
+    edits.discard(word)
+    return edits
 
 
-def search_notes(args, notes):
-    if not args:
-        return "Usage: search-notes <query>"
-    query = ' '.join(args)
-    results = notes.search(query)
-    if not results:
-        return f"No results for: '{query}'"
-    return "Search results:\n" + "\n".join(f"{k}: {n}" for k, n in results)
+def _edit_distance(a, b, limit):
+    # Відстань Дамерау-Левенштейна (з перестановкою сусідніх літер);
+    # рахуємо лише смугу |i - j| <= limit і повертаємо limit + 1,
+    # щойно стає зрозуміло, що відстань більша
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    big = limit + 1
+    before, prev = None, [j if j <= limit else big for j in range(len(b) + 1)]
+    for i, ca in enumerate(a, 1):
+        cur = [big] * (len(b) + 1)
+        if i <= limit:
+            cur[0] = i
+        for j in range(max(1, i - limit), min(len(b), i + limit) + 1):
+            cb = b[j - 1]
+            value = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (ca != cb))
+            if i > 1 and j > 1 and ca == b[j - 2] and a[i - 2] == cb:
+                value = min(value, before[j - 2] + 1)
+            cur[j] = value
+        if min(cur) > limit:
+            return big
+        before, prev = prev, cur
+    return min(prev[-1], big)
 
 
-def filter_notes_by_tag(args, notes):
-    if not args:
-        return "Usage: filter-notes-by-tag <tag1> [tag2] ..."
-    results = notes.search_by_tags(args)
-    if not results:
-        return f"No notes with tags: {', '.join('#' + t for t in args)}"
-    return "Found by tags:\n" + "\n".join(f"{k}: {n}" for k, n in results)
+class NameIndex:
+    # Множина ключів і триграма імені -> список ключів. Одна помилка змінює
+    # щонайбільше 4 триграми, тож при e помилках спільних лишається
+    # не менше len(триграм) - 4e, і кандидатів можна рахувати з найрідкісніших.
 
-# <<< END OF NOTES MODULE ===========================================
+    def __init__(self, keys=()):
+        self.keys = set()
+        self.grams = {}
+        for key in keys:
+            self.add(key)
 
-def parse_input(user_input):
-    parts = user_input.strip().split()
-    if not parts:
-        return "", []
-    return parts[0].lower(), parts[1:]
+    def add(self, key):
+        self.keys.add(key)
+        for gram in _name_grams(key):
+            self.grams.setdefault(gram, []).append(key)
 
+    def discard(self, key):
+        self.keys.discard(key)
+        for gram in _name_grams(key):
+            keys = self.grams.get(gram)
+            if keys is None:
+                continue
+            try:
+                keys.remove(key)
+            except ValueError:
+                continue
+            if not keys:
+                del self.grams[gram]
 
-@input_error  #Рішення: дозволити створювати контакт без телефону 
-def add_contact(args, book: AddressBook):   
-    if len(args) < 1:
+    def closest(self, name):
+        # Найближчі ключі (відстань, [ключі]) або None
+        query = name.lower()
+        found = sorted(word for word in _edits1(query) if word in self.keys)
+        if found:
+            return 1, found
+        limit = _fuzzy_limit(query)
+        grams = _name_grams(query)
+        need = len(grams) - 4 * limit
+        if limit < 2 or need < 1:
+            return None
+        # Рахуємо входження, починаючи з найкоротших списків. Якщо вже
+        # обов'язкові len - need + 1 списків не вміщаються в бюджет, ім'я
+        # надто поширене для пошуку з двома помилками.
+        postings = sorted((self.grams.get(gram, ()) for gram in grams), key=len)
+        if sum(map(len, postings[:len(grams) - need + 1])) > FUZZY_CANDIDATES:
+            return None
+        counts = Counter()
+        taken = total = 0
+        for keys in postings:
+            if total + len(keys) > FUZZY_CANDIDATES:
+                break
+            counts.update(keys)
+            taken += 1
+            total += len(keys)
+        # Від кандидатів з найбільшою кількістю спільних триграм: кожна знайдена
+        # відстань піднімає поріг, і решту списку можна не перевіряти.
+        # Якщо частину списків пропущено, точну кількість рахуємо вже для кандидата.
+        skipped = len(grams) - taken
+        candidates = sorted(
+            ((count, key) for key, count in counts.items()
+             if count + skipped >= need and abs(len(key) - len(query)) <= limit),
+            reverse=True,
+        )
+        best, found = limit + 1, []
+        for count, key in candidates:
+            cutoff = len(grams) - 4 * min(limit, best)
+            if count + skipped < cutoff:
+                break
+            if skipped and len(grams & _name_grams(key)) < cutoff:
+                continue
+            distance = _edit_distance(query, key, min(limit, best))
+            if distance > limit:
+                continue
+            if distance < best:
+                best, found = distance, [key]
+            elif distance == best:
+                found.append(key)
+        return (best, sorted(found)) if found else None
+
+
+TOKEN_CHUNK = 1000  # скільки токенів у одній відсортованій частині TokenIndex
+
+
+class TokenIndex:
+    # Токен -> множина ключів для пошуку за початком слова. Різні токени лежать
+    # відсортованими частинами до 2 * TOKEN_CHUNK, тож новий токен зсуває лише
+    # одну частину, а не весь список.
+
+    def __init__(self, pairs=()):
+        self.keys = {}
+        for token, key in pairs:
+            self.keys.setdefault(token, set()).add(key)
+        tokens = sorted(self.keys)
+        self.chunks = [tokens[i:i + TOKEN_CHUNK] for i in range(0, len(tokens), TOKEN_CHUNK)]
+        self.maxes = [chunk[-1] for chunk in self.chunks]  # останній токен кожної частини
+
+    def __len__(self):
+        return len(self.keys)
+
+    def add(self, token, key):
+        keys = self.keys.get(token)
+        if keys is not None:
+            keys.add(key)
+            return
+        self.keys[token] = {key}
+        if not self.chunks:
+            self.chunks, self.maxes = [[token]], [token]
+            return
+        i = min(bisect_left(self.maxes, token), len(self.chunks) - 1)
+        chunk = self.chunks[i]
+        insort(chunk, token)
+        self.maxes[i] = chunk[-1]
+        if len(chunk) > 2 * TOKEN_CHUNK:
+            self.chunks[i:i + 1] = [chunk[:TOKEN_CHUNK], chunk[TOKEN_CHUNK:]]
+            self.maxes[i:i + 1] = [chunk[TOKEN_CHUNK - 1], chunk[-1]]
+
+    def discard(self, token, key):
+        keys = self.keys.get(token)
+        if keys is None:
+            return
+        keys.discard(key)
+        if keys:
+            return
+        del self.keys[token]
+        i = bisect_left(self.maxes, token)
+        chunk = self.chunks[i]
+        del chunk[bisect_left(chunk, token)]
+        if chunk:
+            self.maxes[i] = chunk[-1]
+        else:
+            del self.chunks[i]
+            del self.maxes[i]
+
+    def prefix(self, prefix):
+        # Ключі всіх токенів, що починаються з prefix
+        found = set()
+        i = bisect_left(self.maxes, prefix)
+        while i < len(self.chunks):
+            chunk = self.chunks[i]
+            for j in range(bisect_left(chunk, prefix), len(chunk)):
+                if not chunk[j].startswith(prefix):
+                    return found
+                found |= self.keys[chunk[j]]
+            i += 1
+        return found
+
+
+# Пошук дублікатів: пари для порівняння дають лише спільні блоки (телефон,
+# email, підпис імені), тож кожен контакт порівнюється з кількома сусідами, а не з усіма
+DEDUPE_BLOCK_MAX = 50   # більші блоки (поширене ім'я, телефон офісу) не порівнюємо попарно
+DEDUPE_THRESHOLD = 1.0  # ім'я дає до 1.0, кожен спільний телефон чи email ще +0.5
+
+
+def _name_signatures(key):
+    # "ivan petrenko" -> {"ivan p", "petrenko i"}: слово й ініціали решти слів,
+    # тож в один блок потрапляють "Petrenko Ivan", "Ivan P." і "Ivan Petrneko"
+    words = _words(key)
+    if len(words) < 2:
+        return set(words)
+    return {
+        word + " " + "".join(sorted(w[0] for j, w in enumerate(words) if j != i))
+        for i, word in enumerate(words) if len(word) > 1
+    }
+
+
+def _word_similarity(a, b):
+    if a == b:
+        return 1.0
+    if len(a) == 1 or len(b) == 1:
+        return 0.5 if a[0] == b[0] else 0.0  # ініціал
+    if min(len(a), len(b)) >= 5 and _edit_distance(a, b, 1) <= 1:
+        return 0.75  # одна помилка
+    return 0.0
+
+
+def _name_similarity(a, b):
+    # Частка слів довшого імені, що мають пару в іншому (порядок слів неважливий)
+    a, b = _words(a), _words(b)
+    if not a or not b:
+        return 0.0
+    if len(a) > len(b):
+        a, b = b, a
+    rest, total = list(b), 0.0
+    for word in a:
+        best = max(rest, key=lambda other: _word_similarity(word, other))
+        score = _word_similarity(word, best)
+        if score:
+            total += score
+            rest.remove(best)
+    return total / len(b)
+
+
+def _duplicate_score(a, b):
+    # Різні дні народження — точно різні люди; без схожого імені теж не зливаємо
+    if a._birthday is not None and b._birthday is not None and a._birthday != b._birthday:
+        return 0.0
+    score = _name_similarity(a._name, b._name)
+    if not score:
+        return 0.0
+    if {p.value for p in a.phones} & {p.value for p in b.phones}:
+        score += 0.5
+    if set(a._emails) & set(b._emails):
+        score += 0.5
+    return score
+
+
+def _record_weight(record):
+    # Найповніший запис групи лишається, решта зливається в нього
+    filled = len(record._phones) // PHONE_LEN + len(record._emails)
+    filled += (record._birthday is not None) + (record._address is not None)
+    return filled, len(_words(record._name)), len(record._name)
+
+
+def _group_pairs(pairs):
+    # Об'єднання пар у групи (система неперетинних множин)
+    parent = {}
+
+    def root(key):
+        parent.setdefault(key, key)
+        while parent[key] != key:
+            parent[key] = parent[parent[key]]
+            key = parent[key]
+        return key
+
+    for a, b in pairs:
+        parent[root(a)] = root(b)
+    groups = {}
+    for key in parent:
+        groups.setdefault(root(key), []).append(key)
+    return list(groups.values())
+
+
+def _split_conflicts(keys, linked, records):
+    # Пари ланцюжком можуть зв'язати контакти з різними днями народження через
+    # запис без дати. Ділимо групу (keys — від найповнішого запису) так, щоб у
+    # кожній частині була щонайбільше одна дата і кожен ключ мав пару серед попередніх.
+    parts = []  # [день народження або None, ключі]
+    for key in keys:
+        birthday = records[key]._birthday
+        for part in parts:
+            if birthday is not None and part[0] is not None and birthday != part[0]:
+                continue
+            if linked[key].isdisjoint(part[1]):
+                continue
+            part[1].append(key)
+            if part[0] is None:
+                part[0] = birthday
+            break
+        else:
+            parts.append([birthday, [key]])
+    return [members for _, members in parts if len(members) > 1]
+
+
+def _discard_owner(owners, value, key):
+    keys = owners.get(value)
+    if keys is not None:
+        keys.discard(key)
+        if not keys:
+            del owners[value]
+
+
+def _is_leap(year):
+    return year % 4 == 0 and (year % 100 != 0 or year % 400 == 0)
+
+
+def _birthday_in_year(month, day, year):
+    # 29 лютого у невисокосний рік святкуємо 1 березня
+    if month == 2 and day == 29 and not _is_leap(year):
+        return date(year, 3, 1)
+    return date(year, month, day)
+
+
+# Стовпці днів народження для пакетних звітів через NumPy. День року рахуємо
+# у високосному календарі (0..365), щоб 29 лютого мало власне місце.
+MONTH_STARTS = (0, 31, 60, 91, 121, 152, 182, 213, 244, 274, 305, 335)
+MARCH_1 = MONTH_STARTS[2]
+UNIX_ORDINAL = date(1970, 1, 1).toordinal()  # datetime64[D] рахує дні від 1970-01-01
+
+
+def weekend_to_monday(dates):
+    # Сб/Нд -> наступний понеділок для масиву datetime64[D]; 1970-01-01 — четвер
+    weekday = (dates.astype(np.int64) + 3) % 7  # Пн = 0
+    return dates + np.where(weekday >= 5, 7 - weekday, 0).astype("timedelta64[D]")
+
+
+class BirthdayColumns:
+    # Для кожного слота — день року, рік народження і ключ контакту. Слот видаленого
+    # контакту позначається valid=False і дістається наступному доданому.
+
+    def __init__(self, items=(), generation=0):
+        if np is None:
+            raise RuntimeError("Birthday reports need NumPy: pip install numpy")
+        self.generation = generation  # стан книги, з якого побудовано (для SQLite)
+        self.keys, ordinals = [], []
+        for key, ordinal in items:
+            self.keys.append(key)
+            ordinals.append(ordinal)
+        self.slots = {key: i for i, key in enumerate(self.keys)}
+        self.free = []
+        self.size = len(self.keys)
+        self.doy, self.year = self._convert(np.array(ordinals, dtype=np.int64))
+        self.valid = np.ones(self.size, dtype=bool)
+
+    @staticmethod
+    def _convert(ordinals):
+        # ordinal дати -> (день року у високосному календарі, рік)
+        days = (ordinals - UNIX_ORDINAL).astype("datetime64[D]")
+        years = days.astype("datetime64[Y]")
+        doy = (days - years.astype("datetime64[D]")).astype(np.int16)
+        year = years.astype(np.int64) + 1970
+        leap = (year % 4 == 0) & ((year % 100 != 0) | (year % 400 == 0))
+        doy += (~leap & (doy >= MARCH_1 - 1)).astype(np.int16)  # з 1 березня — на день далі
+        return doy, year.astype(np.int16)
+
+    def __len__(self):
+        return len(self.slots)
+
+    def add(self, key, ordinal):
+        self.discard(key)
+        if self.free:
+            slot = self.free.pop()
+            self.keys[slot] = key
+        else:
+            slot = self.size
+            if slot == len(self.valid):
+                self._grow()
+            self.keys.append(key)
+            self.size += 1
+        doy, year = self._convert(np.array([ordinal], dtype=np.int64))
+        self.doy[slot], self.year[slot], self.valid[slot] = doy[0], year[0], True
+        self.slots[key] = slot
+
+    def discard(self, key):
+        slot = self.slots.pop(key, None)
+        if slot is not None:
+            self.valid[slot] = False
+            self.keys[slot] = None
+            self.free.append(slot)
+
+    def _grow(self):
+        extra = max(16, len(self.valid))
+        self.doy = np.concatenate([self.doy, np.zeros(extra, np.int16)])
+        self.year = np.concatenate([self.year, np.zeros(extra, np.int16)])
+        self.valid = np.concatenate([self.valid, np.zeros(extra, bool)])
+
+    def occurrences(self, year):
+        # Дата дня народження у році year для кожного слота (29.02 -> 1.03 у невисокосний рік)
+        doy = self.doy[:self.size].astype(np.int64)
+        if not _is_leap(year):
+            doy -= (doy >= MARCH_1).astype(np.int64)
+        return np.datetime64(date(year, 1, 1), "D") + doy.astype("timedelta64[D]")
+
+    def next_occurrences(self, today):
+        # Найближчий день народження, не раніше today
+        this_year = self.occurrences(today.year)
+        return np.where(this_year < np.datetime64(today, "D"), self.occurrences(today.year + 1), this_year)
+
+    def window(self, today, days=7):
+        # Масиви (слоти, дати днів народження, дати привітання) на days днів від today,
+        # упорядковані за датою — без створення об'єктів Python для кожного рядка
+        dates = self.next_occurrences(today)
+        ahead = (dates - np.datetime64(today, "D")).astype(np.int64)
+        hits = np.flatnonzero(self.valid[:self.size] & (ahead <= days))
+        hits = hits[np.argsort(ahead[hits], kind="stable")]
+        return hits, dates[hits], weekend_to_monday(dates[hits])
+
+    def upcoming(self, today, days=7):
+        # [(дата дня народження, ключ, дата привітання)] за датою, потім за ключем
+        hits, dates, congrats = self.window(today, days)
+        return sorted(zip(dates.tolist(), [self.keys[i] for i in hits.tolist()], congrats.tolist()))
+
+    def month_histogram(self):
+        # Кількість днів народження у кожному місяці, від січня до грудня
+        doy = self.doy[:self.size][self.valid[:self.size]]
+        return np.bincount(np.searchsorted(MONTH_STARTS, doy, side="right"), minlength=13)[1:]
+
+    def ages(self, on):
+        # Вік кожного контакту з днем народження на дату on
+        before = self.occurrences(on.year) > np.datetime64(on, "D")
+        ages = on.year - self.year[:self.size].astype(np.int64) - before
+        return ages[self.valid[:self.size]]
+
+    def age_histogram(self, on, width=10):
+        # Кількість контактів у віці [0, width), [width, 2 * width), ...
+        return np.bincount(self.ages(on).clip(0) // width)
+
+
+class AddressBook(UserDict):
+    RECORD_OPS = ("add_phone", "edit_phone", "add_birthday", "add_address", "add_email")
+    INDEXES = ("_birthdays", "_prefix", "_phones", "_emails", "_sorted_keys")
+
+    filename = "addressbook.pkl"  # файл знімка, з якого книгу завантажено
+
+    journal = None      # Journal, якщо увімкнено журналювання змін
+    journal_seq = 0     # номер останнього запису журналу, врахованого у знімку
+    unique = False      # заборонити один телефон/email у кількох контактів
+    version = 0         # лічильник збережень файлу; росте при кожному записі знімка
+    generation = 0      # лічильник змін у цьому процесі
+    _saved_generation = 0  # generation на момент останнього збереження
+    _stamp = None       # (inode, розмір, mtime) файлу, з якого книгу завантажено
+
+    def __init__(self):
+        self._birthdays = []  # відсортований список (місяць, день, ключ)
+        self._prefix = TokenIndex()  # токени імені, телефонів, адреси, email для пошуку
+        self._phones = {}     # телефон -> множина ключів контактів
+        self._emails = {}     # email -> множина ключів контактів
+        self._sorted_keys = []  # ключі (ім'я в нижньому регістрі) за абеткою
+        self._dirty = set()   # ключі, змінені після завантаження/збереження
+        self._names = None    # NameIndex; будується при першому нечіткому пошуку
+        self._columns = None  # BirthdayColumns; будується при першому звіті
+        self._cache = QueryCache()
+        super().__init__()
+
+    def __setitem__(self, key, record):
+        self._materialize()
+        # спершу перевірка, щоб помилка не лишила книгу без старого запису
+        self._check_unique(record, [p.value for p in record.phones], [e.value for e in record.emails], key)
+        if key in self.data:
+            del self[key]
+        record._book = self
+        self.data[key] = record
+        self._touch(key)
+        if self._names is not None:
+            self._names.add(key)
+        insort(self._sorted_keys, key)
+        if record.birthday:
+            self._index_birthday(key, record)
+        self._add_tokens(key, _contact_tokens(record))
+        self._index_owners(key, record)
+        self._log("add_record", record_to_row(record))
+
+    def __delitem__(self, key):
+        self._materialize()
+        record = self.data.pop(key)
+        self._log("delete", key)
+        self._touch(key)
+        if self._names is not None:
+            self._names.discard(key)
+        _remove_sorted(self._sorted_keys, key)
+        if record.birthday:
+            bday = record.birthday.to_date()
+            _remove_sorted(self._birthdays, (bday.month, bday.day, key))
+            if self._columns is not None:
+                self._columns.discard(key)
+        self._discard_tokens(key, _contact_tokens(record))
+        for phone in record.phones:
+            _discard_owner(self._phones, phone.value, key)
+        for email in record.emails:
+            _discard_owner(self._emails, email.value, key)
+        record._book = None
+
+    # Індекси не зберігаються у pickle, а перебудовуються під час завантаження
+    def __getstate__(self):
+        self._materialize()
+        state = self.__dict__.copy()
+        state.pop("filename", None)
+        state.pop("_birthdays", None)
+        state.pop("_prefix", None)
+        state.pop("_phones", None)
+        state.pop("_emails", None)
+        state.pop("_sorted_keys", None)
+        state.pop("_dirty", None)
+        state.pop("_stamp", None)
+        state.pop("_names", None)
+        state.pop("_columns", None)
+        state.pop("_cache", None)
+        state.pop("generation", None)
+        state.pop("_saved_generation", None)
+        state.pop("journal", None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._dirty = set()
+        self._names = None
+        if "_cache" not in self.__dict__:  # при зливанні кеш (і його лічильники) лишається
+            self._cache = QueryCache()
+        self._rebuild_index()
+
+    def __getattr__(self, name):
+        # Індекси книги з бінарного знімка будуються при першому зверненні
+        if name in self.INDEXES and isinstance(self.__dict__.get("data"), MappedRows):
+            self._materialize()
+            return getattr(self, name)
+        raise AttributeError(name)
+
+    def _materialize(self):
+        # Книга з бінарного знімка: декодувати всі записи й побудувати індекси
+        if isinstance(self.data, MappedRows):
+            rows = self.data
+            self.data = dict(rows.items())
+            rows.close()
+            self._rebuild_index()
+
+    def _rebuild_index(self):
+        self._columns = None
+        self._birthdays = []
+        self._phones = {}
+        self._emails = {}
+        self._sorted_keys = sorted(self.data)
+        tokens = []
+        for key, record in self.data.items():
+            record._book = self
+            if record.birthday:
+                bday = record.birthday.to_date()
+                self._birthdays.append((bday.month, bday.day, key))
+            tokens.extend((token, key) for token in _contact_tokens(record))
+            self._index_owners(key, record)
+        self._birthdays.sort()
+        self._prefix = TokenIndex(tokens)
+
+    def _index_owners(self, key, record):
+        for phone in record.phones:
+            self._phones.setdefault(phone.value, set()).add(key)
+        for email in record.emails:
+            self._emails.setdefault(email.value, set()).add(key)
+
+    def _index_birthday(self, key, record):
+        bday = record.birthday.to_date()
+        insort(self._birthdays, (bday.month, bday.day, key))
+        if self._columns is not None:
+            self._columns.add(key, record._birthday)
+
+    def _add_tokens(self, key, tokens):
+        for token in tokens:
+            self._prefix.add(token, key)
+
+    def _discard_tokens(self, key, tokens):
+        for token in tokens:
+            self._prefix.discard(token, key)
+
+    def _record_changed(self, record, op, *args):
+        key = record.name.value.lower()
+        if isinstance(self.data, MappedRows):
+            self._materialize()  # індекси будуються вже зі зміненим записом
+        elif op == "add_birthday":
+            self._index_birthday(key, record)
+        elif op == "add_phone":
+            self._add_tokens(key, _phone_tokens(args[0]))
+            self._phones.setdefault(args[0], set()).add(key)
+        elif op == "edit_phone":
+            # "хвости" старого номера можуть лишатися в інших телефонах запису
+            self._discard_tokens(key, set(_phone_tokens(args[0])) - set(_contact_tokens(record)))
+            self._add_tokens(key, _phone_tokens(args[1]))
+            if not any(p.value == args[0] for p in record.phones):
+                _discard_owner(self._phones, args[0], key)
+            self._phones.setdefault(args[1], set()).add(key)
+        elif op == "add_address":
+            self._add_tokens(key, _address_tokens(args[0]))
+        elif op == "add_email":
+            self._add_tokens(key, _email_tokens(args[0]))
+            self._emails.setdefault(args[0], set()).add(key)
+        self._touch(key)
+        self._log(op, key, *args)
+
+    def _phone_owners(self, phone):
+        return self._phones.get(phone, set())
+
+    def _email_owners(self, email):
+        return self._emails.get(email, set())
+
+    def _check_unique(self, record, phones=(), emails=(), key=None):
+        # key — ключ запису, який record замінює: його телефони й email не заважають
+        if not self.unique:
+            return
+        own = {record.name.value.lower(), key}
+        for phone in phones:
+            others = self._phone_owners(phone) - own
+            if others:
+                owner = self.data[min(others)].name.value
+                raise ValueError(f"Phone {phone} already belongs to {owner}.")
+        for email in emails:
+            others = self._email_owners(email) - own
+            if others:
+                owner = self.data[min(others)].name.value
+                raise ValueError(f"Email {email} already belongs to {owner}.")
+
+    def set_unique(self, unique):
+        self.unique = unique
+        self.generation += 1
+        self._log("set_unique", unique)
+
+    def find_by_phone(self, phone):
+        return [self.data[key] for key in sorted(self._phone_owners(phone))]
+
+    def find_by_email(self, email):
+        return [self.data[key] for key in sorted(self._email_owners(email.strip().lower()))]
+
+    def _log(self, op, *args):
+        if self.journal is not None:
+            self.journal.append(op, args)
+
+    def _merge_into(self, disk):
+        # Перенести у книгу з диска лише ті контакти, які змінили ми.
+        # Перевірку унікальності вимкнено: наші зміни вже пройшли її у нас.
+        disk.unique = False
+        for key in self._dirty:
+            record = self.data.get(key)
+            if record is not None:
+                disk.add_record(record_from_row(record_to_row(record)))
+            elif key in disk.data:
+                disk.delete(key)
+        disk.unique = self.unique
+        if self.journal is not None:
+            # Записи журналу, прочитані не власником, не потрапляють у _dirty,
+            # тож лише власник може позначити їх як збережені у знімку
+            disk.journal_seq = max(disk.journal_seq, self.journal_seq)
+
+    def _touch(self, key):
+        self._dirty.add(key)
+        self.generation += 1
+
+    def _mark_saved(self):
+        self._dirty = set()
+        self._saved_generation = self.generation
+
+    def _apply(self, op, args):
+        # Повтор запису журналу під час завантаження
+        if op == "add_record":
+            self.add_record(record_from_row(args[0]))
+        elif op == "delete":
+            self.delete(args[0])
+        elif op == "set_unique":
+            self.set_unique(args[0])
+        elif op in self.RECORD_OPS:
+            getattr(self.data[args[0]], op)(*args[1:])
+        else:
+            raise ValueError(f"Unknown journal operation: {op}")
+
+    def add_record(self, record):
+        self[record.name.value.lower()] = record
+
+    def add_records(self, items):
+        # Масове додавання нових контактів [(номер рядка, Record), ...]:
+        # відсортовані списки ключів і днів народження зливаються один раз на пачку
+        self._materialize()
+        added, errors = 0, []
+        birthdays, keys = [], []
+        for line_no, record in items:
+            key = record.name.value.lower()
+            if key in self.data:
+                errors.append((line_no, f"Contact '{record.name.value}' already exists."))
+                continue
+            try:
+                self._check_unique(record, [p.value for p in record.phones], [e.value for e in record.emails])
+            except ValueError as e:
+                errors.append((line_no, str(e)))
+                continue
+            record._book = self
+            self.data[key] = record
+            self._touch(key)
+            if self._names is not None:
+                self._names.add(key)
+            keys.append(key)
+            if record.birthday:
+                bday = record.birthday.to_date()
+                birthdays.append((bday.month, bday.day, key))
+                if self._columns is not None:
+                    self._columns.add(key, record._birthday)
+            self._add_tokens(key, _contact_tokens(record))
+            self._index_owners(key, record)
+            self._log("add_record", record_to_row(record))
+            added += 1
+        birthdays.sort()
+        keys.sort()
+        self._sorted_keys = list(merge(self._sorted_keys, keys))
+        self._birthdays = list(merge(self._birthdays, birthdays))
+        return added, errors
+
+    def import_file(self, filename):
+        return _import(filename, validate_contacts, self.add_records, self.journal)
+
+    def export_file(self, filename):
+        rows = (dict(zip(CONTACT_FIELDS, record_to_row(record))) for record in self.data.values())
+        return write_rows(filename, CONTACT_FIELDS, rows)
+
+    def find(self, name):
+        return self.data.get(name.lower())
+
+    def find_closest(self, name):
+        # Контакти з найменшою відстанню до name (з урахуванням помилок)
+        if self._names is None:
+            self._names = NameIndex(self.data)
+        match = self._names.closest(name)
+        return [self.data[key] for key in match[1]] if match else []
+
+    def complete_names(self, prefix, limit=COMPLETE_LIMIT):
+        # Імена контактів, що починаються з prefix (без урахування регістру)
+        return [self.data[key].name.value for key in _complete_sorted(self._sorted_keys, prefix.lower(), limit)]
+
+    def delete(self, name):
+        key = name.lower()
+        if key in self.data:
+            del self[key]
+
+    def _owner_blocks(self):
+        # Групи контактів зі спільним телефоном чи email
+        yield from self._phones.values()
+        yield from self._emails.values()
+
+    def _name_blocks(self):
+        blocks = {}
+        for key in self.data:
+            for signature in _name_signatures(key):
+                blocks.setdefault(signature, []).append(key)
+        return blocks.values()
+
+    def find_duplicates(self, threshold=DEDUPE_THRESHOLD):
+        # Групи ключів контактів, схожих на одну людину; першим іде найповніший запис.
+        # Оцінюються лише пари, що мають спільний блок.
+        pairs = set()
+        for blocks in (self._owner_blocks(), self._name_blocks()):
+            for block in blocks:
+                if 1 < len(block) <= DEDUPE_BLOCK_MAX:
+                    pairs.update(combinations(sorted(block), 2))
+        matched = [(a, b) for a, b in pairs if _duplicate_score(self.data[a], self.data[b]) >= threshold]
+        linked = {}
+        for a, b in matched:
+            linked.setdefault(a, set()).add(b)
+            linked.setdefault(b, set()).add(a)
+        groups = []
+        for group in _group_pairs(matched):
+            weights = {key: _record_weight(self.data[key]) for key in group}
+            group.sort(key=lambda key: (tuple(-w for w in weights[key]), key))
+            groups += _split_conflicts(group, linked, self.data)
+        groups.sort()
+        return groups
+
+    def merge_contacts(self, keep, others):
+        # Перенести телефони, email, день народження й адресу з others у keep і видалити others.
+        # Зміни проходять через методи Record, тож індекси й журнал оновлюються як завжди.
+        self._materialize()
+        record = self.data[keep]
+        merged = [self.data[key] for key in others]
+        birthdays = {r._birthday for r in [record, *merged] if r._birthday is not None}
+        if len(birthdays) > 1:
+            raise ValueError(f"Cannot merge into {record.name.value}: the contacts have different birthdays.")
+        for key in others:
+            del self[key]  # спершу видаляємо, щоб перевірка унікальності не спрацювала на дублікатах
+        for other in merged:
+            for phone in other.phones:
+                if phone.value not in {p.value for p in record.phones}:
+                    record.add_phone(phone.value)
+            for email in other._emails:
+                if email not in record._emails:
+                    record.add_email(email)
+            if record._birthday is None and other._birthday is not None:
+                record.add_birthday(other.birthday.value)
+            if record._address is None and other._address is not None:
+                record.add_address(other._address)
+        return record
+
+    def sorted_records(self, after=None, offset=0):
+        # Записи за абеткою, починаючи після ключа after (курсор) і зі зсувом offset
+        i = bisect_right(self._sorted_keys, after) if after is not None else 0
+        i += offset
+        while i < len(self._sorted_keys):
+            yield self.data[self._sorted_keys[i]]
+            i += 1
+
+    @cached
+    def search(self, query):
+        # Кожне слово запиту має бути початком імені, слова адреси, email
+        # чи домену, або частиною телефону
+        keys = None
+        for word in query.lower().split():
+            found = self._prefix.prefix(word)
+            if word.isdigit() and len(word) >= PHONE_SUFFIX_MIN:
+                found |= self._prefix.prefix("~" + word)
+            keys = found if keys is None else keys & found
+            if not keys:
+                return []
+        return [self.data[key] for key in sorted(keys or ())]
+
+    def _birthday_candidates(self, start, days):
+        # Записи з (місяць, день) від start до start + days, з переходом через Новий рік
+        if days >= 365:
+            return list(self._birthdays)
+        end = start + timedelta(days=days)
+        lo = bisect_left(self._birthdays, (start.month, start.day))
+        hi = bisect_right(self._birthdays, (end.month, end.day, "\uffff"))
+        if (end.month, end.day) >= (start.month, start.day):
+            return self._birthdays[lo:hi]
+        return self._birthdays[lo:] + self._birthdays[:hi]
+
+    def birthday_columns(self):
+        # BirthdayColumns для пакетних звітів (потрібен NumPy); далі оновлюється разом з книгою
+        if self._columns is None:
+            self._columns = BirthdayColumns(
+                (key, record._birthday) for key, record in self.data.items() if record._birthday is not None
+            )
+        return self._columns
+
+    def get_upcoming_birthdays(self, days=7):
+        # дата входить у ключ кешу: опівночі результат застаріває сам
+        return self._upcoming_birthdays(datetime.today().date(), days)
+
+    @cached
+    def _upcoming_birthdays(self, today, days):
+        upcoming = []
+        # на день раніше, щоб не пропустити 29.02, що переноситься на 1.03
+        for month, day, key in self._birthday_candidates(today - timedelta(days=1), days + 1):
+            bday_this_year = _birthday_in_year(month, day, today.year)
+            if bday_this_year < today:
+                bday_this_year = _birthday_in_year(month, day, today.year + 1)
+            delta = (bday_this_year - today).days
+            if 0 <= delta <= days:
+                record = self.data[key]
+                congrats_date = bday_this_year
+                if congrats_date.weekday() >= 5:  # Сб или Нд → понедельник
+                    days_to_monday = 7 - congrats_date.weekday()
+                    congrats_date += timedelta(days=days_to_monday)
+                upcoming.append({
+                    "name": record.name.value,
+                    "congratulation_date": congrats_date.strftime("%Y.%m.%d")
+                })
+        return upcoming
+
+
+# >>> START OF NOTES MODULE =========================================
+
+NGRAM_SIZE = 3  # довжина n-грам в індексі пошуку нотаток; коротші запити перевіряють усі нотатки
+
+
+def _ngrams(text):
+    # усі підрядки довжиною NGRAM_SIZE
+    return {text[i:i + NGRAM_SIZE] for i in range(len(text) - NGRAM_SIZE + 1)}
+
+
+def _note_grams(note):
+    grams = _ngrams(note.title.lower()) | _ngrams(note.content.lower())
+    for tag in note.tags:
+        grams |= _ngrams(tag)
+    return grams
+
+
+# Ранжування нотаток за BM25F: слова з назви важать більше, ніж з тегів,
+# а з тегів — більше, ніж з тексту
+FIELD_WEIGHTS = (3.0, 2.0, 1.0)  # назва, теги, текст
+BM25_K1 = 1.2
+BM25_B = 0.75
+RANK_TOP = 10  # скільки найкращих результатів показувати
+
+
+def _note_fields(note):
+    return _words(note.title), _words(" ".join(note.tags)), _words(note.content)
+
+
+class RankIndex:
+    # Слово -> {id: (частота в назві, у тегах, у тексті)}, а для кожної
+    # нотатки — довжини полів і її слова (щоб прибрати їх після змін)
+
+    def __init__(self, notes=()):
+        self.postings = {}
+        self.docs = {}  # id -> ((слів у назві, у тегах, у тексті), слова)
+        self.totals = [0, 0, 0]
+        for key, note in notes:
+            self.add(key, note)
+
+    def add(self, key, note):
+        fields = _note_fields(note)
+        lengths = tuple(len(words) for words in fields)
+        for i, n in enumerate(lengths):
+            self.totals[i] += n
+        counts = {}
+        for i, words in enumerate(fields):
+            for word in words:
+                counts.setdefault(word, [0, 0, 0])[i] += 1
+        for word, tf in counts.items():
+            self.postings.setdefault(word, {})[key] = tuple(tf)
+        self.docs[key] = (lengths, tuple(counts))
+
+    def discard(self, key):
+        entry = self.docs.pop(key, None)
+        if entry is None:
+            return
+        lengths, words = entry
+        for i, n in enumerate(lengths):
+            self.totals[i] -= n
+        for word in words:
+            docs = self.postings[word]
+            del docs[key]
+            if not docs:
+                del self.postings[word]
+
+    def top(self, query, k):
+        # k пар (id, оцінка) з найбільшою оцінкою; при рівності — старші нотатки
+        n = len(self.docs)
+        # норма поля: 1 - b + b * довжина / середня довжина
+        slope = [BM25_B / (total / n) if n and total else 0.0 for total in self.totals]
+        base = 1 - BM25_B
+        w_title, w_tags, w_content = FIELD_WEIGHTS
+        scores = {}
+        for word in set(_words(query)):
+            docs = self.postings.get(word)
+            if not docs:
+                continue
+            idf = math.log(1 + (n - len(docs) + 0.5) / (len(docs) + 0.5))
+            for key, (title, tags, content) in docs.items():
+                l_title, l_tags, l_content = self.docs[key][0]
+                weighted = 0.0
+                if title:
+                    weighted += w_title * title / (base + slope[0] * l_title)
+                if tags:
+                    weighted += w_tags * tags / (base + slope[1] * l_tags)
+                if content:
+                    weighted += w_content * content / (base + slope[2] * l_content)
+                scores[key] = scores.get(key, 0.0) + idf * weighted / (BM25_K1 + weighted)
+        return nlargest(k, scores.items(), key=lambda item: (item[1], -int(item[0])))
+
+
+class Note:
+    __slots__ = ("title", "content", "tags", "created", "modified", "_book", "_key", "__weakref__")
+
+    def __init__(self, title, content):
+        self.title = title.strip()
+        self.content = content.strip()
+        self.tags = ()  # кортеж, щоб не тримати запас місця, як у list
+        self.created = to_timestamp(datetime.now())
+        self.modified = self.created  # змінюється при edit_note
+        self._book = None  # NotesBook, якому належить нотатка (для оновлення індексів)
+        self._key = None
+
+    @property
+    def created_at(self):
+        return from_timestamp(self.created).strftime(NOTE_TIME_FORMAT)
+
+    @created_at.setter
+    def created_at(self, value):
+        self.created = to_timestamp(datetime.strptime(value, NOTE_TIME_FORMAT))
+
+    @property
+    def modified_at(self):
+        return from_timestamp(self.modified).strftime(NOTE_TIME_FORMAT)
+
+    @modified_at.setter
+    def modified_at(self, value):
+        self.modified = to_timestamp(datetime.strptime(value, NOTE_TIME_FORMAT))
+
+    def __getstate__(self):
+        return {
+            "title": self.title, "content": self.content, "tags": self.tags,
+            "created": self.created, "modified": self.modified,
+        }
+
+    def __setstate__(self, state):
+        _restore_slots(self, state)
+        self.tags = tuple(self.tags)
+        if getattr(self, "modified", None) is None:  # pickle без часу зміни
+            self.modified = self.created
+        self._book = None
+        self._key = None
+
+    def add_tag(self, tag):
+        tag = tag.strip().lower()
+        if tag and tag not in self.tags:
+            self.tags += (tag,)
+            if self._book is not None:
+                self._book._note_changed(self._key, "add_tag", tag)
+
+    def remove_tag(self, tag):
+        tag = tag.strip().lower()
+        if tag in self.tags:
+            self.tags = tuple(t for t in self.tags if t != tag)
+            if self._book is not None:
+                self._book._note_changed(self._key, "remove_tag", tag)
+            return True
+        return False
+            
+    def __str__(self):
+        tags_str = f", tags: #{', #'.join(self.tags)}" if self.tags else ""
+        edited_str = f", edited {self.modified_at}" if self.modified > self.created else ""
+        return f"[{self.title}] {self.content} (created {self.created_at}{edited_str}){tags_str}"
+
+
+def note_to_row(note):
+    return [note.title, note.content, note.created_at, list(note.tags), note.modified_at]
+
+
+def note_from_row(row):
+    # рядки старого журналу — без modified_at
+    title, content, created_at, tags, *rest = row
+    note = Note(title, content)
+    note.created_at = created_at
+    note.modified_at = rest[0] if rest and rest[0] else created_at
+    for tag in tags:
+        note.add_tag(tag)
+    return note
+
+
+class NotesBook(UserDict):
+    NOTE_OPS = ("add_tag", "remove_tag")
+    INDEXES = ("_index", "_tag_index", "_tags", "_ids", "_created", "_modified")
+
+    filename = "notes.pkl"  # файл знімка, з якого книгу завантажено
+
+    journal = None      # Journal, якщо увімкнено журналювання змін
+    journal_seq = 0     # номер останнього запису журналу, врахованого у знімку
+    version = 0         # лічильник збережень файлу; росте при кожному записі знімка
+    generation = 0      # лічильник змін у цьому процесі
+    _saved_generation = 0  # generation на момент останнього збереження
+    _stamp = None       # (inode, розмір, mtime) файлу, з якого книгу завантажено
+    _loaded_next_id = 1 # next_id на момент завантаження: більші id створили ми
+    _scan = None        # ShardedScan, якщо увімкнено паралельний пошук
+
+    def __init__(self):
+        self._index = None  # n-грама -> множина id нотаток; будується при першому пошуку
+        self._tag_index = {}  # тег -> множина id нотаток
+        self._tags = []  # усі теги за абеткою (для автодоповнення)
+        self._ids = []  # числові id за зростанням
+        self._created = []  # (час створення, id) за зростанням
+        self._modified = []  # (час зміни, id) за зростанням
+        self._dirty = set()  # id, змінені після завантаження/збереження
+        self._ranks = None  # RankIndex; будується при першому ранжованому пошуку
+        self._cache = QueryCache()
+        super().__init__()
+        self.next_id = 1
+
+    def __setitem__(self, key, note):
+        self._materialize()
+        if key in self.data:
+            del self[key]
+        note._book = self
+        note._key = key
+        self.data[key] = note
+        self._touch(key)
+        insort(self._ids, int(key))
+        insort(self._created, (note.created, int(key)))
+        insort(self._modified, (note.modified, int(key)))
+        if self._index is not None:
+            self._add_grams(key, _note_grams(note))
+        for tag in note.tags:
+            self._index_tag(key, tag)
+        self._update_ranks(key, note)
+        self._log("set_note", key, note_to_row(note))
+
+    def __delitem__(self, key):
+        self._materialize()
+        note = self.data.pop(key)
+        self._log("delete_note", key)
+        self._touch(key)
+        _remove_sorted(self._ids, int(key))
+        _remove_sorted(self._created, (note.created, int(key)))
+        _remove_sorted(self._modified, (note.modified, int(key)))
+        if self._index is not None:
+            self._discard_grams(key, _note_grams(note))
+        for tag in note.tags:
+            self._discard_tag(key, tag)
+        self._update_ranks(key)
+        note._book = None
+        note._key = None
+
+    # Індекси не зберігаються у pickle, а перебудовуються під час завантаження
+    def __getstate__(self):
+        self._materialize()
+        state = self.__dict__.copy()
+        state.pop("filename", None)
+        state.pop("_index", None)
+        state.pop("_tag_index", None)
+        state.pop("_tags", None)
+        state.pop("_ids", None)
+        state.pop("_created", None)
+        state.pop("_modified", None)
+        state.pop("_dirty", None)
+        state.pop("_stamp", None)
+        state.pop("_loaded_next_id", None)
+        state.pop("_ranks", None)
+        state.pop("_scan", None)
+        state.pop("_cache", None)
+        state.pop("generation", None)
+        state.pop("_saved_generation", None)
+        state.pop("journal", None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._dirty = set()
+        self._ranks = None
+        if "_cache" not in self.__dict__:  # при зливанні кеш (і його лічильники) лишається
+            self._cache = QueryCache()
+        self._rebuild_index()
+        if self._scan is not None:
+            self._scan.reset()
+
+    def _update_ranks(self, key, note=None):
+        # note=None — нотатку видалено
+        if self._ranks is not None:
+            self._ranks.discard(key)
+            if note is not None:
+                self._ranks.add(key, note)
+
+    def __getattr__(self, name):
+        # Індекси книги з бінарного знімка будуються при першому зверненні
+        if name in self.INDEXES and isinstance(self.__dict__.get("data"), MappedRows):
+            self._materialize()
+            return getattr(self, name)
+        raise AttributeError(name)
+
+    def _materialize(self):
+        # Книга з бінарного знімка: декодувати всі нотатки й побудувати індекси
+        if isinstance(self.data, MappedRows):
+            rows = self.data
+            self.data = dict(rows.items())
+            rows.close()
+            self._rebuild_index()
+
+    def _rebuild_index(self):
+        self._index = None  # n-грами — лише коли знадобляться пошуку
+        self._tag_index = {}
+        self._ids = sorted(map(int, self.data))
+        self._created = sorted((note.created, int(key)) for key, note in self.data.items())
+        self._modified = sorted((note.modified, int(key)) for key, note in self.data.items())
+        for key, note in self.data.items():
+            note._book = self
+            note._key = key
+            for tag in note.tags:
+                self._tag_index.setdefault(tag, set()).add(key)
+        self._tags = sorted(self._tag_index)
+
+    def _build_grams(self):
+        self._index = {}
+        for key, note in self.data.items():
+            self._add_grams(key, _note_grams(note))
+
+    def _add_grams(self, key, grams):
+        for gram in grams:
+            self._index.setdefault(gram, set()).add(key)
+
+    def _discard_grams(self, key, grams):
+        for gram in grams:
+            keys = self._index.get(gram)
+            if keys is None:
+                continue
+            keys.discard(key)
+            if not keys:
+                del self._index[gram]
+
+    def _index_tag(self, key, tag):
+        keys = self._tag_index.get(tag)
+        if keys is None:
+            keys = self._tag_index[tag] = set()
+            insort(self._tags, tag)
+        keys.add(key)
+
+    def _discard_tag(self, key, tag):
+        keys = self._tag_index.get(tag)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._tag_index[tag]
+                _remove_sorted(self._tags, tag)
+
+    def _note_changed(self, key, op, tag):
+        if isinstance(self.data, MappedRows):
+            self._materialize()  # індекси будуються вже зі зміненою нотаткою
+        elif op == "add_tag":
+            if self._index is not None:
+                self._add_grams(key, _ngrams(tag))
+            self._index_tag(key, tag)
+        else:
+            if self._index is not None:
+                self._discard_grams(key, _ngrams(tag) - _note_grams(self.data[key]))
+            self._discard_tag(key, tag)
+        self._update_ranks(key, self.data[key])
+        self._touch(key)
+        self._log(op, key, tag)
+
+    def _log(self, op, *args):
+        if self.journal is not None:
+            self.journal.append(op, args)
+
+    def _merge_into(self, disk):
+        # Перенести у книгу з диска лише змінені нами нотатки. Нова нотатка,
+        # id якої тим часом зайняв інший процес, отримує наступний вільний id.
+        disk.next_id = max(disk.next_id, self.next_id)
+        shifted = False  # після першого перенумерування нові нотатки йдуть далі по черзі
+        for key in sorted(self._dirty, key=int):
+            note = self.data.get(key)
+            if note is None:
+                if key in disk.data:
+                    del disk[key]
+                continue
+            target = key
+            if int(key) >= self._loaded_next_id and (shifted or key in disk.data):
+                shifted = True
+                target = str(disk.next_id)
+                disk.next_id += 1
+            disk[target] = note_from_row(note_to_row(note))
+        if self.journal is not None:  # див. AddressBook._merge_into
+            disk.journal_seq = max(disk.journal_seq, self.journal_seq)
+
+    def _touch(self, key):
+        self._dirty.add(key)
+        self.generation += 1
+        if self._scan is not None:
+            self._scan.changed.add(key)
+
+    def _mark_saved(self):
+        self._dirty = set()
+        self._saved_generation = self.generation
+        self._loaded_next_id = self.next_id
+
+    def enable_parallel(self, workers):
+        # workers процесів для search і search_by_tags на великих книгах
+        self.close_parallel()
+        if workers > 1:
+            self._scan = ShardedScan(self, workers)
+
+    def close_parallel(self):
+        if self._scan is not None:
+            self._scan.close()
+            self._scan = None
+
+    def _parallel(self):
+        return self._scan is not None and len(self.data) >= PARALLEL_MIN
+
+    def _apply(self, op, args):
+        # Повтор запису журналу під час завантаження
+        if op == "set_note":
+            key, row = args
+            self[key] = note_from_row(row)
+            self.next_id = max(self.next_id, int(key) + 1)
+        elif op == "delete_note":
+            self.delete_note(args[0])
+        elif op == "edit_note":
+            self.edit_note(*args)
+        elif op in self.NOTE_OPS:
+            getattr(self.data[args[0]], op)(args[1])
+        else:
+            raise ValueError(f"Unknown journal operation: {op}")
+
+    def _candidates(self, query_lower):
+        # Нотатки, у яких є всі n-грами запиту; решта точно не збігається.
+        # Коротший за n-граму запит є майже в кожній нотатці — перевіряємо всі.
+        if len(query_lower) < NGRAM_SIZE:
+            return [str(note_id) for note_id in self._ids]
+        if self._index is None:
+            self._build_grams()
+        postings = sorted((self._index.get(g, set()) for g in _ngrams(query_lower)), key=len)
+        candidates = set(postings[0])
+        for keys in postings[1:]:
+            candidates &= keys
+            if not candidates:
+                break
+        # id зростають, тож це порядок додавання, як у self.data
+        return sorted(candidates, key=int)
+
+    def add_note(self, title, content):
+        note = Note(title.strip(), content.strip())
+        key = str(self.next_id)
+        self[key] = note
+        self.next_id += 1
+        return key
+
+    def add_notes(self, items):
+        # Масове додавання [(номер рядка, Note), ...]; id видаються по черзі
+        for _, note in items:
+            self[str(self.next_id)] = note
+            self.next_id += 1
+        return len(items), []
+
+    def import_file(self, filename):
+        return _import(filename, validate_notes, self.add_notes, self.journal)
+
+    def export_file(self, filename):
+        rows = (
+            dict(zip(NOTE_FIELDS, [key, *note_to_row(note)]))
+            for key, note in self.data.items()
+        )
+        return write_rows(filename, NOTE_FIELDS, rows)
+
+    def edit_note(self, key, new_content, modified=None):
+        # modified — час зміни з журналу; інакше поточний
+        if key in self.data:
+            note = self.data[key]
+            old_grams = _ngrams(note.content.lower()) if self._index is not None else None
+            note.content = new_content.strip()
+            _remove_sorted(self._modified, (note.modified, int(key)))
+            note.modified = to_timestamp(datetime.now()) if modified is None else modified
+            insort(self._modified, (note.modified, int(key)))
+            if old_grams is not None:
+                self._discard_grams(key, old_grams - _note_grams(note))
+                self._add_grams(key, _ngrams(note.content.lower()))
+            self._update_ranks(key, note)
+            self._touch(key)
+            self._log("edit_note", key, note.content, note.modified)
+        else:
+            raise KeyError("Note not found.")
+
+    def delete_note(self, key):
+        if key in self.data:
+            del self[key]
+        else:
+            raise KeyError("Note not found.")
+
+    def all_notes(self):
+        return list(self.sorted_notes())
+
+    def by_time(self, start=None, end=None, field="created", newest_first=False):
+        # (id, нотатка) з часом field ("created" або "modified") у [start, end),
+        # упорядковані за цим часом; межі — секунди, як у to_timestamp
+        index = self._created if field == "created" else self._modified
+        lo = 0 if start is None else bisect_left(index, (start,))
+        hi = len(index) if end is None else bisect_left(index, (end,))
+        for i in (range(hi - 1, lo - 1, -1) if newest_first else range(lo, hi)):
+            key = str(index[i][1])
+            yield key, self.data[key]
+
+    def complete_ids(self, prefix, limit=COMPLETE_LIMIT):
+        # id нотаток, що починаються з prefix: бінарний пошук у _ids для кожної довжини числа
+        found = []
+        for lo, hi in _id_ranges(prefix, self.next_id - 1):
+            i = bisect_left(self._ids, lo)
+            while i < len(self._ids) and self._ids[i] < hi and len(found) < limit:
+                found.append(str(self._ids[i]))
+                i += 1
+        return found
+
+    def complete_tags(self, prefix, limit=COMPLETE_LIMIT):
+        return _complete_sorted(self._tags, prefix.lower(), limit)
+
+    def sorted_notes(self, after=None, offset=0):
+        # (id, нотатка) за зростанням id, починаючи після id after і зі зсувом offset
+        i = bisect_right(self._ids, int(after)) if after is not None else 0
+        i += offset
+        while i < len(self._ids):
+            key = str(self._ids[i])
+            yield key, self.data[key]
+            i += 1
+
+    @cached
+    def search(self, query):
+        query_lower = query.lower()
+        if self._parallel():
+            return self._scan.search(query_lower)
+        results = []
+        for key in self._candidates(query_lower):
+            note = self.data[key]
+            title_matches = note.title.lower().count(query_lower)
+            content_matches = note.content.lower().count(query_lower)
+            tags_matches = sum(1 for tag in note.tags if query_lower in tag)
+
+            total_matches = title_matches + content_matches + tags_matches
+            if total_matches > 0:
+                results.append((total_matches, key, note))
+
+        results.sort(reverse=True, key=lambda x: x[0])
+        return [(key, note) for _, key, note in results]
+
+    @cached
+    def rank(self, query, k=RANK_TOP):
+        # k найрелевантніших нотаток за BM25F (слова цілком, не підрядки)
+        if self._ranks is None:
+            self._ranks = RankIndex(self.data.items())
+        return [(key, self.data[key]) for key, _ in self._ranks.top(query, k)]
+
+    @cached
+    def search_by_tags(self, tags):
+        tags = {t.strip().lower() for t in tags}
+        if self._parallel():
+            return self._scan.search_by_tags(tags)
+        matches = {}
+        for tag in tags:
+            for key in self._tag_index.get(tag, ()):
+                matches[key] = matches.get(key, 0) + 1
+        results = [(count, key) for key, count in matches.items()]
+        results.sort(reverse=True)  # за кількістю збігів тегів
+        return [(key, self.data[key]) for _, key in results]
+
+    @cached
+    def filter_by_tags(self, query):
+        # "work +urgent -done": без префікса — хоча б один з тегів,
+        # "+" — обов'язковий тег, "-" — нотатки з цим тегом виключаються
+        any_of, all_of, none_of = set(), set(), set()
+        for term in query:
+            term = term.strip().lower()
+            if term.startswith("+"):
+                all_of.add(term[1:])
+            elif term.startswith("-"):
+                none_of.add(term[1:])
+            else:
+                any_of.add(term)
+        any_of.discard("")
+        all_of.discard("")
+        none_of.discard("")
+
+        if all_of:
+            postings = sorted((self._tag_index.get(t, set()) for t in all_of), key=len)
+            keys = set(postings[0])
+            for posting in postings[1:]:
+                keys &= posting
+            if any_of:
+                keys = {k for k in keys if any(k in self._tag_index.get(t, ()) for t in any_of)}
+        elif any_of:
+            keys = set()
+            for tag in any_of:
+                keys |= self._tag_index.get(tag, set())
+        else:
+            keys = set(self.data)
+        for tag in none_of:
+            keys -= self._tag_index.get(tag, set())
+
+        wanted = any_of | all_of
+        results = []
+        for key in keys:
+            matches = sum(1 for tag in wanted if key in self._tag_index.get(tag, ()))
+            results.append((-matches, int(key), key))
+        results.sort()
+        return [(key, self.data[key]) for _, _, key in results]
+
+
+# Паралельний пошук: нотатки розкладено по процесах за id % кількість процесів.
+# Кожен процес один раз отримує свою частину і тримає її в пам'яті,
+# а змінені нотатки дозавантажуються перед наступним запитом.
+PARALLEL_MIN = 50000  # менші книги шукаються в одному процесі
+
+_shard = {}  # у процесі-обробнику: id -> (назва, текст, теги), у нижньому регістрі
+
+
+def _shard_init(rows):
+    _shard.clear()
+    _shard.update(rows)
+
+
+def _shard_update(changes):
+    for key, row in changes.items():
+        if row is None:
+            _shard.pop(key, None)
+        else:
+            _shard[key] = row
+
+
+def _shard_search(query_lower):
+    # те саме, що NotesBook.search, і в тому самому порядку
+    results = []
+    for key, (title, content, tags) in _shard.items():
+        matches = title.count(query_lower) + content.count(query_lower)
+        matches += sum(1 for tag in tags if query_lower in tag)
+        if matches:
+            results.append((-matches, int(key), key))
+    results.sort()
+    return results
+
+
+def _shard_tags(tags):
+    return [
+        (count, key)
+        for key, (_, _, note_tags) in _shard.items()
+        if (count := len(tags.intersection(note_tags)))
+    ]
+
+
+def _scan_row(note):
+    return note.title.lower(), note.content.lower(), note.tags
+
+
+class ShardedScan:
+    def __init__(self, notes, workers):
+        self.notes = notes
+        self.workers = workers
+        self.pools = []
+        self.changed = set()  # id нотаток, змінених після відправлення
+        self.reset()
+
+    def reset(self):
+        # Розіслати всі нотатки наново (після завантаження чужої версії книги)
+        self.close()
+        shards = [{} for _ in range(self.workers)]
+        for key, note in self.notes.data.items():
+            shards[int(key) % self.workers][key] = _scan_row(note)
+        # один процес на частину: завдання виконуються по черзі,
+        # тож оновлення завжди застосовується раніше за наступний запит
+        self.pools = [
+            ProcessPoolExecutor(1, initializer=_shard_init, initargs=(shard,))
+            for shard in shards
+        ]
+        self.changed = set()
+
+    def sync(self):
+        updates = [{} for _ in self.pools]
+        for key in self.changed:
+            note = self.notes.data.get(key)
+            updates[int(key) % self.workers][key] = None if note is None else _scan_row(note)
+        self.changed = set()
+        for pool, changes in zip(self.pools, updates):
+            if changes:
+                pool.submit(_shard_update, changes)
+
+    def map(self, func, *args):
+        if self.changed:
+            self.sync()
+        futures = [pool.submit(func, *args) for pool in self.pools]
+        return [future.result() for future in futures]
+
+    def search(self, query_lower):
+        return [(key, self.notes.data[key]) for _, _, key in merge(*self.map(_shard_search, query_lower))]
+
+    def search_by_tags(self, tags):
+        results = [item for part in self.map(_shard_tags, tags) for item in part]
+        results.sort(reverse=True)  # як у NotesBook.search_by_tags
+        return [(key, self.notes.data[key]) for _, key in results]
+
+    def close(self):
+        for pool in self.pools:
+            pool.shutdown(cancel_futures=True)
+        self.pools = []
+
+
+@instrumented
+def save_notes(notes, filename=None):
+    if isinstance(notes, SqliteNotesBook):
+        notes.db.commit()
+        return
+    if notes.journal is not None:
+        notes.journal.compact()
+        return
+    save_snapshot(notes, filename or notes.filename)
+
+@instrumented
+def load_notes(filename="notes.pkl", journal_file=None):
+    if filename.endswith(".db"):
+        return SqliteNotesBook(filename)
+    try:
+        with open(filename, "rb") as f:
+            notes = read_snapshot(f, filename)
+            notes._stamp = _file_stamp(f)
+        if _is_binary(filename):
+            pass  # next_id збережено у заголовку, ключі перебирати не треба
+        elif notes.data:
+            notes.next_id = max(map(int, notes.data.keys())) + 1
+        else:
+            notes.next_id = 1
+    except FileNotFoundError:
+        notes = NotesBook()
+    notes.filename = filename
+    notes._loaded_next_id = notes.next_id
+    if journal_file:
+        Journal(journal_file).open(notes, filename)
+    return notes
+
+
+# ==================== CLI Commands ====================
+
+@input_error
+def add_note(args, notes):
+    if len(args) < 2:
+        return "Usage: add-note <title> <content>"
+    title = args[0]
+    content = ' '.join(args[1:])
+    key = notes.add_note(title, content)
+    return f"Note '{title}' added with id {key}."
+
+@input_error
+def show_note(args, notes):
+    if len(args) != 1:
+        return "Usage: show-note <id>"
+    key = args[0]
+    if key in notes.data:
+        return f"{key}: {notes.data[key]}"
+    return "Note not found."
+
+@input_error
+def all_notes_func(args, notes):
+    page, size, after = parse_paging(args, "all-notes")
+    if after is not None and not after.isdigit():
+        raise ValueError("Usage: all-notes [--page N] [--size N] [--after ID]")
+    if not notes:
+        return "No notes found."
+    if page is None and size is None and after is None:
+        return (f"{key}: {note}" for key, note in notes.sorted_notes())
+    size = size or PAGE_SIZE
+    return paginate(
+        notes.sorted_notes(after, (page - 1) * size if page else 0),
+        lambda item: item[0], lambda item: f"{item[0]}: {item[1]}",
+        len(notes), page, size, "all-notes",
+    )
+
+@input_error
+def edit_note(args, notes):
+    if len(args) < 2:
+        return "Usage: edit-note <id> <new content>"
+    key = args[0]
+    if key not in notes.data:
+        return "Note not found."
+    new_content = ' '.join(args[1:])
+    notes.edit_note(key, new_content)
+    return "Note edited."
+
+@input_error
+def delete_note(args, notes):
+    if len(args) != 1:
+        return "Usage: delete-note <id>"
+    key = args[0]
+    if key not in notes.data:
+        return "Note not found."
+    notes.delete_note(key)
+    return "Note deleted."
+
+@input_error
+def find_notes(args, notes):
+    if not args:
+        return "Usage: find-notes <text>"
+    query = ' '.join(args)
+    found = notes.search(query)
+    if not found:
+        return "No matches."
+    return "\n".join([f"{key}: {note}" for key, note in found])
+
+@input_error
+def add_tag(args, notes):
+    if len(args) < 2:
+        return "Usage: add-tag <id> <tag1> [tag2]..."
+    key = args[0]
+    tags = args[1:]
+    if key not in notes.data:
+        return "Note not found."
+    for tag in tags:
+        notes.data[key].add_tag(tag)
+    return f"Tags added to note {key}: {', '.join(tags)}"
+
+@input_error
+def find_by_tag(args, notes):
+    if len(args) != 1:
+        return "Usage: find-by-tag <tag>"
+    results = notes.search_by_tags(args)
+    if not results:
+        return "No notes found with this tag."
+    return "\n".join([f"{key}: {note}" for key, note in results])
+
+@input_error
+def remove_tag(args, notes):
+    if len(args) != 2:
+        return "Usage: remove-tag <id> <tag>"
+    key, tag_to_remove = args
+    if key not in notes.data:
+        return "Note not found."
+    note = notes.data[key]
+    if note.remove_tag(tag_to_remove):
+        return f"Tag '#{tag_to_remove}' removed from note {key}."
+    return f"Tag '#{tag_to_remove}' not found in note {key}."
+
+
+@input_error
+def search_notes(args, notes):
+    # search-notes [--rank] [--top K] <query>
+    usage = "Usage: search-notes [--rank] [--top K] <query>"
+    rank, top = False, None
+    while args and args[0] in ("--rank", "--top"):
+        if args[0] == "--rank":
+            rank, args = True, args[1:]
+        elif len(args) > 1 and args[1].isdigit() and int(args[1]) > 0:
+            rank, top, args = True, int(args[1]), args[2:]
+        else:
+            return usage
+    if not args:
+        return usage
+    query = ' '.join(args)
+    if rank:
+        results = notes.rank(query, top or RANK_TOP)
+        if not results:
+            return f"No results for: '{query}'"
+        return "Best matches:\n" + "\n".join(f"{k}: {n}" for k, n in results)
+    results = notes.search(query)
+    if not results:
+        return f"No results for: '{query}'"
+    return "Search results:\n" + "\n".join(f"{k}: {n}" for k, n in results)
+
+
+RECENT_COUNT = 10  # скільки нотаток показує recent-notes без N
+
+
+def parse_time_filters(args):
+    # [--created|--modified] [--tag T]... [--text Q] у будь-якому місці команди;
+    # повертає (поле часу або None, теги, текст, решта аргументів)
+    field, tags, text, rest = None, [], None, []
+    args = iter(args)
+    for arg in args:
+        if arg in ("--created", "--modified"):
+            field = arg[2:]
+        elif arg in ("--tag", "--text"):
+            value = next(args, None)
+            if value is None:
+                raise ValueError(f"{arg} needs a value.")
+            if arg == "--tag":
+                tags.append(value.strip().lower())
+            else:
+                text = value.lower()
+        else:
+            rest.append(arg)
+    return field, tags, text, rest
+
+
+def _note_matches(note, tags, text):
+    if any(tag not in note.tags for tag in tags):
+        return False
+    return not text or (
+        text in note.title.lower() or text in note.content.lower() or any(text in tag for tag in note.tags)
+    )
+
+
+@input_error
+def notes_between(args, notes):
+    usage = "Usage: notes-between <from YYYY-MM-DD> <to YYYY-MM-DD> [--modified] [--tag T] [--text Q]"
+    try:
+        field, tags, text, rest = parse_time_filters(args)
+        if len(rest) != 2:
+            return usage
+        start, end = (to_timestamp(datetime.strptime(day, "%Y-%m-%d")) for day in rest)
+    except ValueError:
+        return usage
+    found = [
+        f"{key}: {note}" for key, note in notes.by_time(start, end, field or "created")
+        if _note_matches(note, tags, text)
+    ]
+    return "\n".join(found) if found else "No notes in this period."
+
+
+@input_error
+def recent_notes(args, notes):
+    # найновіші нотатки: індекс читається з кінця, доки не набереться N збігів
+    usage = "Usage: recent-notes [N] [--created] [--tag T] [--text Q]"
+    try:
+        field, tags, text, rest = parse_time_filters(args)
+    except ValueError:
+        return usage
+    if len(rest) > 1 or (rest and not rest[0].isdigit()):
+        return usage
+    count = int(rest[0]) if rest else RECENT_COUNT
+    matches = (
+        f"{key}: {note}" for key, note in notes.by_time(field=field or "modified", newest_first=True)
+        if _note_matches(note, tags, text)
+    )
+    found = list(islice(matches, count))
+    return "\n".join(found) if found else "No notes found."
+
+
+@input_error
+def filter_notes_by_tag(args, notes):
+    if not args:
+        return "Usage: filter-notes-by-tag <tag1> [+tag2] [-tag3] ..."
+    if any(arg.startswith(("+", "-")) for arg in args):
+        results = notes.filter_by_tags(args)
+        if not results:
+            return f"No notes match: {' '.join(args)}"
+    else:
+        results = notes.search_by_tags(args)
+    if not results:
+        return f"No notes with tags: {', '.join('#' + t for t in args)}"
+    return "Found by tags:\n" + "\n".join(f"{k}: {n}" for k, n in results)
+
+# <<< END OF NOTES MODULE ===========================================
+
+# ==================== ПОСТОРІНКОВИЙ ВИВІД ====================
+PAGE_SIZE = 50
+
+
+def encode_cursor(key):
+    # Курсор має бути одним словом команди: пробіли (і сам "%") кодуються як у URL
+    return re.sub(r"[\s%]", lambda m: quote(m.group(), safe=""), key)
+
+
+def parse_paging(args, command):
+    # [--page N] [--size N] [--after КУРСОР]
+    usage = f"Usage: {command} [--page N] [--size N] [--after CURSOR]"
+    options = {"--page": None, "--size": None, "--after": None}
+    if len(args) % 2:
+        raise ValueError(usage)
+    for flag, value in zip(args[::2], args[1::2]):
+        if flag not in options:
+            raise ValueError(usage)
+        options[flag] = value
+    page, size = options["--page"], options["--size"]
+    for value in (page, size):
+        if value is not None and (not value.isdigit() or int(value) < 1):
+            raise ValueError(usage)
+    return (
+        int(page) if page else None,
+        int(size) if size else None,
+        unquote(options["--after"]).lower() if options["--after"] else None,
+    )
+
+
+def paginate(items, cursor_of, render, total, page, size, command):
+    # Генератор рядків однієї сторінки; рядки створюються лише для неї
+    size = size or PAGE_SIZE
+    shown, last, more = 0, None, False
+    for item in items:
+        if shown == size:
+            more = True
+            break
+        yield render(item)
+        last = item
+        shown += 1
+    if not shown:
+        yield "Nothing to show on this page."
+        return
+    pages = (total + size - 1) // size
+    position = f"Page {page} of {pages}" if page else f"{shown} items"
+    footer = f"-- {position} ({total} total)."
+    if more:
+        footer += f" Next: {command} --after {encode_cursor(cursor_of(last))} --size {size}"
+    yield footer
+
+
+def print_result(result):
+    # Обробник може повернути рядок або ітератор рядків (потоковий вивід)
+    if isinstance(result, str):
+        print(result)
+    else:
+        for line in result:
+            print(line)
+
+
+def parse_input(user_input):
+    parts = user_input.strip().split()
+    if not parts:
+        return "", []
+    return parts[0].lower(), parts[1:]
+
+
+def lookup_contact(book, name, resolve=False):
+    # Точний пошук, а якщо імені немає — найближче з урахуванням помилок.
+    # resolve=True (команди лише для читання) одразу бере єдиний найближчий
+    # контакт; команди, що змінюють дані, лише підказують ім'я.
+    record = book.find(name)
+    if record is not None:
+        return record, ""
+    matches = book.find_closest(name)
+    if not matches:
+        raise KeyError(name)
+    if resolve and len(matches) == 1:
+        return matches[0], f"(showing {matches[0].name.value} for '{name}')\n"
+    names = ", ".join(r.name.value for r in matches)
+    raise ValueError(f"Contact not found. Did you mean {names}?")
+
+
+@input_error  #Рішення: дозволити створювати контакт без телефону 
+def add_contact(args, book: AddressBook):   
+    if len(args) < 1:
         return "Enter at least a name.\nExample: add <name> [phone1] [phone2]..."
 
     name = args[0]
@@ -378,129 +2517,1413 @@ def add_contact(args, book: AddressBook):
         else:
             return f"Invalid phone '{phone}': must be exactly 10 digits."
 
-    name_lower = name.lower()
-    record = book.find(name_lower)
+    name_lower = name.lower()
+    record = book.find(name_lower)
+
+    if record is None:
+        record = Record(name)
+        book.add_record(record)
+        message = "Contact added."
+    else:
+        message = f"Contact '{name}' already exists."
+
+    added_phones = []
+    for phone in valid_phones:
+        if any(p.value == phone for p in record.phones):
+            continue
+        record.add_phone(phone)
+        added_phones.append(phone)
+
+    if added_phones: 
+        return f"{message} Added phones: {', '.join(added_phones)}"
+    else:
+        return message + (" No new phones added." if valid_phones else "")  
+
+
+@input_error
+def change_contact(args, book: AddressBook):
+    if len(args) != 3:
+        return "Usage: change <name> <old_phone> <new_phone>"
+    name, old_phone, new_phone = args
+    record, _ = lookup_contact(book, name)
+    record.edit_phone(old_phone, new_phone)
+    return "Phone changed."
+
+
+@input_error
+def phone_contact(args, book: AddressBook):
+    if len(args) != 1:
+        return "Usage: phone <name>"
+    name = args[0]
+    record, note = lookup_contact(book, name, resolve=True)
+    if not record.phones:
+        return f"{note}{record.name.value} has no phones."
+    return f"{note}{record.name.value}: {'; '.join(p.value for p in record.phones)}"
+
+
+@input_error
+def find_contact(args, book: AddressBook):
+    if not args:
+        return "Usage: find <text>"
+    found = book.search(' '.join(args))
+    if not found:
+        return "No contacts found."
+    return "\n".join(str(r) for r in found)
+
+
+@input_error
+def owner_contact(args, book: AddressBook):
+    if len(args) != 1:
+        return "Usage: owner <phone|email>"
+    value = args[0]
+    found = book.find_by_email(value) if "@" in value else book.find_by_phone(value)
+    if not found:
+        return f"No contact with {value}."
+    return f"{value}: {', '.join(r.name.value for r in found)}"
+
+
+@input_error
+def unique_mode(args, book: AddressBook):
+    if len(args) > 1 or (args and args[0].lower() not in ("on", "off")):
+        return "Usage: unique [on|off]"
+    if args:
+        book.set_unique(args[0].lower() == "on")
+    return f"Unique phones/emails: {'on' if book.unique else 'off'}."
+
+
+@input_error
+def dedupe(args, book):
+    if args not in ([], ["--merge"]):
+        return "Usage: dedupe [--merge]"
+    groups = book.find_duplicates()
+    if not groups:
+        return "No duplicate contacts found."
+    if args:
+        for group in groups:
+            book.merge_contacts(group[0], group[1:])
+        return f"Merged {sum(len(g) - 1 for g in groups)} contacts into {len(groups)}."
+    lines = [f"Found {len(groups)} groups of likely duplicates (merge with 'dedupe --merge'):"]
+    for group in groups:
+        others = ", ".join(book.data[key].name.value for key in group[1:])
+        lines.append(f"  {book.data[group[0]].name.value} <- {others}")
+    return "\n".join(lines)
+
+
+@input_error
+def all_contacts(args, book: AddressBook):
+    page, size, after = parse_paging(args, "all")
+    if not book:
+        return "No contacts saved."
+    if page is None and size is None and after is None:
+        return (str(r) for r in book.sorted_records())
+    size = size or PAGE_SIZE
+    return paginate(
+        book.sorted_records(after, (page - 1) * size if page else 0),
+        lambda r: r.name.value.lower(), str, len(book), page, size, "all",
+    )
+
+@input_error
+def add_birthday(args, book):
+    if len(args) != 2:
+        return "Usage: add-birthday <name> <DD.MM.YYYY>"
+    name, birthday = args
+    record, _ = lookup_contact(book, name)
+    if record.birthday:
+        return f"Birthday already set for {record.name.value}: {record.birthday.value}"
+    record.add_birthday(birthday)
+    return "Birthday added."
+
+
+@input_error
+def show_birthday(args, book):
+    if len(args) != 1:
+        return "Usage: show-birthday <name>"
+    name = args[0]
+    record, note = lookup_contact(book, name, resolve=True)
+    if not record.birthday:
+        return f"{note}No birthday set for {record.name.value}."
+    return f"{note}{record.name.value}'s birthday: {record.birthday.value}"
+
+@input_error
+def birthdays(args, book):
+    if len(args) > 1 or (args and not args[0].isdigit()):
+        return "Usage: birthdays [days]"
+    days = int(args[0]) if args else 7
+    upcoming = book.get_upcoming_birthdays(days)
+    if not upcoming:
+        return f"No birthdays in the next {days} days."
+    lines = [f"{item['name']} — {item['congratulation_date']}" for item in upcoming]
+    return "Upcoming birthdays:\n" + "\n".join(lines)
+
+MONTH_NAMES = ("Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec")
+AGE_GROUP = 10  # ширина вікової групи у звіті
+
+
+def birthday_report(args, book):
+    if args:
+        return "Usage: birthday-report"
+    if np is None:
+        return "Birthday reports need NumPy: pip install numpy"
+    columns = book.birthday_columns()
+    if not len(columns):
+        return "No birthdays recorded."
+    today = datetime.today().date()
+    lines = [f"Birthdays known for {len(columns)} of {len(book)} contacts.", "By month:"]
+    lines += [f"  {name}  {count}" for name, count in zip(MONTH_NAMES, columns.month_histogram().tolist())]
+    lines.append("By age:")
+    lines += [
+        f"  {i * AGE_GROUP}-{i * AGE_GROUP + AGE_GROUP - 1}  {count}"
+        for i, count in enumerate(columns.age_histogram(today, AGE_GROUP).tolist()) if count
+    ]
+    lines.append(f"Congratulations in the next 30 days: {len(columns.upcoming(today, 30))}")
+    return "\n".join(lines)
+
+@input_error
+def add_address(args, book):
+    if len(args) < 2:
+        return "Usage: add-address <name> <address...>"
+    name = args[0]
+    address = ' '.join(args[1:])
+    record, _ = lookup_contact(book, name)
+    record.add_address(address)
+    return "Address added."
+
+@input_error
+def add_email(args, book):
+    if len(args) != 2:
+        return "Usage: add-email <name> <email>"
+    name, email = args
+    record, _ = lookup_contact(book, name)
+    record.add_email(email)
+    return "Email added."
+
+# ==================== ІМПОРТ / ЕКСПОРТ ====================
+# CSV або JSONL (за розширенням файлу). Файли читаються й пишуться потоково,
+# рядки перевіряються пачками по IMPORT_CHUNK, помилки збираються по рядках.
+
+IMPORT_CHUNK = 5000
+CONTACT_FIELDS = ("name", "phones", "birthday", "address", "emails")
+NOTE_FIELDS = ("id", "title", "content", "created_at", "tags", "modified_at")
+PHONE_RE = re.compile(r"[0-9]{10}")
+DATE_RE = re.compile(r"(\d{1,2})\.(\d{1,2})\.(\d{4})")
+MULTI_SEP = ";"  # роздільник кількох телефонів/email/тегів у CSV
+
+
+def _is_jsonl(filename):
+    return filename.lower().endswith((".jsonl", ".ndjson"))
+
+
+def read_rows(filename):
+    # Генератор пачок [(номер рядка, dict), ...]
+    with open(filename, newline="", encoding="utf-8") as f:
+        if _is_jsonl(filename):
+            rows = ((i, line) for i, line in enumerate(f, 1) if line.strip())
+        else:
+            rows = enumerate(csv.DictReader(f), 2)  # рядок 1 — заголовок
+        chunk = []
+        for line_no, row in rows:
+            if isinstance(row, str):
+                try:
+                    row = json.loads(row)
+                except ValueError as e:
+                    row = {"__error__": f"Invalid JSON: {e}"}
+                if not isinstance(row, dict):
+                    row = {"__error__": "Invalid JSON: expected an object"}
+            chunk.append((line_no, row))
+            if len(chunk) >= IMPORT_CHUNK:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+
+def write_rows(filename, fields, rows):
+    # rows — ітератор словників; у файл потрапляють по одному
+    count = 0
+    with open(filename, "w", newline="", encoding="utf-8") as f:
+        if _is_jsonl(filename):
+            for row in rows:
+                f.write(json.dumps(row, ensure_ascii=False) + "\n")
+                count += 1
+        else:
+            writer = csv.DictWriter(f, fieldnames=fields)
+            writer.writeheader()
+            for row in rows:
+                writer.writerow({k: MULTI_SEP.join(v) if isinstance(v, list) else v for k, v in row.items()})
+                count += 1
+    return count
+
+
+def _multi(value):
+    if value is None:
+        return []
+    if isinstance(value, list):
+        items = [str(v).strip() for v in value]
+    else:
+        items = [v.strip() for v in str(value).split(MULTI_SEP)]
+    return list(dict.fromkeys(v for v in items if v))
+
+
+def _text(value):
+    return str(value).strip() if value is not None else ""
+
+
+def validate_contacts(chunk):
+    # Пачка рядків -> (записи, помилки). Дати розбираються один раз на
+    # унікальне значення, телефони й email — скомпільованими регулярками.
+    records, errors = [], []
+    dates = {}
+    for line_no, row in chunk:
+        if "__error__" in row:
+            errors.append((line_no, row["__error__"]))
+            continue
+        name = _text(row.get("name"))
+        if not name:
+            errors.append((line_no, "Name is required."))
+            continue
+        phones = _multi(row.get("phones"))
+        bad = [p for p in phones if not PHONE_RE.fullmatch(p)]
+        if bad:
+            errors.append((line_no, f"Invalid phone '{bad[0]}': must be exactly 10 digits."))
+            continue
+        emails = list(dict.fromkeys(e.lower() for e in _multi(row.get("emails"))))
+        bad = [e for e in emails if not Email.regex.match(e)]
+        if bad:
+            errors.append((line_no, f"Invalid email '{bad[0]}'."))
+            continue
+        birthday = _text(row.get("birthday"))
+        ordinal = None
+        if birthday:
+            if birthday not in dates:
+                match = DATE_RE.fullmatch(birthday)
+                try:
+                    dates[birthday] = date(int(match[3]), int(match[2]), int(match[1])).toordinal() if match else None
+                except ValueError:
+                    dates[birthday] = None
+            ordinal = dates[birthday]
+            if ordinal is None:
+                errors.append((line_no, "Invalid date format. Use DD.MM.YYYY"))
+                continue
+        address = _text(row.get("address")) or None
+        records.append((line_no, Record.from_values(name, phones, ordinal, address, emails)))
+    return records, errors
+
+
+def validate_notes(chunk):
+    notes, errors = [], []
+    stamps = {}
+    for line_no, row in chunk:
+        if "__error__" in row:
+            errors.append((line_no, row["__error__"]))
+            continue
+        title = _text(row.get("title"))
+        if not title:
+            errors.append((line_no, "Title is required."))
+            continue
+        note = Note(title, _text(row.get("content")))
+        invalid = None
+        for field, attr in (("created_at", "created"), ("modified_at", "modified")):
+            value = _text(row.get(field))
+            if not value:
+                continue
+            if value not in stamps:
+                try:
+                    stamps[value] = to_timestamp(datetime.strptime(value, NOTE_TIME_FORMAT))
+                except ValueError:
+                    stamps[value] = None
+            if stamps[value] is None:
+                invalid = field
+                break
+            setattr(note, attr, stamps[value])
+        if invalid:
+            errors.append((line_no, f"Invalid {invalid}. Use YYYY-MM-DD HH:MM:SS"))
+            continue
+        if not _text(row.get("modified_at")):
+            note.modified = note.created
+        note.tags = tuple(dict.fromkeys(t.lower() for t in _multi(row.get("tags"))))
+        notes.append((line_no, note))
+    return notes, errors
+
+
+def _import(filename, validate, add, journal=None):
+    # Рядки імпорту не пишуться в журнал по одному (інакше кожні COMPACT_EVERY
+    # рядків — повний знімок посеред імпорту): наприкінці книга зберігається один раз
+    book = journal.book if journal is not None else None
+    if book is not None:
+        book.journal = None
+        generation = book.generation
+    imported, errors = 0, []
+    try:
+        for chunk in read_rows(filename):
+            items, chunk_errors = validate(chunk)
+            errors += chunk_errors
+            added, add_errors = add(items)
+            imported += added
+            errors += add_errors
+    except (UnicodeDecodeError, csv.Error) as e:
+        # файл не UTF-8 або зіпсований CSV: уже додані рядки лишаються в книзі
+        raise ValueError(f"Cannot read {filename}: {e}. Rows imported before the error: {imported}.") from e
+    finally:
+        if book is not None:
+            book.journal = journal
+            if book.generation != generation:
+                journal.compact()
+    errors.sort()
+    return imported, errors
+
+
+# ==================== ЖУРНАЛ ЗМІН ====================
+# Кожна зміна книги дописується одним рядком JSON: [номер, операція, аргументи...].
+# Після COMPACT_EVERY записів книга зберігається у знімок (.pkl або .snap), а журнал очищується.
+
+class FileLock:
+    # Рекомендаційне блокування через окремий файл <name>.lock,
+    # щоб не заважати читанню й атомарній заміні самого файлу
+
+    def __init__(self, filename):
+        self.filename = filename + ".lock"
+        self.file = None
+
+    def acquire(self, blocking=True):
+        self.file = open(self.filename, "a+b")
+        while True:
+            try:
+                if fcntl is not None:
+                    fcntl.flock(self.file.fileno(), fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+                else:
+                    self.file.seek(0)
+                    msvcrt.locking(self.file.fileno(), msvcrt.LK_NBLCK, 1)
+                return True
+            except OSError:
+                if not blocking:
+                    self.file.close()
+                    self.file = None
+                    return False
+                time.sleep(0.05)
+
+    def release(self):
+        if self.file is not None:
+            self.file.close()  # закриття файлу знімає блокування
+            self.file = None
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+class Journal:
+    COMPACT_EVERY = 1000
+
+    def __init__(self, filename, compact_every=None):
+        self.filename = filename
+        self.compact_every = compact_every or self.COMPACT_EVERY
+        self.book = None
+        self.snapshot = None
+        self.seq = 0
+        self.size = 0  # записів після останнього знімка
+        self.file = None
+        self.lock = FileLock(filename)
+
+    def open(self, book, snapshot):
+        # Журнал веде лише один процес. Інші лише читають його записи
+        # і зберігають свої зміни знімком під час виходу.
+        owner = self.lock.acquire(blocking=False)
+        self.book = book
+        self.snapshot = snapshot
+        self.seq = book.journal_seq
+        good_end = 0
+        try:
+            with open(self.filename, "rb") as f:
+                for line in f:
+                    try:
+                        seq, op, *args = json.loads(line)
+                    except ValueError:
+                        break  # недописаний останній рядок після збою
+                    good_end += len(line)
+                    if seq <= self.seq:
+                        continue  # вже є у знімку
+                    book._apply(op, args)
+                    self.seq = seq
+                    self.size += 1
+        except FileNotFoundError:
+            pass
+        if not owner:
+            # ці записи збереже власник журналу, а не ми
+            book.journal_seq = self.seq
+            book._mark_saved()
+            return
+        self.file = open(self.filename, "a", encoding="utf-8")
+        self.file.truncate(good_end)
+        book.journal = self
+
+    def append(self, op, args):
+        self.seq += 1
+        self.file.write(json.dumps([self.seq, op, *args], ensure_ascii=False) + "\n")
+        self.file.flush()
+        self.size += 1
+        if self.size >= self.compact_every:
+            self.compact()
+
+    def compact(self):
+        self.book.journal_seq = self.seq
+        save_snapshot(self.book, self.snapshot)
+        self.truncate()
+
+    def truncate(self):
+        # усі записи вже у знімку
+        self.file.seek(0)
+        self.file.truncate()
+        self.size = 0
+
+    def close(self):
+        self.file.close()
+        self.lock.release()
+        self.book.journal = None
+
+
+def write_snapshot(obj, filename):
+    # Спершу у тимчасовий файл, потім атомарна заміна: збій не зіпсує знімок
+    tmp = filename + ".tmp"
+    with open(tmp, "wb") as f:
+        if _is_binary(filename):
+            f.write(encode_snapshot(obj))
+        else:
+            pickle.dump(obj, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, filename)
+
+
+def write_bytes(data, filename):
+    # Те саме для вже серіалізованого знімка
+    tmp = filename + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, filename)
+
+
+def _file_stamp(f):
+    # Відбиток файлу: os.replace змінює inode, запис — розмір і mtime
+    st = os.fstat(f.fileno())
+    return st.st_ino, st.st_size, st.st_mtime_ns
+
+
+def _path_stamp(filename):
+    try:
+        with open(filename, "rb") as f:
+            return _file_stamp(f)
+    except FileNotFoundError:
+        return None
+
+
+def save_snapshot(book, filename):
+    # Збереження під блокуванням. Якщо після нашого завантаження файл
+    # перезаписав інший процес, зливаємо з його версією лише наші зміни.
+    # Незмінену книгу, файл якої ніхто не чіпав, не переписуємо.
+    if (book.generation == book._saved_generation and book._stamp is not None
+            and _path_stamp(filename) == book._stamp):
+        return
+    with FileLock(filename):
+        try:
+            with open(filename, "rb") as f:
+                disk = read_snapshot(f, filename) if _file_stamp(f) != book._stamp else None
+        except FileNotFoundError:
+            disk = None
+        if disk is not None and disk.version != book.version:
+            book._merge_into(disk)
+            book.__setstate__(disk.__getstate__())
+            book.generation += 1  # тепер у книзі і чужі зміни
+        book.version += 1
+        write_snapshot(book, filename)
+        with open(filename, "rb") as f:
+            book._stamp = _file_stamp(f)
+        book._mark_saved()
+
+
+# ==================== БІНАРНІ ЗНІМКИ ====================
+# Формат .snap: заголовок, рядки фіксованої ширини (рядок i лежить за зсувом
+# SNAPSHOT_HEADER.size + i * ROW.size) і таблиця рядків UTF-8, на яку рядки
+# посилаються парами (зсув, довжина). Контакти впорядковані за ключем, нотатки —
+# за id, тож один запис знаходиться бінарним пошуком по mmap без читання решти.
+SNAPSHOT_EXT = ".snap"
+SNAPSHOT_FORMAT = 2  # версія формату; файли новішої версії не читаємо
+CONTACTS_MAGIC = b"PABK"
+NOTES_MAGIC = b"PANB"
+FLAG_UNIQUE = 1
+
+# magic, версія формату, прапорці, кількість рядків, version, journal_seq, next_id,
+# зсув таблиці рядків
+SNAPSHOT_HEADER = struct.Struct("<4sHHQQQQQ")
+# ім'я, телефони, адреса, email через "\n" — (зсув, довжина); ordinal дня народження або 0
+CONTACT_ROW = struct.Struct("<8Ii")
+# id, час створення, час зміни; назва, текст, теги через "\n" — (зсув, довжина)
+NOTE_ROW = struct.Struct("<Iqq6I")
+NOTE_ROW_V1 = struct.Struct("<Iq6I")  # формат 1: без часу зміни
+NOTE_ID = struct.Struct("<I")
+
+
+def _is_binary(filename):
+    return filename.endswith(SNAPSHOT_EXT)
+
+
+class StringTable:
+    # Однакові рядки (міста, набори тегів) зберігаються один раз
+
+    def __init__(self):
+        self.refs = {}
+        self.parts = []
+        self.size = 0
+
+    def add(self, text):
+        ref = self.refs.get(text)
+        if ref is None:
+            data = text.encode("utf-8")
+            ref = self.refs[text] = (self.size, len(data))
+            self.parts.append(data)
+            self.size += len(data)
+        return ref
+
+
+def encode_snapshot(book):
+    # mmap старого файлу закривається до його заміни (на Windows інакше не вийде)
+    book._materialize()
+    strings = StringTable()
+    rows = bytearray()
+    if isinstance(book, NotesBook):
+        magic, flags, next_id = NOTES_MAGIC, 0, book.next_id
+        for note_id in book._ids:
+            note = book.data[str(note_id)]
+            rows += NOTE_ROW.pack(
+                note_id, note.created, note.modified, *strings.add(note.title), *strings.add(note.content),
+                *strings.add("\n".join(note.tags)),
+            )
+    else:
+        magic, flags, next_id = CONTACTS_MAGIC, FLAG_UNIQUE if book.unique else 0, 0
+        for key in book._sorted_keys:
+            record = book.data[key]
+            rows += CONTACT_ROW.pack(
+                *strings.add(record._name), *strings.add(record._phones),
+                *strings.add(record._address or ""), *strings.add("\n".join(record._emails)),
+                record._birthday or 0,
+            )
+    header = SNAPSHOT_HEADER.pack(
+        magic, SNAPSHOT_FORMAT, flags, len(book.data), book.version, book.journal_seq,
+        next_id, SNAPSHOT_HEADER.size + len(rows),
+    )
+    return b"".join([header, rows, *strings.parts])
+
+
+class MappedRows(Mapping):
+    # Заміна book.data для книги з бінарного знімка. Рядок декодується з mmap
+    # лише при зверненні і запам'ятовується, щоб зміни об'єкта не загубились.
+    # Перша зміна книги (або запит до її індексів) декодує все — див. _materialize.
+    ROW = None
+
+    def __init__(self, book, mm, count, strings):
+        self.book = book
+        self.mm = mm
+        self.count = count
+        self.strings = strings  # зсув таблиці рядків
+        self.loaded = {}
+
+    def _row(self, i):
+        return self.ROW.unpack_from(self.mm, SNAPSHOT_HEADER.size + i * self.ROW.size)
+
+    def _text(self, offset, length):
+        start = self.strings + offset
+        return str(self.mm[start:start + length], "utf-8")
+
+    def _bisect(self, target, key_at):
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if key_at(mid) < target:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo if lo < self.count and key_at(lo) == target else None
+
+    def __getitem__(self, key):
+        item = self.loaded.get(key)
+        if item is None:
+            i = self._find(key)
+            if i is None:
+                raise KeyError(key)
+            item = self.loaded[key] = self._decode(i, key)
+        return item
+
+    def __contains__(self, key):
+        return key in self.loaded or self._find(key) is not None
+
+    def __iter__(self):
+        for i in range(self.count):
+            yield self._key(i)
+
+    def __len__(self):
+        return self.count
+
+    def items(self):
+        # по порядку рядків, без бінарного пошуку для кожного ключа
+        for i in range(self.count):
+            key = self._key(i)
+            item = self.loaded.get(key)
+            if item is None:
+                item = self.loaded[key] = self._decode(i, key)
+            yield key, item
+
+    def values(self):
+        for _, item in self.items():
+            yield item
+
+    def close(self):
+        self.loaded = {}
+        self.mm.close()
+
+
+class MappedRecords(MappedRows):
+    ROW = CONTACT_ROW
+
+    def _key(self, i):
+        return self._text(*self._row(i)[0:2]).lower()
+
+    def _find(self, key):
+        return self._bisect(key, self._key)
+
+    def _decode(self, i, key):
+        row = self._row(i)
+        record = Record(self._text(row[0], row[1]))
+        record._phones = self._text(row[2], row[3])
+        record._address = self._text(row[4], row[5]) or None
+        emails = self._text(row[6], row[7])
+        record._emails = tuple(emails.split("\n")) if emails else ()
+        record._birthday = row[8] or None
+        record._book = self.book
+        return record
+
+
+class MappedNotes(MappedRows):
+    ROW = NOTE_ROW
+
+    def _id(self, i):
+        return NOTE_ID.unpack_from(self.mm, SNAPSHOT_HEADER.size + i * self.ROW.size)[0]
 
-    if record is None:
-        record = Record(name)
-        book.add_record(record)
-        message = "Contact added."
-    else:
-        message = f"Contact '{name}' already exists."
+    def _key(self, i):
+        return str(self._id(i))
 
-    added_phones = []
-    for phone in valid_phones:
-        if any(p.value == phone for p in record.phones):
-            continue
-        record.add_phone(phone)
-        added_phones.append(phone)
+    def _find(self, key):
+        note_id = _note_id(key)
+        return None if note_id is None else self._bisect(note_id, self._id)
 
-    if added_phones: 
-        return f"{message} Added phones: {', '.join(added_phones)}"
+    def _decode(self, i, key):
+        row = self._row(i)
+        if self.ROW is NOTE_ROW_V1:
+            row = row[:2] + row[1:]  # час зміни = час створення
+        note = object.__new__(Note)
+        note.created, note.modified = row[1], row[2]
+        note.title = self._text(row[3], row[4])
+        note.content = self._text(row[5], row[6])
+        tags = self._text(row[7], row[8])
+        note.tags = tuple(tags.split("\n")) if tags else ()
+        note._book = self.book
+        note._key = key
+        return note
+
+
+def decode_snapshot(f):
+    # Книга, яка читає записи з файлу f на вимогу; f можна закрити одразу
+    mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    if len(mm) < SNAPSHOT_HEADER.size or mm[:4] not in (CONTACTS_MAGIC, NOTES_MAGIC):
+        mm.close()
+        raise ValueError(f"{f.name} is not a snapshot file.")
+    magic, fmt, flags, count, version, journal_seq, next_id, strings = SNAPSHOT_HEADER.unpack_from(mm)
+    if fmt > SNAPSHOT_FORMAT:
+        mm.close()
+        raise ValueError(f"{f.name} was written by a newer version (format {fmt}).")
+    if magic == NOTES_MAGIC:
+        book = NotesBook()
+        book.next_id = next_id
+        book.data = MappedNotes(book, mm, count, strings)
+        if fmt == 1:
+            book.data.ROW = NOTE_ROW_V1
     else:
-        return message + (" No new phones added." if valid_phones else "")  
+        book = AddressBook()
+        book.unique = bool(flags & FLAG_UNIQUE)
+        book.data = MappedRecords(book, mm, count, strings)
+    book.version = version
+    book.journal_seq = journal_seq
+    for name in book.INDEXES:
+        del book.__dict__[name]  # будуються при першому зверненні
+    return book
 
 
-@input_error
-def change_contact(args, book: AddressBook):
-    if len(args) != 3:
-        return "Usage: change <name> <old_phone> <new_phone>"
-    name, old_phone, new_phone = args
-    record = book.find(name)
-    if not record:
-        raise KeyError
-    record.edit_phone(old_phone, new_phone)
-    return "Phone changed."
+def read_snapshot(f, filename):
+    return decode_snapshot(f) if _is_binary(filename) else pickle.load(f)
 
 
-@input_error
-def phone_contact(args, book: AddressBook):
-    if len(args) != 1:
-        return "Usage: phone <name>"
-    name = args[0]
-    record = book.find(name)
-    if not record:
-        raise KeyError
-    if not record.phones:
-        return f"{record.name.value} has no phones."
-    return f"{record.name.value}: {'; '.join(p.value for p in record.phones)}"
+def dump_snapshot(book, filename):
+    return encode_snapshot(book) if _is_binary(filename) else pickle.dumps(book)
 
 
-@input_error
-def all_contacts(args, book: AddressBook):
-    if not book:
-        return "No contacts saved."
-    sorted_records = sorted(book.data.values(), key=lambda r: r.name.value.lower())
-    return "\n".join(str(r) for r in sorted_records)
+def snapshot_file(name):
+    # name.snap, якщо книгу вже перетворено (--convert), інакше name.pkl
+    binary = name + SNAPSHOT_EXT
+    return binary if os.path.exists(binary) else name + ".pkl"
 
-@input_error
-def add_birthday(args, book):
-    if len(args) != 2:
-        return "Usage: add-birthday <name> <DD.MM.YYYY>"
-    name, birthday = args
-    record = book.find(name)
-    if not record:
-        raise KeyError
-    if record.birthday:
-        return f"Birthday already set for {record.name.value}: {record.birthday.value}"
-    record.add_birthday(birthday)
-    return "Birthday added."
 
+def convert_snapshot(source, target):
+    # Між .pkl і .snap в обидва боки; journal_seq переноситься, тож журнал лишається дійсним
+    with open(source, "rb") as f:
+        book = read_snapshot(f, source)
+    with FileLock(target):
+        write_snapshot(book, target)
+    return book
 
-@input_error
-def show_birthday(args, book):
-    if len(args) != 1:
-        return "Usage: show-birthday <name>"
-    name = args[0]
-    record = book.find(name)
-    if not record:
-        raise KeyError
-    if not record.birthday:
-        return f"No birthday set for {record.name.value}."
-    return f"{record.name.value}'s birthday: {record.birthday.value}"
 
-@input_error
-def birthdays(args, book):
-    upcoming = book.get_upcoming_birthdays()
-    if not upcoming:
-        return "No birthdays in the next 7 days."
-    lines = [f"{item['name']} — {item['congratulation_date']}" for item in upcoming]
-    return "Upcoming birthdays:\n" + "\n".join(lines)
+def _import_report(kind, imported, errors, limit=10):
+    lines = [f"Imported {imported} {kind}." + (f" {len(errors)} rows skipped:" if errors else "")]
+    lines += [f"  line {line_no}: {message}" for line_no, message in errors[:limit]]
+    if len(errors) > limit:
+        lines.append(f"  ... and {len(errors) - limit} more")
+    return "\n".join(lines)
+
 
 @input_error
-def add_address(args, book):
-    if len(args) < 2:
-        return "Usage: add-address <name> <address...>"
-    name = args[0]
-    address = ' '.join(args[1:])
-    record = book.find(name)
-    if not record:
-        raise KeyError("Contact not found.")
-    record.add_address(address)
-    return "Address added."
+def import_data(args, book, notes):
+    if len(args) != 2 or args[0] not in ("contacts", "notes"):
+        return "Usage: import <contacts|notes> <file.csv|file.jsonl>"
+    kind, filename = args
+    target = book if kind == "contacts" else notes
+    try:
+        imported, errors = target.import_file(filename)
+    except OSError as e:
+        return f"Error: {e}"
+    return _import_report(kind, imported, errors)
+
 
 @input_error
-def add_email(args, book):
-    if len(args) != 2:
-        return "Usage: add-email <name> <email>"
-    name, email = args
-    record = book.find(name)
-    if not record:
-        raise KeyError("Contact not found.")
-    record.add_email(email)
-    return "Email added."
+def export_data(args, book, notes):
+    if len(args) != 2 or args[0] not in ("contacts", "notes"):
+        return "Usage: export <contacts|notes> <file.csv|file.jsonl>"
+    kind, filename = args
+    target = book if kind == "contacts" else notes
+    try:
+        count = target.export_file(filename)
+    except OSError as e:
+        return f"Error: {e}"
+    return f"Exported {count} {kind} to {filename}."
+
 
-def save_data(book, filename="addressbook.pkl"):
-    with open(filename, "wb") as f:
-        pickle.dump(book, f)
+@instrumented
+def save_data(book, filename=None):
+    if isinstance(book, SqliteAddressBook):
+        book.db.commit()
+        return
+    if book.journal is not None:
+        book.journal.compact()
+        return
+    save_snapshot(book, filename or book.filename)
 
-def load_data(filename="addressbook.pkl"):
+@instrumented
+def load_data(filename="addressbook.pkl", journal_file=None):
+    if filename.endswith(".db"):
+        return SqliteAddressBook(filename)
     try:
         with open(filename, "rb") as f:
-            return pickle.load(f)
+            book = read_snapshot(f, filename)
+            book._stamp = _file_stamp(f)
     except FileNotFoundError:
-        return AddressBook()  # Нова книга, якщо файл не існує
-    
+        book = AddressBook()  # Нова книга, якщо файл не існує
+    book.filename = filename
+    if journal_file:
+        Journal(journal_file).open(book, filename)
+    return book
+
+# >>> START OF SQLITE STORAGE =======================================
+# Необов'язкове сховище: книги працюють поверх файлу SQLite, а Record/Note
+# створюються лише тоді, коли до них звертаються.
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS contacts (
+    key TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    birthday TEXT,
+    bmonth INTEGER,
+    bday INTEGER,
+    address TEXT
+);
+CREATE INDEX IF NOT EXISTS contacts_birthday ON contacts (bmonth, bday);
+CREATE TABLE IF NOT EXISTS phones (key TEXT NOT NULL, pos INTEGER NOT NULL, phone TEXT NOT NULL);
+CREATE INDEX IF NOT EXISTS phones_key ON phones (key);
+CREATE INDEX IF NOT EXISTS phones_phone ON phones (phone);
+CREATE TABLE IF NOT EXISTS emails (key TEXT NOT NULL, pos INTEGER NOT NULL, email TEXT NOT NULL);
+CREATE INDEX IF NOT EXISTS emails_key ON emails (key);
+CREATE INDEX IF NOT EXISTS emails_email ON emails (email);
+CREATE TABLE IF NOT EXISTS contact_tokens (token TEXT NOT NULL, key TEXT NOT NULL);
+CREATE INDEX IF NOT EXISTS contact_tokens_token ON contact_tokens (token);
+CREATE INDEX IF NOT EXISTS contact_tokens_key ON contact_tokens (key);
+CREATE TABLE IF NOT EXISTS notes (
+    id INTEGER PRIMARY KEY,
+    title TEXT NOT NULL,
+    content TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    modified_at TEXT
+);
+CREATE TABLE IF NOT EXISTS note_tags (id INTEGER NOT NULL, pos INTEGER NOT NULL, tag TEXT NOT NULL);
+CREATE INDEX IF NOT EXISTS note_tags_id ON note_tags (id);
+CREATE INDEX IF NOT EXISTS note_tags_tag ON note_tags (tag);
+"""
+
+
+def connect_sqlite(filename):
+    db = sqlite3.connect(filename)
+    db.execute("PRAGMA journal_mode=WAL")
+    db.executescript(SQLITE_SCHEMA)
+    if "modified_at" not in {row[1] for row in db.execute("PRAGMA table_info(notes)")}:
+        # база, створена до появи часу зміни
+        db.execute("ALTER TABLE notes ADD COLUMN modified_at TEXT")
+        db.execute("UPDATE notes SET modified_at = created_at")
+    db.execute("CREATE INDEX IF NOT EXISTS notes_created ON notes (created_at, id)")
+    db.execute("CREATE INDEX IF NOT EXISTS notes_modified ON notes (modified_at, id)")
+    db.create_function("py_lower", 1, lambda text: text.lower(), deterministic=True)
+    try:
+        # trigram дає пошук підрядків; у таблицю пишемо вже str.lower() тексти
+        db.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS notes_fts "
+            "USING fts5(title, content, tags, tokenize='trigram case_sensitive 1')"
+        )
+    except sqlite3.OperationalError:
+        pass  # SQLite без FTS5 або без trigram — шукаємо звичайним запитом
+    db.commit()
+    return db
+
+
+def _has_fts(db):
+    row = db.execute("SELECT 1 FROM sqlite_master WHERE name = 'notes_fts'").fetchone()
+    return row is not None
+
+
+SQL_BATCH = 500  # рядків за один запит при посторінковому читанні
+
+
+class SqliteRecords(MutableMapping):
+    # Заміна book.data: записи читаються з бази на вимогу.
+    # Поки на Record є посилання, повторне звернення повертає той самий об'єкт.
+
+    def __init__(self, book):
+        self.book = book
+        self.db = book.db
+        self.cache = WeakValueDictionary()
+
+    def __getitem__(self, key):
+        record = self.cache.get(key)
+        if record is not None:
+            return record
+        row = self.db.execute(
+            "SELECT name, birthday, address FROM contacts WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            raise KeyError(key)
+        name, birthday, address = row
+        phones = [p for (p,) in self.db.execute(
+            "SELECT phone FROM phones WHERE key = ? ORDER BY pos", (key,))]
+        emails = [e for (e,) in self.db.execute(
+            "SELECT email FROM emails WHERE key = ? ORDER BY pos", (key,))]
+        record = record_from_row([name, phones, birthday, address, emails])
+        record._book = self.book
+        self.cache[key] = record
+        return record
+
+    def load(self, keys):
+        # Записи для списку ключів: по три запити на SQL_BATCH ключів, а не на кожен запис
+        found = {key: record for key in keys if (record := self.cache.get(key)) is not None}
+        missing = [key for key in keys if key not in found]
+        for i in range(0, len(missing), SQL_BATCH):
+            part = missing[i:i + SQL_BATCH]
+            marks = ",".join("?" * len(part))
+            rows = {
+                key: [name, [], birthday, address, []]
+                for key, name, birthday, address in self.db.execute(
+                    f"SELECT key, name, birthday, address FROM contacts WHERE key IN ({marks})", part)
+            }
+            for column, table, field in ((1, "phones", "phone"), (4, "emails", "email")):
+                for key, value in self.db.execute(
+                        f"SELECT key, {field} FROM {table} WHERE key IN ({marks}) ORDER BY key, pos", part):
+                    rows[key][column].append(value)
+            for key, (name, phones, birthday, address, emails) in rows.items():
+                # у базі лише перевірені значення, тож без повторних перевірок Record
+                if birthday:
+                    day, month, year = map(int, birthday.split("."))
+                    birthday = date(year, month, day).toordinal()
+                record = found[key] = Record.from_values(name, phones, birthday, address, emails)
+                record._book = self.book
+                self.cache[key] = record
+        return [found[key] for key in keys]
+
+    def __setitem__(self, key, record):
+        self.store(key, record)
+        self.cache[key] = record
+
+    def store(self, key, record):
+        bday = record.birthday.to_date() if record.birthday else None
+        self.db.execute(
+            "INSERT OR REPLACE INTO contacts (key, name, birthday, bmonth, bday, address) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                key,
+                record.name.value,
+                record.birthday.value if record.birthday else None,
+                bday.month if bday else None,
+                bday.day if bday else None,
+                record.address.value if record.address else None,
+            ),
+        )
+        self.db.execute("DELETE FROM phones WHERE key = ?", (key,))
+        self.db.executemany(
+            "INSERT INTO phones (key, pos, phone) VALUES (?, ?, ?)",
+            [(key, i, p.value) for i, p in enumerate(record.phones)],
+        )
+        self.db.execute("DELETE FROM emails WHERE key = ?", (key,))
+        self.db.executemany(
+            "INSERT INTO emails (key, pos, email) VALUES (?, ?, ?)",
+            [(key, i, e.value) for i, e in enumerate(record.emails)],
+        )
+        self.store_tokens(key, record)
+
+    def store_tokens(self, key, record):
+        # ті самі токени, що й у TokenIndex книги в пам'яті
+        self.db.execute("DELETE FROM contact_tokens WHERE key = ?", (key,))
+        self.db.executemany(
+            "INSERT INTO contact_tokens (token, key) VALUES (?, ?)",
+            [(token, key) for token in set(_contact_tokens(record))],
+        )
+
+    def __delitem__(self, key):
+        if key not in self:
+            raise KeyError(key)
+        self.db.execute("DELETE FROM contacts WHERE key = ?", (key,))
+        self.db.execute("DELETE FROM phones WHERE key = ?", (key,))
+        self.db.execute("DELETE FROM emails WHERE key = ?", (key,))
+        self.db.execute("DELETE FROM contact_tokens WHERE key = ?", (key,))
+        record = self.cache.pop(key, None)
+        if record is not None:
+            record._book = None
+
+    def __contains__(self, key):
+        row = self.db.execute("SELECT 1 FROM contacts WHERE key = ?", (key,)).fetchone()
+        return row is not None
+
+    def __iter__(self):
+        for (key,) in self.db.execute("SELECT key FROM contacts ORDER BY rowid").fetchall():
+            yield key
+
+    def __len__(self):
+        return self.db.execute("SELECT count(*) FROM contacts").fetchone()[0]
+
+
+class SqliteAddressBook(AddressBook):
+    def __init__(self, filename="addressbook.db"):
+        super().__init__()
+        self.filename = filename
+        self.db = connect_sqlite(filename)
+        self.autocommit = True
+        self.data = SqliteRecords(self)
+        if self.db.execute("SELECT 1 FROM contact_tokens LIMIT 1").fetchone() is None:
+            # база, створена до появи таблиці токенів
+            for key in self.data:
+                self.data.store_tokens(key, self.data[key])
+            self.db.commit()
+
+    def __setitem__(self, key, record):
+        self._check_unique(record, [p.value for p in record.phones], [e.value for e in record.emails], key)
+        if key in self.data:
+            del self[key]
+        record._book = self
+        self.data[key] = record
+        if self._names is not None:
+            self._names.add(key)
+        self._commit()
+
+    def __delitem__(self, key):
+        del self.data[key]
+        if self._names is not None:
+            self._names.discard(key)
+        self._commit()
+
+    def __getstate__(self):
+        raise TypeError("SqliteAddressBook is stored in its database, not pickled.")
+
+    def sorted_records(self, after=None, offset=0):
+        # Ключі читаються пачками по первинному ключу; offset — лише для першої пачки
+        after = "" if after is None else after
+        while True:
+            keys = [k for (k,) in self.db.execute(
+                "SELECT key FROM contacts WHERE key > ? ORDER BY key LIMIT ? OFFSET ?",
+                (after, SQL_BATCH, offset),
+            ).fetchall()]
+            for key in keys:
+                yield self.data[key]
+            if len(keys) < SQL_BATCH:
+                return
+            after, offset = keys[-1], 0
+
+    def _commit(self):
+        # викликається після кожної зміни
+        self.generation += 1
+        if self.autocommit:
+            self.db.commit()
+
+    def _record_changed(self, record, op, *args):
+        self.data.store(record.name.value.lower(), record)
+        self._commit()
+
+    def add_records(self, items):
+        added, errors = 0, []
+        for line_no, record in items:
+            key = record.name.value.lower()
+            if key in self.data:
+                errors.append((line_no, f"Contact '{record.name.value}' already exists."))
+                continue
+            try:
+                self._check_unique(record, [p.value for p in record.phones], [e.value for e in record.emails])
+            except ValueError as e:
+                errors.append((line_no, str(e)))
+                continue
+            self.data.store(key, record)
+            if self._names is not None:
+                self._names.add(key)
+            added += 1
+        self.generation += 1
+        self.db.commit()
+        return added, errors
+
+    def birthday_columns(self):
+        # змін у базі не відстежуємо по одній, тож стовпці перебудовуються після будь-якої
+        if self._columns is None or self._columns.generation != self.generation:
+            rows = self.db.execute("SELECT key, birthday FROM contacts WHERE birthday IS NOT NULL")
+            self._columns = BirthdayColumns(
+                ((key, Birthday(text).ordinal) for key, text in rows), self.generation
+            )
+        return self._columns
+
+    def complete_names(self, prefix, limit=COMPLETE_LIMIT):
+        prefix = prefix.lower()
+        return [name for (name,) in self.db.execute(
+            "SELECT name FROM contacts WHERE key >= ? AND key < ? ORDER BY key LIMIT ?",
+            (prefix, prefix + "\U0010ffff", limit),
+        )]
+
+    def _owner_blocks(self):
+        for table, column in (("phones", "phone"), ("emails", "email")):
+            rows = self.db.execute(
+                f"SELECT {column}, key FROM {table} WHERE {column} IN "
+                f"(SELECT {column} FROM {table} GROUP BY {column} HAVING count(*) > 1) ORDER BY {column}"
+            )
+            for _, group in groupby(rows, key=lambda row: row[0]):
+                yield {key for _, key in group}
+
+    def _phone_owners(self, phone):
+        return {key for (key,) in self.db.execute("SELECT key FROM phones WHERE phone = ?", (phone,))}
+
+    def _email_owners(self, email):
+        return {key for (key,) in self.db.execute("SELECT key FROM emails WHERE email = ?", (email,))}
+
+    def _token_keys(self, prefix):
+        return {key for (key,) in self.db.execute(
+            "SELECT key FROM contact_tokens WHERE token >= ? AND token < ?", (prefix, prefix + "\U0010ffff"),
+        )}
+
+    @cached
+    def search(self, query):
+        # як AddressBook.search, але за індексованою таблицею contact_tokens
+        keys = None
+        for word in query.lower().split():
+            found = self._token_keys(word)
+            if word.isdigit() and len(word) >= PHONE_SUFFIX_MIN:
+                found |= self._token_keys("~" + word)
+            keys = found if keys is None else keys & found
+            if not keys:
+                return []
+        return self.data.load(sorted(keys or ()))
+
+    def _birthday_candidates(self, start, days):
+        if days >= 365:
+            sql, params = "", ()
+        else:
+            end = start + timedelta(days=days)
+            lo, hi = (start.month, start.day), (end.month, end.day)
+            where = "(bmonth, bday) >= (?, ?) {} (bmonth, bday) <= (?, ?)"
+            sql = " AND " + where.format("AND" if hi >= lo else "OR")
+            params = lo + hi
+        return self.db.execute(
+            "SELECT bmonth, bday, key FROM contacts WHERE bmonth IS NOT NULL"
+            + sql + " ORDER BY bmonth, bday, key",
+            params,
+        ).fetchall()
+
+    def close(self):
+        self.db.commit()
+        self.db.close()
+
+
+class SqliteNotes(MutableMapping):
+    # Те саме для нотаток; ключі — рядкові id, як у NotesBook
+
+    def __init__(self, book):
+        self.book = book
+        self.db = book.db
+        self.fts = _has_fts(self.db)
+        self.cache = WeakValueDictionary()
+
+    def __getitem__(self, key):
+        note = self.cache.get(key)
+        if note is not None:
+            return note
+        row = self.db.execute(
+            "SELECT title, content, created_at, modified_at FROM notes WHERE id = ?", (_note_id(key),)
+        ).fetchone()
+        if row is None:
+            raise KeyError(key)
+        tags = [t for (t,) in self.db.execute(
+            "SELECT tag FROM note_tags WHERE id = ? ORDER BY pos", (int(key),))]
+        title, content, created_at, modified_at = row
+        note = note_from_row([title, content, created_at, tags, modified_at])
+        note._book = self.book
+        note._key = key
+        self.cache[key] = note
+        return note
+
+    def __setitem__(self, key, note):
+        self.store(key, note)
+        self.cache[key] = note
+
+    def store(self, key, note):
+        note_id = int(key)
+        self.db.execute(
+            "INSERT OR REPLACE INTO notes (id, title, content, created_at, modified_at) VALUES (?, ?, ?, ?, ?)",
+            (note_id, note.title, note.content, note.created_at, note.modified_at),
+        )
+        self.db.execute("DELETE FROM note_tags WHERE id = ?", (note_id,))
+        self.db.executemany(
+            "INSERT INTO note_tags (id, pos, tag) VALUES (?, ?, ?)",
+            [(note_id, i, tag) for i, tag in enumerate(note.tags)],
+        )
+        if self.fts:
+            self.db.execute("DELETE FROM notes_fts WHERE rowid = ?", (note_id,))
+            self.db.execute(
+                "INSERT INTO notes_fts (rowid, title, content, tags) VALUES (?, ?, ?, ?)",
+                (note_id, note.title.lower(), note.content.lower(), "\n".join(note.tags)),
+            )
+
+    def __delitem__(self, key):
+        if key not in self:
+            raise KeyError(key)
+        note_id = int(key)
+        self.db.execute("DELETE FROM notes WHERE id = ?", (note_id,))
+        self.db.execute("DELETE FROM note_tags WHERE id = ?", (note_id,))
+        if self.fts:
+            self.db.execute("DELETE FROM notes_fts WHERE rowid = ?", (note_id,))
+        note = self.cache.pop(key, None)
+        if note is not None:
+            note._book = None
+            note._key = None
+
+    def __contains__(self, key):
+        note_id = _note_id(key)
+        if note_id is None:
+            return False
+        row = self.db.execute("SELECT 1 FROM notes WHERE id = ?", (note_id,)).fetchone()
+        return row is not None
+
+    def __iter__(self):
+        for (note_id,) in self.db.execute("SELECT id FROM notes ORDER BY id").fetchall():
+            yield str(note_id)
+
+    def __len__(self):
+        return self.db.execute("SELECT count(*) FROM notes").fetchone()[0]
+
+
+def _note_id(key):
+    # id нотатки з рядка користувача; None, якщо це не число
+    return int(key) if isinstance(key, str) and key.isdigit() else None
+
+
+class SqliteTagIndex:
+    # Замість словника тег -> id: NotesBook.search_by_tags і filter_by_tags
+    # звертаються до нього лише через get()
+
+    def __init__(self, db):
+        self.db = db
+
+    def get(self, tag, default=None):
+        keys = {str(i) for (i,) in self.db.execute("SELECT id FROM note_tags WHERE tag = ?", (tag,))}
+        return keys if keys else default
+
+
+class SqliteNotesBook(NotesBook):
+    def __init__(self, filename="notes.db"):
+        super().__init__()
+        self.filename = filename
+        self.db = connect_sqlite(filename)
+        self.autocommit = True
+        self.data = SqliteNotes(self)
+        self._tag_index = SqliteTagIndex(self.db)
+        self.next_id = (self.db.execute("SELECT max(id) FROM notes").fetchone()[0] or 0) + 1
+
+    def __setitem__(self, key, note):
+        if key in self.data:
+            del self[key]
+        note._book = self
+        note._key = key
+        self.data[key] = note
+        self._update_ranks(key, note)
+        self._commit()
+
+    def __delitem__(self, key):
+        del self.data[key]
+        self._update_ranks(key)
+        self._commit()
+
+    def __getstate__(self):
+        raise TypeError("SqliteNotesBook is stored in its database, not pickled.")
+
+    def sorted_notes(self, after=None, offset=0):
+        after = 0 if after is None else int(after)
+        while True:
+            ids = [i for (i,) in self.db.execute(
+                "SELECT id FROM notes WHERE id > ? ORDER BY id LIMIT ? OFFSET ?",
+                (after, SQL_BATCH, offset),
+            ).fetchall()]
+            for note_id in ids:
+                key = str(note_id)
+                yield key, self.data[key]
+            if len(ids) < SQL_BATCH:
+                return
+            after, offset = ids[-1], 0
+
+    def _commit(self):
+        # викликається після кожної зміни
+        self.generation += 1
+        if self.autocommit:
+            self.db.commit()
+
+    def by_time(self, start=None, end=None, field="created", newest_first=False):
+        # Час у базі — текст NOTE_TIME_FORMAT, що сортується як дата; читаємо пачками
+        column = "created_at" if field == "created" else "modified_at"
+        lo = "" if start is None else from_timestamp(start).strftime(NOTE_TIME_FORMAT)
+        hi = "\uffff" if end is None else from_timestamp(end).strftime(NOTE_TIME_FORMAT)
+        order, compare = ("DESC", "<") if newest_first else ("ASC", ">")
+        sql = (
+            f"SELECT {column}, id FROM notes WHERE {column} >= ? AND {column} < ? "
+            f"AND ({column}, id) {compare} (?, ?) ORDER BY {column} {order}, id {order} LIMIT ?"
+        )
+        cursor = (hi, 0) if newest_first else (lo, 0)
+        while True:
+            rows = self.db.execute(sql, (lo, hi, *cursor, SQL_BATCH)).fetchall()
+            for _, note_id in rows:
+                key = str(note_id)
+                yield key, self.data[key]
+            if len(rows) < SQL_BATCH:
+                return
+            cursor = rows[-1]
+
+    def complete_ids(self, prefix, limit=COMPLETE_LIMIT):
+        found = []
+        for lo, hi in _id_ranges(prefix, self.next_id - 1):
+            found += [str(i) for (i,) in self.db.execute(
+                "SELECT id FROM notes WHERE id >= ? AND id < ? ORDER BY id LIMIT ?",
+                (lo, hi, limit - len(found)),
+            )]
+            if len(found) >= limit:
+                break
+        return found
+
+    def complete_tags(self, prefix, limit=COMPLETE_LIMIT):
+        prefix = prefix.lower()
+        return [tag for (tag,) in self.db.execute(
+            "SELECT DISTINCT tag FROM note_tags WHERE tag >= ? AND tag < ? ORDER BY tag LIMIT ?",
+            (prefix, prefix + "\U0010ffff", limit),
+        )]
+
+    def _note_changed(self, key, op, tag):
+        self.data.store(key, self.data[key])
+        self._update_ranks(key, self.data[key])
+        self._commit()
+
+    def _candidates(self, query_lower):
+        if not query_lower:
+            return list(self.data)
+        if self.data.fts and len(query_lower) >= 3:
+            rows = self.db.execute(
+                "SELECT rowid FROM notes_fts WHERE notes_fts MATCH ? ORDER BY rowid",
+                ('"' + query_lower.replace('"', '""') + '"',),
+            )
+        else:
+            rows = self.db.execute(
+                "SELECT id FROM notes WHERE instr(py_lower(title), ?1) OR instr(py_lower(content), ?1) "
+                "OR id IN (SELECT id FROM note_tags WHERE instr(tag, ?1)) ORDER BY id",
+                (query_lower,),
+            )
+        return [str(note_id) for (note_id,) in rows.fetchall()]
+
+    def add_notes(self, items):
+        for _, note in items:
+            self.data.store(str(self.next_id), note)
+            self._update_ranks(str(self.next_id), note)
+            self.next_id += 1
+        self.generation += 1
+        self.db.commit()
+        return len(items), []
+
+    def edit_note(self, key, new_content, modified=None):
+        if key in self.data:
+            note = self.data[key]
+            note.content = new_content.strip()
+            note.modified = to_timestamp(datetime.now()) if modified is None else modified
+            self.data.store(key, note)
+            self._update_ranks(key, note)
+            self._commit()
+        else:
+            raise KeyError("Note not found.")
+
+    def close(self):
+        self.db.commit()
+        self.db.close()
+
+
+def migrate_to_sqlite(db_file="assistant.db", addressbook_file=None, notes_file=None):
+    # Переносить існуючі .pkl або .snap (разом із журналами, якщо вони є) у базу SQLite
+    addressbook_file = addressbook_file or snapshot_file("addressbook")
+    notes_file = notes_file or snapshot_file("notes")
+    book = load_data(addressbook_file)
+    notes = load_notes(notes_file)
+    for path, loaded in ((addressbook_file, book), (notes_file, notes)):
+        journal_file = os.path.splitext(path)[0] + ".journal"
+        if os.path.exists(journal_file):
+            Journal(journal_file).open(loaded, path)
+            if loaded.journal is not None:  # журнал не зайнятий іншим процесом
+                loaded.journal.close()
+
+    sql_book = SqliteAddressBook(db_file)
+    sql_book.autocommit = False
+    for key, record in book.data.items():
+        sql_book.data.store(key, record)
+    sql_book.db.commit()
+
+    sql_notes = SqliteNotesBook(db_file)
+    sql_notes.autocommit = False
+    for key, note in notes.data.items():
+        sql_notes.data.store(key, note)
+    sql_notes.db.commit()
+    sql_notes.next_id = max(sql_notes.next_id, notes.next_id)
+    return sql_book, sql_notes
+
+# <<< END OF SQLITE STORAGE =========================================
+
 # ==================== МЕНЮ ДОВІДКИ ====================
 def show_help():
     help_text = f"""
@@ -510,14 +3933,18 @@ def show_help():
   {C_BRIGHT}add <ім'я> <телефон1> [телефон2]...{C_RESET}     — додати контакт або телефон
   {C_BRIGHT}change <ім'я> <старий> <новий>{C_RESET}          — змінити телефон
   {C_BRIGHT}phone <ім'я>{C_RESET}                            — показати телефони
-  {C_BRIGHT}all{C_RESET}                                     — показати всі контакти
+  {C_BRIGHT}all [--page N] [--size N] [--after ім'я]{C_RESET} — показати всі контакти (посторінково)
   {C_BRIGHT}delete <ім'я>{C_RESET}                           — видалити контакт
   {C_BRIGHT}find <текст>{C_RESET}                            — пошук за ім'ям, телефоном, адресою, email
+  {C_BRIGHT}owner <телефон|email>{C_RESET}                   — чий це телефон або email
+  {C_BRIGHT}unique [on|off]{C_RESET}                         — заборонити однакові телефони/email у різних контактів
+  {C_BRIGHT}dedupe [--merge]{C_RESET}                        — знайти (і злити) дублікати контактів
 
 {C_INFO}Дні народження:{C_RESET}
   {C_BRIGHT}add-birthday <ім'я> <ДД.ММ.РРРР>{C_RESET}        — додати день народження
   {C_BRIGHT}show-birthday <ім'я>{C_RESET}                    — показати день народження
   {C_BRIGHT}birthdays [днів]{C_RESET}                        — найближчі дні народження (за замовчуванням 7)
+  {C_BRIGHT}birthday-report{C_RESET}                         — дні народження за місяцями і віком (потрібен NumPy)
 
 {C_INFO}Додатково:{C_RESET}
   {C_BRIGHT}add-address <ім'я> <адреса>{C_RESET}             — додати адресу
@@ -526,100 +3953,608 @@ def show_help():
 {C_INFO}Нотатки:{C_RESET}
   {C_BRIGHT}add-note <текст>{C_RESET}                        — створити нотатку
   {C_BRIGHT}search-notes <текст>{C_RESET}                    — пошук за текстом
+  {C_BRIGHT}search-notes --rank [--top K] <слова>{C_RESET}  — найрелевантніші нотатки (BM25)
   {C_BRIGHT}edit-note <id> <новий текст>{C_RESET}            — редагувати нотатку
   {C_BRIGHT}delete-note <id>{C_RESET}                        — видалити нотатку
-  {C_BRIGHT}all-notes{C_RESET}                               — показати всі нотатки
+  {C_BRIGHT}all-notes [--page N] [--size N] [--after id]{C_RESET} — показати всі нотатки (посторінково)
   {C_BRIGHT}add-tag <id> <тег1> [тег2]...{C_RESET}           — додати теги
   {C_BRIGHT}find-by-tag <тег>{C_RESET}                       — пошук за тегом
-  {C_BRIGHT}filter-notes-by-tag <тег> [тег2]{C_RESET}        — відфільтрувати нотатки за тегами
+  {C_BRIGHT}filter-notes-by-tag <тег> [+тег] [-тег]{C_RESET} — фільтр за тегами (+ обов'язковий, - виключити)
+  {C_BRIGHT}notes-between <від> <до> [--modified]{C_RESET}   — нотатки, створені (змінені) з РРРР-ММ-ДД до РРРР-ММ-ДД
+  {C_BRIGHT}recent-notes [N] [--created]{C_RESET}            — N останніх змінених (створених) нотаток
+    обидві команди приймають {C_BRIGHT}--tag <тег>{C_RESET} і {C_BRIGHT}--text <текст>{C_RESET}
+
+{C_INFO}Імпорт / експорт:{C_RESET}
+  {C_BRIGHT}import <contacts|notes> <файл>{C_RESET}          — завантажити з .csv або .jsonl
+  {C_BRIGHT}export <contacts|notes> <файл>{C_RESET}          — зберегти у .csv або .jsonl
 
 {C_INFO}Система:{C_RESET}
   {C_BRIGHT}hello{C_RESET}                                   — привітання
   {C_BRIGHT}help{C_RESET}                                    — це меню
+  {C_BRIGHT}stats{C_RESET}                                   — статистика швидкодії команд
   {C_BRIGHT}close / exit{C_RESET}                            — вийти та зберегти
+  {C_BRIGHT}Tab{C_RESET}                                     — доповнити команду, ім'я, id нотатки або тег
 
 {C_BRIGHT}Приклад: add John 1234567890{C_RESET}
 """
     return help_text.strip()
 
-def main():
-    book = load_data()
-    notes = load_notes()
+def hello(args):
+    return "How can I help you?"
 
-    print("Welcome to the assistant bot!")
 
-    while True:
-        user_input = input("Enter a command: ")
-        command, args = parse_input(user_input)
+def show_stats(args, book, notes):
+    caches = [
+        f"cache {name}: {c.hits} hits, {c.misses} misses, {len(c.entries)}/{c.maxsize} entries"
+        for name, c in (("contacts", book._cache), ("notes", notes._cache))
+    ]
+    if not STATS.ops:
+        return "\n".join(["No statistics yet.", *caches])
+    lines = [f"{'command':<22}{'calls':>7}{'errors':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}{'size':>9}"]
+    for name, op in sorted(STATS.ops.items()):
+        if not op.calls:
+            continue  # сама команда stats, що ще виконується
+        d = op.to_dict()
+        size = "-" if d["size_at_max"] is None else d["size_at_max"]
+        lines.append(
+            f"{name:<22}{d['calls']:>7}{sum(d['errors'].values()):>7}{d['p50_ms']:>10.3f}"
+            f"{d['p95_ms']:>10.3f}{d['p99_ms']:>10.3f}{d['max_ms']:>10.3f}{size:>9}"
+        )
+        if d["errors"]:
+            lines.append("    errors: " + ", ".join(f"{k}={v}" for k, v in sorted(d["errors"].items())))
+        if STATS.trace_alloc:
+            lines.append(f"    alloc: mean {d['alloc_mean_kb']:.1f} KB, max {d['alloc_max_kb']:.1f} KB")
+    return "\n".join(lines + caches)
 
-        if command in ["close", "exit"]:
-            save_data(book)
-            save_notes(notes)
-            print("Good bye!")
-            break
 
-        elif command == "hello":
-            print("How can I help you?")
+# ==================== РЕЄСТР КОМАНД ====================
+# команда -> (обробник, книги, які він отримує після args)
+COMMANDS = {
+    "hello": (hello, ()),
+    "help": (lambda args: show_help(), ()),
+    "stats": (show_stats, ("book", "notes")),
+
+    "add": (add_contact, ("book",)),
+    "change": (change_contact, ("book",)),
+    "phone": (phone_contact, ("book",)),
+    "find": (find_contact, ("book",)),
+    "owner": (owner_contact, ("book",)),
+    "unique": (unique_mode, ("book",)),
+    "dedupe": (dedupe, ("book",)),
+    "all": (all_contacts, ("book",)),
+    "add-birthday": (add_birthday, ("book",)),
+    "show-birthday": (show_birthday, ("book",)),
+    "birthdays": (birthdays, ("book",)),
+    "birthday-report": (birthday_report, ("book",)),
+    "add-address": (add_address, ("book",)),
+    "add-email": (add_email, ("book",)),
+
+    "import": (import_data, ("book", "notes")),
+    "export": (export_data, ("book", "notes")),
+
+    "add-note": (add_note, ("notes",)),
+    "show-note": (show_note, ("notes",)),
+    "edit-note": (edit_note, ("notes",)),
+    "delete-note": (delete_note, ("notes",)),
+    "all-notes": (all_notes_func, ("notes",)),
+    "add-tag": (add_tag, ("notes",)),
+    "remove-tag": (remove_tag, ("notes",)),
+    "search-notes": (search_notes, ("notes",)),
+    "find-by-tag": (find_by_tag, ("notes",)),
+    "filter-notes-by-tag": (filter_notes_by_tag, ("notes",)),
+    "notes-between": (notes_between, ("notes",)),
+    "recent-notes": (recent_notes, ("notes",)),
+}
+
+EXIT_COMMANDS = ("close", "exit")
+
+
+def execute(command, args, book, notes):
+    entry = COMMANDS.get(command)
+    if entry is None:
+        return "Invalid command."
+    handler, needs = entry
+    books = [{"book": book, "notes": notes}[name] for name in needs]
+    size = (lambda: len(books[0])) if books else None
+    return STATS.call(command, handler, args, *books, size=size)
+
+
+# ==================== АВТОДОПОВНЕННЯ ====================
+# Що доповнювати на кожній позиції аргументу команди. Кортеж — фіксовані слова,
+# "tags" — теги на цій і всіх наступних позиціях.
+ARGUMENTS = {
+    "change": ("contact", "phone"),
+    "phone": ("contact",),
+    "add-birthday": ("contact",),
+    "show-birthday": ("contact",),
+    "add-address": ("contact",),
+    "add-email": ("contact",),
+    "unique": (("on", "off"),),
+    "dedupe": (("--merge",),),
+    "import": (("contacts", "notes"),),
+    "export": (("contacts", "notes"),),
+    "show-note": ("note",),
+    "edit-note": ("note",),
+    "delete-note": ("note",),
+    "add-tag": ("note", "tags"),
+    "remove-tag": ("note", "note-tag"),
+    "find-by-tag": ("tag",),
+    "filter-notes-by-tag": ("tags",),
+}
+
+
+class Completer:
+    # Tab у readline: команди з COMMANDS, імена, id і теги — з відсортованих індексів книг
+
+    def __init__(self, book=None, notes=None):
+        self.book = book
+        self.notes = notes
+        self.commands = sorted({*COMMANDS, *EXIT_COMMANDS})
+        self.matches = []
+
+    def complete(self, text, state):
+        # readline викликає з state = 0, 1, 2... доки не отримає None
+        if state == 0:
+            line = readline.get_line_buffer()[:readline.get_begidx()]
+            self.matches = self.candidates(line.split(), text)
+        return self.matches[state] if state < len(self.matches) else None
+
+    def candidates(self, words, text):
+        if not words:
+            return _complete_sorted(self.commands, text.lower())
+        kinds = ARGUMENTS.get(words[0].lower(), ())
+        position = len(words) - 1
+        if kinds and kinds[-1] == "tags":
+            position = min(position, len(kinds) - 1)
+        if position >= len(kinds):
+            return []
+        kind = kinds[position]
+        if isinstance(kind, tuple):
+            return [word for word in kind if word.startswith(text)]
+        if self.book is None:
+            return []  # клієнт --connect: книги на сервері
+        if kind == "contact":
+            return self.book.complete_names(text)
+        if kind == "phone":
+            record = self.book.find(words[1])
+            return [p.value for p in record.phones if p.value.startswith(text)] if record else []
+        if kind == "note":
+            return self.notes.complete_ids(text)
+        if kind == "note-tag":
+            note = self.notes.data.get(words[1])
+            return [tag for tag in note.tags if tag.startswith(text.lower())] if note else []
+        # тег, можливо з + або - для filter-notes-by-tag
+        sign = text[0] if text and text[0] in "+-" else ""
+        return [sign + tag for tag in self.notes.complete_tags(text[len(sign):])]
 
-        elif command == "add":
-            print(add_contact(args, book))
 
-        elif command == "change":
-            print(change_contact(args, book))
+def enable_completion(book=None, notes=None):
+    if readline is None:
+        return
+    readline.set_completer(Completer(book, notes).complete)
+    readline.set_completer_delims(" \t\n")  # "-" і "+" — частина команд і тегів
+    if "libedit" in (readline.__doc__ or ""):  # macOS
+        readline.parse_and_bind("bind ^I rl_complete")
+    else:
+        readline.parse_and_bind("tab: complete")
+
+
+def open_books(db_file=None):
+    if db_file:
+        sources = [snapshot_file(name) for name in ("addressbook", "notes")]
+        if not os.path.exists(db_file) and any(map(os.path.exists, sources)):
+            # перший запуск з --db: дані з файлів знімків переносяться в нову базу
+            book, notes = migrate_to_sqlite(db_file)
+            print(f"Migrated {len(book)} contacts and {len(notes)} notes to {db_file}.")
+            return book, notes
+        return load_data(db_file), load_notes(db_file)
+    return (
+        load_data(snapshot_file("addressbook"), journal_file="addressbook.journal"),
+        load_notes(snapshot_file("notes"), journal_file="notes.journal"),
+    )
+
+
+def convert_books():
+    # addressbook.pkl і notes.pkl -> .snap; далі open_books відкриває саме .snap
+    for name, kind in (("addressbook", "contacts"), ("notes", "notes")):
+        source = name + ".pkl"
+        if not os.path.exists(source):
+            print(f"{source} not found, skipped.")
+            continue
+        book = convert_snapshot(source, name + SNAPSHOT_EXT)
+        print(f"Converted {len(book)} {kind} to {name + SNAPSHOT_EXT}.")
+
+
+def run_batch(lines, book, notes):
+    # Усі команди над однією завантаженою книгою; журнал вимкнено,
+    # дані зберігаються один раз у кінці
+    journals = (book.journal, notes.journal)
+    book.journal = notes.journal = None
+    try:
+        for line in lines:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            command, args = parse_input(line)
+            if command in EXIT_COMMANDS:
+                break
+            print_result(execute(command, args, book, notes))
+    finally:
+        book.journal, notes.journal = journals
+        save_data(book)
+        save_notes(notes)
+
+
+# ==================== АВТОЗБЕРЕЖЕННЯ ====================
+AUTOSAVE_DELAY = 5.0  # секунд без змін, після яких книга зберігається у фоні
+
+
+class AutoSaver(threading.Thread):
+    # Фоновий потік: якщо книга змінилась і delay секунд більше не змінюється,
+    # під lock робиться знімок у пам'ять (pickle або .snap), а запис на диск — уже без lock.
+    # Команди виконуються під тим самим lock, тож знімок завжди узгоджений.
+
+    def __init__(self, books, delay=AUTOSAVE_DELAY):
+        super().__init__(name="autosave", daemon=True)
+        self.books = books  # [(книга, файл знімка)]
+        self.delay = delay
+        self.lock = threading.RLock()
+        self.stopped = threading.Event()
+        self.saved = [book.generation for book, _ in books]
+
+    def run(self):
+        seen = [(book.generation, time.monotonic()) for book, _ in self.books]
+        while not self.stopped.wait(min(self.delay, 0.5)):
+            now = time.monotonic()
+            for i, (book, filename) in enumerate(self.books):
+                generation = book.generation
+                if generation != seen[i][0]:
+                    seen[i] = (generation, now)
+                elif generation != self.saved[i] and now - seen[i][1] >= self.delay:
+                    try:
+                        if self.save(book, filename):
+                            self.saved[i] = generation
+                    except OSError as e:
+                        print(f"\n{C_ERROR}Autosave of {filename} failed: {e}{C_RESET}")
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+
+    def save(self, book, filename):
+        # False, якщо файл щойно змінив інший процес: зіллємо наступного разу
+        with self.lock:
+            generation = book.generation
+            journal = book.journal
+            if journal is not None:
+                book.journal_seq = journal.seq
+            stamp = _path_stamp(filename)
+            if stamp != book._stamp:
+                # зливання з чужою версією змінює книгу, тож усе під lock
+                save_snapshot(book, filename)
+                return True
+            book.version += 1
+            data = dump_snapshot(book, filename)
+        with FileLock(filename):
+            if _path_stamp(filename) != stamp:
+                # знімок не записано: зі старою версією наступна спроба злиє чужий файл
+                with self.lock:
+                    book.version -= 1
+                return False
+            write_bytes(data, filename)
+            stamp = _path_stamp(filename)
+        with self.lock:
+            book._stamp = stamp
+            if book.generation == generation:
+                book._mark_saved()
+                if journal is not None and journal.seq == book.journal_seq:
+                    journal.truncate()
+        return True
+
+
+# ==================== СЕРВЕР ====================
+DEFAULT_ADDRESS = "127.0.0.1:8765"
+END_OF_REPLY = "."  # рядок-кінець відповіді; рядки, що починаються з ".", подвоюють крапку
+
+# Команди, які лише читають книги: виконуються паралельно між клієнтами.
+# Усі інші змінюють дані й виконуються по одній.
+READ_COMMANDS = {
+    "hello", "help", "stats", "phone", "find", "owner", "all", "show-birthday",
+    "birthdays", "birthday-report", "show-note", "all-notes", "search-notes", "find-by-tag",
+    "filter-notes-by-tag", "notes-between", "recent-notes", "export",
+}
+
+
+def parse_address(address):
+    # "host:port", "port" або шлях до Unix-сокета
+    if "/" in address or address.endswith(".sock"):
+        return None, address
+    host, _, port = address.rpartition(":")
+    if not port.isdigit():
+        raise ValueError(f"Invalid address: {address}")
+    return host or "127.0.0.1", int(port)
+
+
+def result_lines(result):
+    if isinstance(result, str):
+        return result.split("\n")
+    return result
+
+
+class ReadWriteLock:
+    # Багато читачів або один письменник; письменник, що чекає, не пропускає нових читачів
+
+    def __init__(self):
+        self.readers = 0
+        self.writer = False
+        self.waiting_writers = 0
+        self.changed = asyncio.Condition()
+
+    async def acquire_read(self):
+        async with self.changed:
+            await self.changed.wait_for(lambda: not self.writer and not self.waiting_writers)
+            self.readers += 1
+
+    async def release_read(self):
+        async with self.changed:
+            self.readers -= 1
+            self.changed.notify_all()
+
+    async def acquire_write(self):
+        async with self.changed:
+            self.waiting_writers += 1
+            await self.changed.wait_for(lambda: not self.writer and not self.readers)
+            self.waiting_writers -= 1
+            self.writer = True
 
-        elif command == "phone":
-            print(phone_contact(args, book))
+    async def release_write(self):
+        async with self.changed:
+            self.writer = False
+            self.changed.notify_all()
 
-        elif command == "all":
-            print(all_contacts(args, book))
 
-        elif command == "add-birthday":
-            print(add_birthday(args, book))
+class AssistantServer:
+    # Одна AddressBook і одна NotesBook у пам'яті на всіх клієнтів.
+    # Протокол: клієнт надсилає рядок команди, сервер відповідає рядками до END_OF_REPLY.
 
-        elif command == "show-birthday":
-            print(show_birthday(args, book))
+    def __init__(self, book, notes):
+        self.book = book
+        self.notes = notes
+        self.lock = ReadWriteLock()
+        self.clients = 0
 
-        elif command == "birthdays":
-            print(birthdays(args, book))
+    async def handle(self, reader, writer):
+        self.clients += 1
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                command, args = parse_input(line.decode("utf-8").strip())
+                if command in EXIT_COMMANDS:
+                    await self.reply(writer, ["Good bye!"])
+                    break
+                if command in READ_COMMANDS:
+                    await self.lock.acquire_read()
+                    try:
+                        await self.run_command(writer, command, args)
+                    finally:
+                        await self.lock.release_read()
+                else:
+                    await self.lock.acquire_write()
+                    try:
+                        await self.run_command(writer, command, args)
+                    finally:
+                        await self.lock.release_write()
+        except ConnectionError:
+            pass
+        finally:
+            self.clients -= 1
+            writer.close()
+
+    async def run_command(self, writer, command, args):
+        try:
+            lines = result_lines(execute(command, args, self.book, self.notes))
+            await self.reply(writer, lines)
+        except ConnectionError:
+            raise
+        except Exception as e:
+            await self.reply(writer, [f"Error: {e}"])
+
+    async def reply(self, writer, lines):
+        for i, line in enumerate(lines, 1):
+            if line.startswith(END_OF_REPLY):
+                line = END_OF_REPLY + line
+            writer.write(line.encode("utf-8") + b"\n")
+            if i % 100 == 0:
+                # довгий вивід віддає керування іншим клієнтам
+                await writer.drain()
+        writer.write(END_OF_REPLY.encode("utf-8") + b"\n")
+        await writer.drain()
+
+    async def serve(self, address):
+        host, port = parse_address(address)
+        if host is None:
+            server = await asyncio.start_unix_server(self.handle, path=port)
+        else:
+            server = await asyncio.start_server(self.handle, host, port)
+        print(f"Serving on {address}. Press Ctrl+C to stop.")
+        async with server:
+            await server.serve_forever()
+
+
+def run_server(book, notes, address):
+    try:
+        asyncio.run(AssistantServer(book, notes).serve(address))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        save_data(book)
+        save_notes(notes)
+        host, path = parse_address(address)
+        if host is None and os.path.exists(path):
+            os.remove(path)
+        print("Server stopped, data saved.")
+
+
+class AssistantClient:
+    def __init__(self, address):
+        host, port = parse_address(address)
+        if host is None:
+            self.sock = socket.socket(socket.AF_UNIX)
+            self.sock.connect(port)
+        else:
+            self.sock = socket.create_connection((host, port))
+        self.reader = self.sock.makefile("r", encoding="utf-8", newline="\n")
+        self.writer = self.sock.makefile("w", encoding="utf-8", newline="\n")
+
+    def send(self, line):
+        # Генератор рядків відповіді сервера
+        self.writer.write(line.replace("\n", " ") + "\n")
+        self.writer.flush()
+        for line in self.reader:
+            line = line.rstrip("\n")
+            if line == END_OF_REPLY:
+                return
+            if line.startswith(END_OF_REPLY):
+                line = line[1:]
+            yield line
+        raise ConnectionError("Server closed the connection.")
+
+    def close(self):
+        self.reader.close()
+        try:
+            self.writer.close()
+        except OSError:
+            # сервер уже закрив з'єднання, недописаний рядок нікому не потрібен
+            pass
+        self.sock.close()
+
+
+def run_client(options):
+    client = AssistantClient(options.connect)
+    try:
+        if options.command is not None:
+            print_result(client.send(options.command))
+            return
+        if options.batch is not None:
+            lines = sys.stdin if options.batch == "-" else open(options.batch, encoding="utf-8")
+            with lines:
+                for line in lines:
+                    line = line.strip()
+                    if line and not line.startswith("#"):
+                        print_result(client.send(line))
+            return
+        print(f"Connected to {options.connect}.")
+        enable_completion()
+        while True:
+            user_input = input("Enter a command: ")
+            print_result(client.send(user_input))
+            if parse_input(user_input)[0] in EXIT_COMMANDS:
+                break
+    finally:
+        client.close()
 
-        elif command == "add-address":
-            print(add_address(args, book))
 
-        elif command == "add-email":
-            print(add_email(args, book))
-        elif command == "help":
-            print(show_help())
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="personal_assistant", description="Personal assistant bot.")
+    parser.add_argument("--batch", metavar="FILE", help="run commands from FILE ('-' for stdin) and exit")
+    parser.add_argument("-c", dest="command", metavar="COMMAND", help="run a single command and exit")
+    parser.add_argument("--db", metavar="FILE",
+                        help="keep contacts and notes in a SQLite database (a new one is filled from existing .pkl/.snap files)")
+    parser.add_argument("--convert", action="store_true",
+                        help=f"convert addressbook.pkl and notes.pkl to the faster {SNAPSHOT_EXT} format and exit")
+    parser.add_argument("--stats", metavar="FILE", help="write command statistics to FILE (JSON) on exit")
+    parser.add_argument("--trace-alloc", action="store_true", help="record tracemalloc allocation deltas per command")
+    parser.add_argument("--autosave", metavar="SECONDS", type=float, default=AUTOSAVE_DELAY,
+                        help=f"save in the background after SECONDS without changes, 0 to disable (default: {AUTOSAVE_DELAY:g})")
+    parser.add_argument("--cache-size", metavar="N", type=int, default=CACHE_SIZE,
+                        help=f"remember the last N query results per book, 0 to disable (default: {CACHE_SIZE})")
+    parser.add_argument("--workers", metavar="N", type=int, default=0,
+                        help=f"search notes in N processes once the notebook has {PARALLEL_MIN}+ notes")
+    parser.add_argument("--serve", metavar="ADDRESS", nargs="?", const=DEFAULT_ADDRESS,
+                        help=f"share one copy of the books with clients (host:port or socket path, default: {DEFAULT_ADDRESS})")
+    parser.add_argument("--connect", metavar="ADDRESS", nargs="?", const=DEFAULT_ADDRESS,
+                        help="send commands to a running --serve instance instead of opening the books")
+    options = parser.parse_args(argv)
+
+    if options.trace_alloc:
+        STATS.enable_alloc_tracing()
+    try:
+        run(options)
+    finally:
+        if options.stats:
+            STATS.dump(options.stats)
 
-# >>> Notes CLI Commands
 
-        elif command == "add-note":
-            print(add_note(args, notes))
-        elif command == "show-note":
-            print(show_note(args, notes))
-        elif command == "edit-note":
-            print(edit_note(args, notes))
-        elif command == "delete-note":
-            print(delete_note(args, notes))
-        elif command == "all-notes":
-            print(all_notes_func(args, notes))
+def run(options):
+    if options.connect is not None:
+        run_client(options)
+        return
+    if options.convert:
+        convert_books()
+        return
 
-        elif command == "add-tag":
-            print(add_tag(args, notes))
-        elif command == "remove-tag":
-            print(remove_tag(args, notes))
+    book, notes = open_books(options.db)
+    book._cache.maxsize = notes._cache.maxsize = options.cache_size
+    if options.workers > 1 and not options.db and options.command is None:
+        notes.enable_parallel(options.workers)
+    try:
+        run_session(options, book, notes)
+    finally:
+        notes.close_parallel()
 
-        elif command == "search-notes":
-            print(search_notes(args, notes))
 
-        elif command == "find-by-tag":
-            print(find_by_tag(args, notes))
+def run_session(options, book, notes):
+    if options.serve is not None:
+        run_server(book, notes, options.serve)
+        return
 
-        elif command == "filter-notes-by-tag":
-            print(filter_notes_by_tag(args, notes))
+    if options.command is not None:
+        # зміни вже у журналі (або в SQLite), повний знімок не потрібен,
+        # якщо журнал не веде інший процес
+        print_result(execute(*parse_input(options.command), book, notes))
+        if book.journal is None:
+            save_data(book)
+        if notes.journal is None:
+            save_notes(notes)
+        return
 
+    if options.batch is not None:
+        if options.batch == "-":
+            run_batch(sys.stdin, book, notes)
         else:
-            print("Invalid command.")
+            with open(options.batch, encoding="utf-8") as f:
+                run_batch(f, book, notes)
+        return
+
+    # SQLite зберігає зміни сам; .pkl/.snap-книги зберігає фоновий потік
+    saver = None
+    if options.autosave > 0 and not options.db:
+        saver = AutoSaver([(book, book.filename), (notes, notes.filename)], options.autosave)
+        saver.start()
+    lock = saver.lock if saver else threading.RLock()
+
+    enable_completion(book, notes)
+    print("Welcome to the assistant bot!")
+
+    try:
+        while True:
+            user_input = input("Enter a command: ")
+            command, args = parse_input(user_input)
+
+            if command in EXIT_COMMANDS:
+                break
+
+            with lock:
+                print_result(execute(command, args, book, notes))
+    finally:
+        if saver:
+            saver.stop()
+        save_data(book)
+        save_notes(notes)
+    print("Good bye!")
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
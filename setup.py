@@ -6,6 +6,9 @@ setup(
     version="0.1",
     packages=["personal_assistant"],
     install_requires=[],
+    extras_require={
+        'analytics': ['numpy'],  # birthday-report і AddressBook.birthday_columns
+    },
     entry_points={
         'console_scripts': [
             'personal_assistant = personal_assistant.main:main',
@@ -0,0 +1,8 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def workdir(tmp_path, monkeypatch):
+    # книги, журнали і stats.json пишуться у поточний каталог
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
@@ -0,0 +1,110 @@
+import os
+import time
+
+import pytest
+
+from personal_assistant import main
+from personal_assistant.main import AutoSaver, Record, load_data, load_notes, save_data
+
+
+def names(book):
+    return sorted(r.name.value for r in book.data.values())
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.02)
+
+
+@pytest.fixture
+def saver():
+    savers = []
+
+    def start(books, delay=0.05):
+        saver = AutoSaver(books, delay)
+        saver.start()
+        savers.append(saver)
+        return saver
+
+    yield start
+    for saver in savers:
+        saver.stop()
+
+
+def test_changes_are_saved_in_background(saver):
+    book, notes = load_data("a.pkl"), load_notes("n.pkl")
+    worker = saver([(book, "a.pkl"), (notes, "n.pkl")])
+    with worker.lock:
+        book.add_record(Record("Ann"))
+        notes.add_note("Plan", "text")
+    wait_for(lambda: os.path.exists("a.pkl") and os.path.exists("n.pkl"))
+    wait_for(lambda: worker.saved == [book.generation, notes.generation])
+    assert names(load_data("a.pkl")) == ["Ann"]
+    assert len(load_notes("n.pkl")) == 1
+
+
+def test_waits_for_a_quiet_book(saver):
+    book = load_data("a.pkl")
+    saver([(book, "a.pkl")], delay=0.6)
+    for i in range(6):
+        book.add_record(Record(f"user{i}"))
+        time.sleep(0.2)
+        assert not os.path.exists("a.pkl")
+    wait_for(lambda: os.path.exists("a.pkl"))
+    assert len(load_data("a.pkl").data) == 6
+
+
+def test_unchanged_book_is_not_written(saver):
+    book = load_data("a.pkl")
+    book.add_record(Record("Ann"))
+    save_data(book)
+    stamp = os.stat("a.pkl").st_mtime_ns
+    worker = saver([(book, "a.pkl")])
+    time.sleep(0.3)
+    assert os.stat("a.pkl").st_mtime_ns == stamp
+    assert worker.saved == [book.generation]
+
+
+def test_save_merges_a_file_written_elsewhere():
+    save_data(load_data("a.pkl"))
+    mine, other = load_data("a.pkl"), load_data("a.pkl")
+    other.add_record(Record("Bob"))
+    save_data(other)
+    mine.add_record(Record("Ann"))
+    assert AutoSaver([(mine, "a.pkl")]).save(mine, "a.pkl")
+    assert names(load_data("a.pkl")) == ["Ann", "Bob"]
+    assert names(mine) == ["Ann", "Bob"]
+
+
+def test_save_truncates_the_journal():
+    notes = load_notes("n.pkl", "n.journal")
+    notes.add_note("Plan", "text")
+    assert os.path.getsize("n.journal") > 0
+    AutoSaver([(notes, "n.pkl")]).save(notes, "n.pkl")
+    assert os.path.getsize("n.journal") == 0
+    notes.journal.close()
+    again = load_notes("n.pkl", "n.journal")
+    assert [n.title for n in again.data.values()] == ["Plan"]
+    again.journal.close()
+
+
+def test_lost_race_does_not_drop_the_other_save(monkeypatch):
+    save_data(load_data("a.pkl"))
+    mine, other = load_data("a.pkl"), load_data("a.pkl")
+    mine.add_record(Record("Ann"))
+    other.add_record(Record("Bob"))
+    dump = main.dump_snapshot
+
+    def dump_while_other_saves(book, filename):
+        data = dump(book, filename)
+        save_data(other)  # інший процес пише файл між знімком і записом
+        return data
+
+    monkeypatch.setattr(main, "dump_snapshot", dump_while_other_saves)
+    saver = AutoSaver([(mine, "a.pkl")])
+    assert not saver.save(mine, "a.pkl")
+    monkeypatch.setattr(main, "dump_snapshot", dump)
+    assert saver.save(mine, "a.pkl")
+    assert names(load_data("a.pkl")) == ["Ann", "Bob"]
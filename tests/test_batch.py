@@ -0,0 +1,46 @@
+import pytest
+
+from personal_assistant.main import COMMANDS, AddressBook, NotesBook, execute, main
+
+
+def run_batch_file(text, capsys):
+    with open("cmds.txt", "w", encoding="utf-8") as f:
+        f.write(text)
+    main(["--batch", "cmds.txt"])
+    return capsys.readouterr().out.splitlines()
+
+
+def test_batch_runs_all_commands_and_saves(capsys):
+    out = run_batch_file("add John 0501234567\n# коментар\n\nadd-birthday John 01.02.1990\n", capsys)
+    assert out == ["Contact added. Added phones: 0501234567", "Birthday added."]
+    main(["-c", "phone John"])
+    assert capsys.readouterr().out.strip() == "John: 0501234567"
+
+
+def test_batch_continues_after_note_errors(capsys):
+    out = run_batch_file(
+        "add-note todo buy milk\ndelete-note 99\nedit-note 99 x\nedit-note abc x\nshow-note 1\n", capsys
+    )
+    assert out[1:4] == ["Note not found."] * 3
+    assert out[4].startswith("1: [todo] buy milk")
+
+
+def test_batch_stops_at_exit(capsys):
+    out = run_batch_file("add A\nexit\nadd B\n", capsys)
+    assert out == ["Contact added."]
+    main(["-c", "all"])
+    assert "B" not in capsys.readouterr().out
+
+
+@pytest.mark.parametrize("command", sorted(COMMANDS))
+def test_every_command_handles_missing_arguments(command):
+    # жодна команда не падає без аргументів чи з неіснуючим id/ім'ям
+    book, notes = AddressBook(), NotesBook()
+    for args in ([], ["missing"], ["99", "x"]):
+        result = execute(command, args, book, notes)
+        if not isinstance(result, str):
+            list(result)
+
+
+def test_unknown_command():
+    assert execute("nope", [], AddressBook(), NotesBook()) == "Invalid command."
@@ -0,0 +1,35 @@
+import json
+
+from personal_assistant import bench, main
+
+
+def test_bench_writes_and_compares_results(capsys):
+    bench.main(["--sizes", "30", "--repeat", "2", "--output", "r.json"])
+    with open("r.json", encoding="utf-8") as f:
+        report = json.load(f)
+    ops = {r["op"] for r in report["results"]}
+    assert {"AddressBook.add_record", "AddressBook.search", "NotesBook.search", "load_data (.snap) + find"} <= ops
+    assert all(r["size"] == 30 for r in report["results"])
+    capsys.readouterr()
+
+    bench.main(["--sizes", "30", "--repeat", "2", "--compare", "r.json"])
+    out = capsys.readouterr().out.splitlines()
+    assert "vs base" in out[0]
+    assert all(line.rstrip().endswith("x") for line in out[1:] if "add_" not in line)
+
+
+def test_generated_data_is_deterministic():
+    first = [str(r) for r in bench.generate_contacts(20)]
+    assert first == [str(r) for r in bench.generate_contacts(20)]
+    book = bench.build_book(20)
+    assert sorted(r.name.value for r in book.data.values()) == sorted(r.name.value for r in bench.generate_contacts(20))
+
+
+def test_every_timed_save_writes_the_file(monkeypatch):
+    writes = []
+    write = main.write_snapshot
+    monkeypatch.setattr(main, "write_snapshot", lambda book, filename: writes.append(filename) or write(book, filename))
+    book = bench.build_book(50)
+    result = bench.measure("save_data", 50, lambda: bench.resave(bench.save_data, book, "a.pkl"), 3)
+    assert writes == ["a.pkl"] * 4  # 3 заміри і прохід tracemalloc
+    assert result["peak_kb"] > 1
@@ -0,0 +1,107 @@
+import random
+from collections import Counter
+from datetime import date
+
+import pytest
+
+from personal_assistant.main import AddressBook, Record, SqliteAddressBook, birthday_report
+
+np = pytest.importorskip("numpy")
+
+TODAYS = [date(2024, 2, 27), date(2023, 2, 27), date(2024, 12, 20), date(2023, 6, 15), date(2024, 3, 1)]
+
+
+def upcoming(book, today, days):
+    columns = book.birthday_columns()
+    return sorted(
+        (book.data[key].name.value, congrats.strftime("%Y.%m.%d"))
+        for _, key, congrats in columns.upcoming(today, days)
+    )
+
+
+def scan_upcoming(book, today, days):
+    return sorted((item["name"], item["congratulation_date"]) for item in book._upcoming_birthdays(today, days))
+
+
+def age(born, on):
+    return on.year - born.year - ((on.month, on.day) < (born.month, born.day))
+
+
+def random_birthday(rnd):
+    if rnd.random() < 0.1:
+        return f"29.02.{rnd.choice([1988, 1992, 2000])}"
+    return f"{rnd.randint(1, 28):02d}.{rnd.randint(1, 12):02d}.{rnd.randint(1940, 2020)}"
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def book(request):
+    book = AddressBook() if request.param == "memory" else SqliteAddressBook("t.db")
+    yield book
+    if request.param == "sqlite":
+        book.close()
+
+
+def test_columns_match_python_report_after_changes(book):
+    rnd = random.Random(10)
+    for step in range(200):
+        name = f"user{rnd.randrange(60)}"
+        record = book.find(name)
+        if record is None:
+            record = Record(name)
+            book.add_record(record)
+            if rnd.random() < 0.8:
+                record.add_birthday(random_birthday(rnd))
+        elif rnd.random() < 0.4:
+            book.delete(name)
+        if step % 20 == 0:
+            for today in TODAYS:
+                for days in (0, 7, 30, 366):
+                    assert upcoming(book, today, days) == scan_upcoming(book, today, days)
+
+
+def test_histograms_match_scan(book):
+    rnd = random.Random(11)
+    for i in range(150):
+        record = Record(f"user{i}")
+        book.add_record(record)
+        if rnd.random() < 0.8:
+            record.add_birthday(random_birthday(rnd))
+    book.birthday_columns()  # далі стовпці оновлюються разом з книгою
+    for i in range(0, 150, 7):
+        book.delete(f"user{i}")
+    born = [r.birthday.to_date() for r in book.data.values() if r.birthday]
+    columns = book.birthday_columns()
+    assert len(columns) == len(born)
+    months = Counter(d.month for d in born)
+    assert columns.month_histogram().tolist() == [months[m] for m in range(1, 13)]
+    on = date(2025, 2, 28)
+    assert sorted(columns.ages(on).tolist()) == sorted(age(d, on) for d in born)
+    groups = Counter(age(d, on) // 10 for d in born)
+    assert columns.age_histogram(on).tolist() == [groups[g] for g in range(max(groups) + 1)]
+
+
+def test_leap_day_birthdays():
+    book = AddressBook()
+    record = Record("Leap")
+    book.add_record(record)
+    record.add_birthday("29.02.2000")
+    columns = book.birthday_columns()
+    assert columns.occurrences(2024).tolist() == [date(2024, 2, 29)]
+    assert columns.occurrences(2023).tolist() == [date(2023, 3, 1)]
+    assert columns.ages(date(2023, 2, 28)).tolist() == [22]
+    assert columns.ages(date(2023, 3, 1)).tolist() == [23]
+
+
+def test_birthday_report_command():
+    book = AddressBook()
+    assert birthday_report([], book) == "No birthdays recorded."
+    for i, birthday in enumerate(["01.01.1990", "15.01.2001", "10.06.1985"]):
+        record = Record(f"user{i}")
+        book.add_record(record)
+        record.add_birthday(birthday)
+    book.add_record(Record("nobody"))
+    report = birthday_report([], book).split("\n")
+    assert report[0] == "Birthdays known for 3 of 4 contacts."
+    assert "  Jan  2" in report and "  Jun  1" in report
+    assert report[-1].startswith("Congratulations in the next 30 days: ")
+    assert birthday_report(["x"], book) == "Usage: birthday-report"
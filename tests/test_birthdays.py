@@ -0,0 +1,73 @@
+import pickle
+import random
+from datetime import date, timedelta
+
+import pytest
+
+from personal_assistant.main import AddressBook, Record, birthdays
+
+
+def next_birthday(bday, today):
+    # 29 лютого у невисокосний рік — 1 березня
+    for year in (today.year, today.year + 1):
+        try:
+            day = bday.replace(year=year)
+        except ValueError:
+            day = date(year, 3, 1)
+        if day >= today:
+            return day
+
+
+def scan(book, today, days):
+    found = []
+    for record in book.data.values():
+        if record.birthday is None:
+            continue
+        day = next_birthday(record.birthday.to_date(), today)
+        if (day - today).days <= days:
+            if day.weekday() >= 5:
+                day += timedelta(days=7 - day.weekday())
+            found.append({"name": record.name.value, "congratulation_date": day.strftime("%Y.%m.%d")})
+    return sorted(found, key=lambda item: item["name"])
+
+
+@pytest.fixture
+def book():
+    rnd = random.Random(3)
+    book = AddressBook()
+    book._cache.maxsize = 0
+    for i in range(300):
+        record = Record(f"n{i}")
+        book.add_record(record)
+        if i % 10:
+            record.add_birthday((date(1990, 1, 1) + timedelta(days=rnd.randrange(365))).strftime("%d.%m.%Y"))
+    leap = Record("Leap")
+    book.add_record(leap)
+    leap.add_birthday("29.02.2000")
+    book.delete("n5")
+    return book
+
+
+@pytest.mark.parametrize("days", [0, 7, 30, 365])
+def test_upcoming_matches_scan_all_year(book, days):
+    for offset in range(0, 800, 7 if days < 365 else 97):
+        today = date(2023, 1, 1) + timedelta(days=offset)
+        found = sorted(book._upcoming_birthdays(today, days), key=lambda item: item["name"])
+        assert found == scan(book, today, days), today
+
+
+def test_index_follows_changes_and_pickle(book):
+    today = date(2024, 6, 1)
+    record = Record("Late")
+    book.add_record(record)
+    record.add_birthday("02.06.1980")
+    book.delete("n1")
+    assert sorted(book._upcoming_birthdays(today, 7), key=lambda i: i["name"]) == scan(book, today, 7)
+    copy = pickle.loads(pickle.dumps(book))
+    assert copy._birthdays == book._birthdays
+
+
+def test_birthdays_command(book):
+    assert birthdays(["x"], book) == "Usage: birthdays [days]"
+    assert birthdays(["365"], book).startswith("Upcoming birthdays:\n")
+    assert birthdays([], AddressBook()) == "No birthdays in the next 7 days."
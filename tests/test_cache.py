@@ -0,0 +1,115 @@
+import random
+from datetime import date
+
+import pytest
+
+from personal_assistant.main import (
+    AddressBook, NotesBook, QueryCache, Record, SqliteAddressBook, SqliteNotesBook, execute,
+)
+
+
+def fresh(book, method, *args):
+    # той самий запит без кешу
+    return getattr(type(book), method).__wrapped__(book, *args)
+
+
+def names(records):
+    return [r.name.value for r in records]
+
+
+def test_lru_and_generation():
+    cache = QueryCache(maxsize=2)
+    calls = []
+
+    def compute(value):
+        return lambda: calls.append(value) or value
+
+    assert cache.get(1, "a", compute("a")) == "a"
+    assert cache.get(1, "b", compute("b")) == "b"
+    assert cache.get(1, "a", compute("x")) == "a"
+    cache.get(1, "c", compute("c"))  # витісняє "b", найдавніше використаний
+    assert list(cache.entries) == ["a", "c"]
+    assert cache.get(2, "a", compute("a2")) == "a2"  # нове покоління — кеш порожній
+    assert calls == ["a", "b", "c", "a2"]
+    assert (cache.hits, cache.misses) == (1, 4)
+
+
+def test_disabled_cache_keeps_nothing():
+    cache = QueryCache(maxsize=0)
+    assert cache.get(1, "a", lambda: 1) == 1
+    assert cache.get(1, "a", lambda: 2) == 2
+    assert not cache.entries
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def books(request):
+    if request.param == "memory":
+        yield AddressBook(), NotesBook()
+        return
+    book, notes = SqliteAddressBook("t.db"), SqliteNotesBook("t.db")
+    yield book, notes
+    book.close()
+    notes.close()
+
+
+def test_contact_results_follow_changes(books):
+    book, _ = books
+    rnd = random.Random(1)
+    today = date(2024, 3, 1)
+    for step in range(300):
+        name = f"user{rnd.randrange(20)}"
+        record = book.find(name)
+        action = rnd.random()
+        if record is None:
+            book.add_record(Record(name))
+        elif action < 0.3:
+            record.add_phone(f"050{rnd.randrange(10 ** 7):07d}")
+        elif action < 0.45 and record.phones:
+            record.edit_phone(record.phones[0].value, f"067{rnd.randrange(10 ** 7):07d}")
+        elif action < 0.6 and record.birthday is None:
+            record.add_birthday(f"{rnd.randint(1, 28):02d}.{rnd.randint(1, 12):02d}.1990")
+        elif action < 0.7 and not record.emails:
+            record.add_email(f"{name}@i.ua")
+        elif action < 0.8:
+            book.delete(name)
+        for query in ("user1", "050", "067", "i.ua"):
+            assert names(book.search(query)) == names(fresh(book, "search", query))
+        assert book._upcoming_birthdays(today, 30) == fresh(book, "_upcoming_birthdays", today, 30)
+    assert book._cache.hits > 0
+
+
+def test_note_results_follow_changes(books):
+    _, notes = books
+    rnd = random.Random(2)
+    words = ["milk", "trip", "work", "call"]
+    for step in range(200):
+        keys = list(notes.data)
+        action = rnd.random()
+        if not keys or action < 0.3:
+            notes.add_note(rnd.choice(words), " ".join(rnd.sample(words, 2)))
+        elif action < 0.5:
+            notes.edit_note(rnd.choice(keys), rnd.choice(words))
+        elif action < 0.65:
+            notes.data[rnd.choice(keys)].add_tag(rnd.choice(words))
+        elif action < 0.75:
+            notes.data[rnd.choice(keys)].remove_tag(rnd.choice(words))
+        elif action < 0.85:
+            notes.delete_note(rnd.choice(keys))
+        word = rnd.choice(words)
+        assert notes.search(word) == fresh(notes, "search", word)
+        assert notes.rank(word) == fresh(notes, "rank", word)
+        assert notes.search_by_tags([word]) == fresh(notes, "search_by_tags", [word])
+        assert notes.filter_by_tags(["+" + word]) == fresh(notes, "filter_by_tags", ["+" + word])
+    assert notes._cache.hits > 0
+
+
+def test_repeated_command_hits_cache():
+    book, notes = AddressBook(), NotesBook()
+    execute("add", ["John", "0501234567"], book, notes)
+    execute("find", ["john"], book, notes)
+    execute("find", ["john"], book, notes)
+    assert (book._cache.hits, book._cache.misses) == (1, 1)
+    execute("add-birthday", ["John", "01.02.1990"], book, notes)
+    execute("find", ["john"], book, notes)
+    assert book._cache.misses == 2
+    assert "cache contacts: 1 hits, 2 misses" in execute("stats", [], book, notes)
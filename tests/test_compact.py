@@ -0,0 +1,90 @@
+import copyreg
+import pickle
+
+from personal_assistant.main import (
+    AddressBook,
+    Address,
+    Birthday,
+    Email,
+    Name,
+    Note,
+    NotesBook,
+    Phone,
+    Record,
+    load_data,
+    load_notes,
+    save_data,
+)
+
+
+class Legacy:
+    # Об'єкт у форматі першої версії програми: pickle посилається на справжній
+    # клас, а станом є старий __dict__ з об'єктами Field
+    def __init__(self, cls, **state):
+        self.cls = cls
+        self.state = state
+
+    def __reduce__(self):
+        return copyreg._reconstructor, (self.cls, object, None), self.state
+
+
+def legacy_field(cls, value):
+    return Legacy(cls, value=value)
+
+
+def write_legacy_files():
+    john = Legacy(
+        Record,
+        name=legacy_field(Name, "John"),
+        phones=[legacy_field(Phone, "0501234567"), legacy_field(Phone, "0507654321")],
+        birthday=legacy_field(Birthday, "29.02.2000"),
+        address=legacy_field(Address, "Kyiv 1"),
+        emails=[legacy_field(Email, "j@x.com")],
+    )
+    ann = Legacy(Record, name=legacy_field(Name, "Ann"), phones=[], birthday=None, address=None, emails=[])
+    with open("addressbook.pkl", "wb") as f:
+        pickle.dump(Legacy(AddressBook, data={"john": john, "ann": ann}), f)
+    note = Legacy(Note, title="t", content="hello world", tags=["x", "y"], created_at="2024-05-01 10:00:00")
+    with open("notes.pkl", "wb") as f:
+        pickle.dump(Legacy(NotesBook, data={"1": note}, next_id=2), f)
+
+
+def test_old_pickles_load_into_compact_objects():
+    write_legacy_files()
+    book = load_data("addressbook.pkl")
+    john = book.find("john")
+    assert str(john) == (
+        "Contact name: John, phones: 0501234567; 0507654321, birthday: 29.02.2000, "
+        "address: Kyiv 1, emails: j@x.com"
+    )
+    assert [r.name.value for r in book.search("0765")] == ["John"]
+    assert [r.name.value for r in book.find_by_email("j@x.com")] == ["John"]
+    assert book._birthdays == [(2, 29, "john")]
+    john.edit_phone("0501234567", "0500000000")
+    save_data(book)
+    again = load_data("addressbook.pkl")
+    assert [p.value for p in again.find("john").phones] == ["0500000000", "0507654321"]
+
+    notes = load_notes("notes.pkl")
+    note = notes.data["1"]
+    assert (note.tags, note.created_at, note.modified_at) == (("x", "y"), "2024-05-01 10:00:00", "2024-05-01 10:00:00")
+    assert [k for k, _ in notes.search_by_tags(["x"])] == ["1"]
+    assert notes.next_id == 2
+
+
+def test_objects_have_no_instance_dict():
+    record = Record.from_values("John", ["0501234567"], 730000, "Kyiv", ["j@x.com"])
+    note = Note("t", "c")
+    for obj in (record, note, record.phones[0], record.birthday):
+        assert not hasattr(obj, "__dict__")
+
+
+def test_lazy_fields_round_trip():
+    record = Record("John")
+    record.add_phone("0501234567")
+    record.add_birthday("01.02.1990")
+    record.add_email("J@X.com")
+    copy = pickle.loads(pickle.dumps(record))
+    assert str(copy) == str(record)
+    assert copy.birthday.to_date().isoformat() == "1990-02-01"
+    assert copy.emails[0].value == "j@x.com"
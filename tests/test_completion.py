@@ -0,0 +1,96 @@
+import random
+
+import pytest
+
+from personal_assistant.main import (
+    AddressBook, Completer, NotesBook, Record, SqliteAddressBook, SqliteNotesBook, _complete_sorted,
+)
+
+LETTERS = "abмн"
+
+
+def scan_names(book, prefix, limit):
+    keys = sorted(key for key in book.data if key.startswith(prefix.lower()))
+    return [book.data[key].name.value for key in keys[:limit]]
+
+
+def scan_ids(notes, prefix, limit):
+    return sorted((key for key in notes.data if key.startswith(prefix)), key=int)[:limit]
+
+
+def scan_tags(notes, prefix, limit):
+    return sorted({tag for note in notes.data.values() for tag in note.tags if tag.startswith(prefix)})[:limit]
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def books(request):
+    if request.param == "memory":
+        yield AddressBook(), NotesBook()
+        return
+    book, notes = SqliteAddressBook("t.db"), SqliteNotesBook("t.db")
+    yield book, notes
+    book.close()
+    notes.close()
+
+
+def random_word(rnd):
+    return "".join(rnd.choice(LETTERS) for _ in range(rnd.randint(1, 4)))
+
+
+def test_complete_sorted():
+    items = ["a", "ab", "abc", "b", "ba"]
+    assert _complete_sorted(items, "a") == ["a", "ab", "abc"]
+    assert _complete_sorted(items, "a", 2) == ["a", "ab"]
+    assert _complete_sorted(items, "c") == []
+    assert _complete_sorted(items, "") == items
+
+
+def test_completion_matches_scan(books):
+    book, notes = books
+    rnd = random.Random(4)
+    for step in range(300):
+        action = rnd.random()
+        if action < 0.4:
+            name = random_word(rnd).capitalize()
+            if book.find(name) is None:
+                book.add_record(Record(name))
+        elif action < 0.5 and book.data:
+            book.delete(rnd.choice(list(book.data)))
+        elif action < 0.8:
+            key = notes.add_note("t", "c")
+            notes.data[key].add_tag(random_word(rnd))
+        elif notes.data:
+            key = rnd.choice(list(notes.data))
+            if rnd.random() < 0.5:
+                notes.delete_note(key)
+            elif notes.data[key].tags:
+                notes.data[key].remove_tag(notes.data[key].tags[0])
+        prefix, limit = random_word(rnd)[:rnd.randint(0, 2)], rnd.choice([3, 100])
+        assert book.complete_names(prefix, limit) == scan_names(book, prefix, limit)
+        assert book.complete_names(prefix.upper(), limit) == scan_names(book, prefix, limit)
+        id_prefix = str(rnd.randint(1, 30))[:rnd.randint(0, 2)]
+        assert notes.complete_ids(id_prefix, limit) == scan_ids(notes, id_prefix, limit)
+        assert notes.complete_tags(prefix, limit) == scan_tags(notes, prefix, limit)
+
+
+def test_completer_arguments():
+    book, notes = AddressBook(), NotesBook()
+    john = Record("John")
+    john.add_phone("0501234567")
+    john.add_phone("0671234567")
+    book.add_record(john)
+    book.add_record(Record("Joan"))
+    key = notes.add_note("plan", "text")
+    notes.data[key].add_tag("work")
+    notes.data[key].add_tag("home")
+    completer = Completer(book, notes)
+    assert completer.candidates([], "ad")[:3] == ["add", "add-address", "add-birthday"]
+    assert completer.candidates(["phone"], "jo") == ["Joan", "John"]
+    assert completer.candidates(["change", "john"], "06") == ["0671234567"]
+    assert completer.candidates(["change", "john", "0501234567"], "") == []
+    assert completer.candidates(["show-note"], "") == ["1"]
+    assert completer.candidates(["remove-tag", "1"], "w") == ["work"]
+    assert completer.candidates(["add-tag", "1", "home"], "") == ["home", "work"]
+    assert completer.candidates(["filter-notes-by-tag", "+work"], "-h") == ["-home"]
+    assert completer.candidates(["unique"], "o") == ["on", "off"]
+    assert Completer().candidates(["phone"], "jo") == []
@@ -0,0 +1,108 @@
+import random
+
+import pytest
+
+import personal_assistant.main as main
+from personal_assistant.main import AddressBook, Record, TokenIndex, find_contact
+
+WORDS = ("ivan", "olena", "kyiv", "lviv", "sadova", "gmail", "ukr")
+
+
+def matches(record, query):
+    # пошук перебором: кожне слово — початок токена або частина телефону
+    tokens = main._contact_tokens(record)
+    for word in query.lower().split():
+        if any(t.startswith(word) for t in tokens):
+            continue
+        if word.isdigit() and len(word) >= main.PHONE_SUFFIX_MIN and any(word in p.value for p in record.phones):
+            continue
+        return False
+    return True
+
+
+def brute(book, query):
+    return sorted(key for key, record in book.data.items() if matches(record, query))
+
+
+def random_phone(rnd):
+    return "050" + "".join(rnd.choice("0123456789") for _ in range(7))
+
+
+@pytest.fixture(autouse=True)
+def small_chunks(monkeypatch):
+    # дрібні частини, щоб перевірити їх поділ і видалення
+    monkeypatch.setattr(main, "TOKEN_CHUNK", 4)
+
+
+def test_search_matches_brute_force_after_changes():
+    rnd = random.Random(6)
+    book = AddressBook()
+    book._cache.maxsize = 0
+    for step in range(600):
+        keys = list(book.data)
+        action = rnd.random()
+        if action < 0.4 or not keys:
+            name = f"{rnd.choice(WORDS)}{rnd.randrange(50)}"
+            record = Record(name)
+            book.add_record(record)
+            record.add_phone(random_phone(rnd))
+        else:
+            record = book.data[rnd.choice(keys)]
+            if action < 0.55:
+                record.add_phone(random_phone(rnd))
+            elif action < 0.7 and record.phones:
+                record.edit_phone(rnd.choice(record.phones).value, random_phone(rnd))
+            elif action < 0.8 and record.address is None:
+                record.add_address(f"{rnd.choice(WORDS)} {rnd.randrange(20)}")
+            elif action < 0.9:
+                email = f"{rnd.choice(WORDS)}{rnd.randrange(99)}@{rnd.choice(WORDS)}.com"
+                if email not in record._emails:
+                    record.add_email(email)
+            else:
+                book.delete(record.name.value)
+        if step % 50 == 0:
+            for query in ("iv", "olena", "kyiv 1", "gm", "050", "1234", "sadova ivan"):
+                assert [r.name.value.lower() for r in book.search(query)] == brute(book, query)
+
+
+def test_edit_phone_keeps_suffix_shared_with_other_phone():
+    book = AddressBook()
+    record = Record("John")
+    book.add_record(record)
+    record.add_phone("0501234567")
+    record.add_phone("0671234567")
+    record.edit_phone("0501234567", "0999999999")
+    assert [r.name.value for r in book.search("1234567")] == ["John"]
+    assert book.search("0501") == []
+
+
+def test_bulk_and_single_adds_build_the_same_index():
+    records = [Record.from_values(f"user{i}", [f"050{i:07d}"], None, "Kyiv", [f"u{i}@ukr.net"]) for i in range(40)]
+    one = AddressBook()
+    for record in records:
+        one.add_record(Record.from_values(record._name, [record._phones], None, "Kyiv", record._emails))
+    bulk = AddressBook()
+    bulk.add_records(enumerate(records, 1))
+    for query in ("user1", "ukr", "kyiv", "00000", "u3@"):
+        assert [r.name.value for r in one.search(query)] == [r.name.value for r in bulk.search(query)]
+
+
+def test_token_index_prefix():
+    index = TokenIndex([("apple", "a"), ("apricot", "b"), ("banana", "c")])
+    for i in range(30):
+        index.add(f"ap{i:02d}", f"k{i}")
+    assert index.prefix("apr") == {"b"}
+    assert len(index.prefix("ap")) == 32
+    for i in range(30):
+        index.discard(f"ap{i:02d}", f"k{i}")
+    assert index.prefix("ap") == {"a", "b"}
+    assert len(index) == 3
+    assert all(chunk for chunk in index.chunks)
+
+
+def test_find_command():
+    book = AddressBook()
+    book.add_record(Record.from_values("Anna", ["0501112233"], None, "Lviv, Sadova 1", ["anna@i.ua"]))
+    assert "Anna" in find_contact(["sad"], book)
+    assert find_contact(["nobody"], book) == "No contacts found."
+    assert find_contact([], book).startswith("Usage")
@@ -0,0 +1,116 @@
+import pytest
+
+from personal_assistant.main import (
+    DEDUPE_BLOCK_MAX,
+    AddressBook,
+    Birthday,
+    Record,
+    SqliteAddressBook,
+    dedupe,
+    load_data,
+    record_to_row,
+)
+
+
+def contact(name, phones=(), birthday=None, address=None, emails=()):
+    ordinal = Birthday(birthday).ordinal if birthday else None
+    return Record.from_values(name, list(phones), ordinal, address, list(emails))
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def book(request):
+    book = AddressBook() if request.param == "memory" else SqliteAddressBook("t.db")
+    yield book
+    if request.param == "sqlite":
+        book.close()
+
+
+def fill(book):
+    book.add_record(contact("Ivan Petrenko", ["0501234567"]))
+    book.add_record(contact("Petrenko Ivan", birthday="01.02.1990", address="Kyiv", emails=["ivan@x.ua"]))
+    book.add_record(contact("Ivan P.", ["0501234567"]))
+    book.add_record(contact("Ivan Petrneko", emails=["ivan@x.ua", "ip@y.ua"]))
+    # однакове ім'я, різні дні народження
+    book.add_record(contact("Olena Koval", birthday="01.01.1980"))
+    book.add_record(contact("Koval Olena", birthday="02.01.1980"))
+    # спільний телефон, різні імена
+    book.add_record(contact("Anna", ["0670000000"]))
+    book.add_record(contact("Taras", ["0670000000"]))
+    # лише ініціал без спільних телефонів чи email
+    book.add_record(contact("Sofiia M"))
+    book.add_record(contact("Sofiia Melnyk"))
+
+
+def test_find_duplicates_groups_most_complete_first(book):
+    fill(book)
+    assert book.find_duplicates() == [["petrenko ivan", "ivan petrneko", "ivan petrenko", "ivan p."]]
+
+
+def test_dedupe_merge_combines_fields(book):
+    fill(book)
+    assert "Petrenko Ivan <- Ivan Petrneko, Ivan Petrenko, Ivan P." in dedupe([], book)
+    assert dedupe(["--merge"], book) == "Merged 3 contacts into 1."
+    record = book.find("petrenko ivan")
+    assert [p.value for p in record.phones] == ["0501234567"]
+    assert sorted(e.value for e in record.emails) == ["ip@y.ua", "ivan@x.ua"]
+    assert record.birthday.value == "01.02.1990"
+    assert record.address.value == "Kyiv"
+    assert book.find("ivan petrenko") is None and book.find("ivan p.") is None
+    assert [r.name.value for r in book.find_by_phone("0501234567")] == ["Petrenko Ivan"]
+    assert [r.name.value for r in book.search("ip@y")] == ["Petrenko Ivan"]
+    assert book.find_duplicates() == []
+    assert dedupe([], book) == "No duplicate contacts found."
+
+
+def test_chained_pairs_do_not_join_different_birthdays(book):
+    # перший і третій пов'язані лише через другий, у якого немає дати
+    book.add_record(contact("Ivan Petrenko", ["0501234567"], birthday="01.01.1990"))
+    book.add_record(contact("Ivan Petrneko", ["0501234567"]))
+    book.add_record(contact("Petrenko Ivan", ["0501234567"], birthday="02.02.1985"))
+    groups = book.find_duplicates()
+    assert len(groups) == 1 and "petrenko ivan" not in groups[0]
+    dedupe(["--merge"], book)
+    assert book.find("petrenko ivan").birthday.value == "02.02.1985"
+    assert book.find("ivan petrenko").birthday.value == "01.01.1990"
+    assert len(book) == 2
+
+
+def test_merge_refuses_different_birthdays(book):
+    book.add_record(contact("Ivan Petrenko", birthday="01.01.1990"))
+    book.add_record(contact("Petrenko Ivan", ["0501234567"], birthday="02.02.1985"))
+    with pytest.raises(ValueError):
+        book.merge_contacts("ivan petrenko", ["petrenko ivan"])
+    assert len(book) == 2
+    assert [p.value for p in book.find("petrenko ivan").phones] == ["0501234567"]
+
+
+def test_merge_in_unique_mode_with_shared_phone():
+    book = AddressBook()
+    fill(book)
+    book.set_unique(True)
+    group = book.find_duplicates()[0]
+    book.merge_contacts(group[0], group[1:])
+    assert [p.value for p in book.find(group[0]).phones] == ["0501234567"]
+
+
+def test_merge_replays_from_journal():
+    book = load_data("a.pkl", "a.journal")
+    fill(book)
+    group = book.find_duplicates()[0]
+    book.merge_contacts(group[0], group[1:])
+    expected = {key: record_to_row(r) for key, r in book.data.items()}
+    book.journal.close()
+    again = load_data("a.pkl", "a.journal")
+    assert {key: record_to_row(r) for key, r in again.data.items()} == expected
+    again.journal.close()
+
+
+def test_large_blocks_are_skipped():
+    book = AddressBook()
+    for i in range(DEDUPE_BLOCK_MAX + 1):
+        book.add_record(contact(f"Ivan P{i}x", ["0990000000"]))
+    assert book.find_duplicates() == []
+
+
+def test_usage():
+    assert dedupe(["x"], AddressBook()).startswith("Usage")
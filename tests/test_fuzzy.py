@@ -0,0 +1,141 @@
+import random
+
+import pytest
+
+from personal_assistant import main
+from personal_assistant.main import (
+    AddressBook, NameIndex, NotesBook, Record, SqliteAddressBook, _edit_distance, execute, lookup_contact,
+)
+
+LETTERS = "abcdeilmnorst"
+
+
+def distance(a, b):
+    # повна таблиця Дамерау-Левенштейна (з перестановкою сусідніх літер)
+    d = [[i + j if not i * j else 0 for j in range(len(b) + 1)] for i in range(len(a) + 1)]
+    for i in range(1, len(a) + 1):
+        for j in range(1, len(b) + 1):
+            d[i][j] = min(d[i - 1][j] + 1, d[i][j - 1] + 1, d[i - 1][j - 1] + (a[i - 1] != b[j - 1]))
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                d[i][j] = min(d[i][j], d[i - 2][j - 2] + 1)
+    return d[-1][-1]
+
+
+def scan_closest(keys, name):
+    query = name.lower()
+    limit = main._fuzzy_limit(query)
+    found = sorted(key for key in keys if key != query and distance(query, key) == 1)
+    if found:
+        return 1, found
+    if limit < 2 or len(main._name_grams(query)) - 4 * limit < 1:
+        return None
+    found = sorted(key for key in keys if distance(query, key) == 2)
+    return (2, found) if found else None
+
+
+def typo(rnd, word, count):
+    for _ in range(count):
+        i = rnd.randrange(len(word))
+        kind = rnd.randrange(3)
+        if kind == 0 and len(word) > 1:
+            word = word[:i] + word[i + 1:]
+        elif kind == 1:
+            word = word[:i] + rnd.choice(LETTERS) + word[i + 1:]
+        else:
+            word = word[:i] + rnd.choice(LETTERS) + word[i:]
+    return word
+
+
+def random_name(rnd):
+    return "".join(rnd.choice(LETTERS) for _ in range(rnd.randrange(4, 14)))
+
+
+def test_edit_distance_matches_full_table():
+    rnd = random.Random(1)
+    for _ in range(2000):
+        a, b = random_name(rnd), random_name(rnd)
+        b = typo(rnd, a, rnd.randrange(4)) if rnd.random() < 0.7 else b
+        for limit in (1, 2):
+            assert _edit_distance(a, b, limit) == min(distance(a, b), limit + 1), (a, b)
+
+
+def test_closest_matches_scan():
+    rnd = random.Random(2)
+    keys = {random_name(rnd) for _ in range(400)}
+    index = NameIndex(keys)
+    words = sorted(keys)
+    for _ in range(200):
+        query = typo(rnd, rnd.choice(words), rnd.randrange(1, 4))
+        if query in keys:
+            continue
+        assert index.closest(query) == scan_closest(keys, query), query
+
+
+def test_closest_after_add_and_discard():
+    rnd = random.Random(3)
+    keys = set()
+    index = NameIndex()
+    for _ in range(600):
+        if keys and rnd.random() < 0.3:
+            key = rnd.choice(sorted(keys))
+            keys.discard(key)
+            index.discard(key)
+        else:
+            key = random_name(rnd)
+            keys.add(key)
+            index.add(key)
+    for key in sorted(keys)[:80]:
+        query = typo(rnd, key, 2)
+        if query not in keys:
+            assert index.closest(query) == scan_closest(keys, query), query
+
+
+def test_budget_gives_up_on_common_names(monkeypatch):
+    index = NameIndex([f"alexandra{i}x" for i in range(50)])
+    assert index.closest("alexandrazzx") is not None
+    monkeypatch.setattr(main, "FUZZY_CANDIDATES", 10)
+    assert index.closest("alexandrazzx") is None
+    # одна помилка не залежить від бюджету
+    assert index.closest("alexandra1") == (1, ["alexandra1x"])
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def book(request):
+    book = AddressBook() if request.param == "memory" else SqliteAddressBook("t.db")
+    yield book
+    if request.param == "sqlite":
+        book.close()
+
+
+def test_book_index_follows_changes(book):
+    for name in ("Oleksandr", "Olena", "Petro"):
+        book.add_record(Record(name))
+    assert [r.name.value for r in book.find_closest("olna")] == ["Olena"]
+    book.delete("olena")
+    book.add_record(Record("Olga"))
+    assert [r.name.value for r in book.find_closest("olna")] == ["Olga"]
+    assert [r.name.value for r in book.find_closest("Oleksander")] == ["Oleksandr"]
+    assert book.find_closest("zzzz") == []
+
+
+def test_lookup_contact(book):
+    john = Record("John")
+    john.add_phone("0501234567")
+    book.add_record(john)
+    book.add_record(Record("Joan"))
+    assert lookup_contact(book, "john") == (john, "")
+    assert lookup_contact(book, "jhon", resolve=True) == (john, "(showing John for 'jhon')\n")
+    with pytest.raises(ValueError, match="Did you mean John"):
+        lookup_contact(book, "jhon")
+    with pytest.raises(ValueError, match="Did you mean Joan, John|Did you mean John, Joan"):
+        lookup_contact(book, "jonn", resolve=True)
+    with pytest.raises(KeyError):
+        lookup_contact(book, "Petro")
+
+
+def test_commands_suggest_names():
+    book, notes = AddressBook(), NotesBook()
+    execute("add", ["Mykola", "0501234567"], book, notes)
+    assert execute("phone", ["Mykloa"], book, notes) == "(showing Mykola for 'Mykloa')\nMykola: 0501234567"
+    assert execute("change", ["Mykloa", "0501234567", "0509999999"], book, notes) == "Contact not found. Did you mean Mykola?"
+    assert execute("phone", ["Taras"], book, notes) == "Contact not found."
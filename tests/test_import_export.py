@@ -0,0 +1,142 @@
+import csv
+import json
+
+import pytest
+
+from personal_assistant.main import (
+    AddressBook,
+    Journal,
+    NotesBook,
+    Record,
+    execute,
+    import_data,
+    load_data,
+    load_notes,
+    main,
+    record_to_row,
+)
+
+
+def write_contacts_csv(filename, count):
+    with open(filename, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["name", "phones", "birthday", "address", "emails"])
+        for i in range(count):
+            writer.writerow([f"user{i}", f"050{i:07d}", "01.02.1990", "Kyiv", f"u{i}@i.ua"])
+
+
+@pytest.fixture
+def compactions(monkeypatch):
+    calls = []
+    compact = Journal.compact
+
+    def counting(self):
+        calls.append(self.size)
+        compact(self)
+
+    monkeypatch.setattr(Journal, "compact", counting)
+    return calls
+
+
+def test_import_is_compacted_once(compactions):
+    write_contacts_csv("c.csv", 2500)
+    book = load_data("addressbook.pkl", "addressbook.journal")
+    book.add_record(Record("Before"))
+    assert book.import_file("c.csv") == (2500, [])
+    assert len(compactions) == 1
+    with open("addressbook.journal", encoding="utf-8") as f:
+        assert f.read() == ""
+    book.add_record(Record("After"))
+    expected = {key: record_to_row(r) for key, r in book.data.items()}
+    book.journal.close()
+
+    again = load_data("addressbook.pkl", "addressbook.journal")
+    assert {key: record_to_row(r) for key, r in again.data.items()} == expected
+    assert [r.name.value for r in again.search("0500002499")] == ["user2499"]
+    again.journal.close()
+
+
+def test_notes_import_is_compacted_once(compactions):
+    with open("n.jsonl", "w", encoding="utf-8") as f:
+        for i in range(1500):
+            f.write(json.dumps({"title": f"t{i}", "content": "text", "tags": "a;b"}) + "\n")
+    notes = load_notes("notes.pkl", "notes.journal")
+    assert notes.import_file("n.jsonl") == (1500, [])
+    assert len(compactions) == 1
+    notes.journal.close()
+    again = load_notes("notes.pkl", "notes.journal")
+    assert len(again) == 1500 and again.search_by_tags(["a"])
+    again.journal.close()
+
+
+def test_failed_import_without_changes_does_not_compact(compactions):
+    book = load_data("addressbook.pkl", "addressbook.journal")
+    with pytest.raises(OSError):
+        book.import_file("missing.csv")
+    assert compactions == []
+    assert book.journal is not None
+    book.journal.close()
+
+
+@pytest.mark.parametrize("ext", ["csv", "jsonl"])
+def test_contacts_round_trip(ext):
+    book = AddressBook()
+    book.add_record(Record.from_values("Anna", ["0501112233", "0674445566"], 726000, "Lviv, Sadova 1", ["a@i.ua"]))
+    book.add_record(Record("Bob"))
+    book.export_file(f"c.{ext}")
+    copy = AddressBook()
+    assert copy.import_file(f"c.{ext}") == (2, [])
+    assert {k: record_to_row(r) for k, r in copy.data.items()} == {k: record_to_row(r) for k, r in book.data.items()}
+
+
+@pytest.mark.parametrize("ext", ["csv", "jsonl"])
+def test_notes_round_trip(ext):
+    notes = NotesBook()
+    key = notes.add_note("Title", "some content")
+    notes.data[key].add_tag("work")
+    notes.export_file(f"n.{ext}")
+    copy = NotesBook()
+    assert copy.import_file(f"n.{ext}") == (1, [])
+    note = copy.data["1"]
+    assert (note.title, note.content, note.tags, note.created_at) == (
+        "Title", "some content", ("work",), notes.data[key].created_at
+    )
+
+
+def test_invalid_rows_are_reported():
+    with open("bad.csv", "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["name", "phones", "birthday"])
+        writer.writerow(["", "", ""])
+        writer.writerow(["Ann", "123", ""])
+        writer.writerow(["Bob", "", "31.02.2000"])
+        writer.writerow(["Eve", "0501234567", "01.01.2000"])
+    book = AddressBook()
+    imported, errors = book.import_file("bad.csv")
+    assert imported == 1
+    assert [line for line, _ in errors] == [2, 3, 4]
+    assert "Imported 1 contacts" in import_data(["contacts", "bad.csv"], AddressBook(), NotesBook())
+
+
+@pytest.mark.parametrize("content", [
+    "name,phones\nАнна,0501234567\n".encode("cp1251"),
+    b"name,phones\nann,0501234567\n\"" + b"x" * 200000 + b"\",0501234568\n",  # csv.Error: поле задовге
+])
+def test_unreadable_file_is_reported(workdir, content):
+    (workdir / "bad.csv").write_bytes(content)
+    result = execute("import", ["contacts", "bad.csv"], AddressBook(), NotesBook())
+    assert result.startswith("Cannot read bad.csv: ")
+
+
+def test_batch_continues_after_bad_import(workdir, capsys):
+    (workdir / "bad.csv").write_bytes("name\nОлена\n".encode("cp1251"))
+    (workdir / "cmds.txt").write_text("import contacts bad.csv\nadd Ann\n", encoding="utf-8")
+    main(["--batch", "cmds.txt"])
+    out = capsys.readouterr().out
+    assert "Cannot read bad.csv" in out and "Contact added." in out
+
+
+def test_missing_file_is_reported():
+    book, notes = AddressBook(), NotesBook()
+    assert execute("import", ["notes", "nope.csv"], book, notes).startswith("Error: ")
+    assert execute("export", ["contacts", "no/such/dir.csv"], book, notes).startswith("Error: ")
@@ -0,0 +1,97 @@
+import json
+
+from personal_assistant.main import Journal, Record, load_data, load_notes, note_to_row, record_to_row
+
+
+def rows(book):
+    return {key: record_to_row(record) for key, record in book.data.items()}
+
+
+def note_rows(notes):
+    return {key: note_to_row(note) for key, note in notes.data.items()}
+
+
+def fill(book):
+    record = Record("John")
+    book.add_record(record)
+    record.add_phone("0501234567")
+    record.edit_phone("0501234567", "0671234567")
+    record.add_birthday("01.02.1990")
+    record.add_address("Kyiv")
+    record.add_email("john@i.ua")
+    book.add_record(Record("Ann"))
+    book.delete("Ann")
+    book.set_unique(True)
+
+
+def test_contacts_are_replayed_from_journal():
+    book = load_data("a.pkl", "a.journal")
+    fill(book)
+    expected = rows(book)
+    book.journal.close()  # вихід без знімка
+    again = load_data("a.pkl", "a.journal")
+    assert rows(again) == expected and again.unique
+    assert [r.name.value for r in again.search("0671")] == ["John"]
+    again.journal.close()
+
+
+def test_notes_are_replayed_from_journal():
+    notes = load_notes("n.pkl", "n.journal")
+    key = notes.add_note("Title", "text")
+    notes.edit_note(key, "changed")
+    notes.data[key].add_tag("work")
+    notes.data[key].add_tag("home")
+    notes.data[key].remove_tag("home")
+    notes.delete_note(notes.add_note("Gone", "x"))
+    expected = note_rows(notes)
+    notes.journal.close()
+    again = load_notes("n.pkl", "n.journal")
+    assert note_rows(again) == expected
+    assert again.next_id == 3
+    assert [k for k, _ in again.search_by_tags(["work"])] == [key]
+    again.journal.close()
+
+
+def test_truncated_last_line_is_dropped():
+    book = load_data("a.pkl", "a.journal")
+    book.add_record(Record("Ann"))
+    book.add_record(Record("Bob"))
+    book.journal.close()
+    with open("a.journal", "rb") as f:
+        data = f.read()
+    with open("a.journal", "wb") as f:
+        f.write(data[:-5])  # збій посеред запису останнього рядка
+
+    again = load_data("a.pkl", "a.journal")
+    assert sorted(again.data) == ["ann"]
+    again.add_record(Record("Eve"))
+    again.journal.close()
+    with open("a.journal", encoding="utf-8") as f:
+        entries = [json.loads(line) for line in f]
+    assert [e[1] for e in entries] == ["add_record", "add_record"]
+    assert sorted(load_data("a.pkl", "a.journal").data) == ["ann", "eve"]
+
+
+def test_journal_is_compacted_into_snapshot():
+    book = load_data("a.pkl")
+    Journal("a.journal", compact_every=3).open(book, "a.pkl")
+    for name in ("A", "B", "C", "D"):
+        book.add_record(Record(name))
+    assert book.journal.size == 1
+    assert book.journal_seq == 3
+    book.journal.close()
+    assert sorted(load_data("a.pkl").data) == ["a", "b", "c"]
+    assert sorted(load_data("a.pkl", "a.journal").data) == ["a", "b", "c", "d"]
+
+
+def test_entries_already_in_snapshot_are_skipped():
+    book = load_data("a.pkl", "a.journal")
+    record = Record("John")
+    book.add_record(record)
+    record.add_phone("0501234567")
+    book.journal.compact()
+    record.add_phone("0671234567")
+    book.journal.close()
+    again = load_data("a.pkl", "a.journal")
+    assert [p.value for p in again.find("john").phones] == ["0501234567", "0671234567"]
+    again.journal.close()
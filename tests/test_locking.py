@@ -0,0 +1,103 @@
+from personal_assistant.main import (
+    FileLock,
+    Record,
+    load_data,
+    load_notes,
+    save_data,
+    save_notes,
+)
+
+
+def names(book):
+    return sorted(r.name.value for r in book.data.values())
+
+
+def test_concurrent_saves_keep_both_changes():
+    save_data(load_data("a.pkl"))
+    first, second = load_data("a.pkl"), load_data("a.pkl")
+    first.add_record(Record("Ann"))
+    second.add_record(Record("Bob"))
+    save_data(first)
+    save_data(second)
+    assert names(load_data("a.pkl")) == ["Ann", "Bob"]
+    assert names(second) == ["Ann", "Bob"]
+
+
+def test_deletion_is_merged():
+    book = load_data("a.pkl")
+    book.add_record(Record("Ann"))
+    book.add_record(Record("Bob"))
+    save_data(book)
+    first, second = load_data("a.pkl"), load_data("a.pkl")
+    first.delete("Ann")
+    second.add_record(Record("Eve"))
+    save_data(first)
+    save_data(second)
+    assert names(load_data("a.pkl")) == ["Bob", "Eve"]
+
+
+def test_unchanged_book_is_not_rewritten():
+    book = load_data("a.pkl")
+    book.add_record(Record("Ann"))
+    save_data(book)
+    version = book.version
+    save_data(book)
+    assert book.version == version
+
+
+def test_new_notes_get_free_ids_on_merge():
+    save_notes(load_notes("n.pkl"))
+    first, second = load_notes("n.pkl"), load_notes("n.pkl")
+    first.add_note("first", "a")
+    second.add_note("second", "b")
+    save_notes(first)
+    save_notes(second)
+    merged = load_notes("n.pkl")
+    assert sorted((k, n.title) for k, n in merged.data.items()) == [("1", "first"), ("2", "second")]
+    assert merged.next_id == 3
+
+
+def test_non_owner_merge_keeps_owner_journal_entries():
+    owner = load_data("a.pkl", "a.journal")
+    stale = load_data("a.pkl", "a.journal")   # читач, завантажений до запису X
+    assert owner.journal is not None and stale.journal is None
+    owner.add_record(Record("X"))             # лише у журналі власника
+    reader = load_data("a.pkl", "a.journal")  # прочитав X із журналу
+    assert names(reader) == ["X"]
+    stale.add_record(Record("Y"))
+    save_data(stale)                          # знімок без X
+    reader.add_record(Record("Z"))
+    save_data(reader)                         # злиття з цим знімком
+    owner.journal.close()                     # власник завершився без стиснення
+
+    again = load_data("a.pkl", "a.journal")
+    assert names(again) == ["X", "Y", "Z"]
+    again.journal.close()
+
+
+def test_non_owner_notes_merge_keeps_owner_journal_entries():
+    base = load_notes("n.pkl")
+    base.add_note("base", "text")
+    save_notes(base)
+    owner = load_notes("n.pkl", "n.journal")
+    stale = load_notes("n.pkl", "n.journal")
+    owner.add_note("X", "x")                  # id 2, лише у журналі власника
+    reader = load_notes("n.pkl", "n.journal")
+    stale.edit_note("1", "edited")
+    save_notes(stale)                         # знімок без X
+    reader.add_note("Z", "z")                 # id 3
+    save_notes(reader)
+    owner.journal.close()
+
+    again = load_notes("n.pkl", "n.journal")
+    assert sorted((k, n.title) for k, n in again.data.items()) == [("1", "base"), ("2", "X"), ("3", "Z")]
+    assert again.data["1"].content == "edited"
+    again.journal.close()
+
+
+def test_file_lock_is_exclusive():
+    with FileLock("a.pkl"):
+        other = FileLock("a.pkl")
+        assert not other.acquire(blocking=False)
+    assert other.acquire(blocking=False)
+    other.release()
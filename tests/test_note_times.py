@@ -0,0 +1,96 @@
+import pickle
+import random
+from datetime import datetime
+
+from personal_assistant.main import Note, NotesBook, notes_between, recent_notes, to_timestamp
+
+DAY = 24 * 3600
+START = to_timestamp(datetime(2024, 1, 1))
+
+
+def scan(notes, start, end, field, newest_first=False):
+    found = [
+        (getattr(note, field), int(key), key) for key, note in notes.data.items()
+        if (start is None or getattr(note, field) >= start) and (end is None or getattr(note, field) < end)
+    ]
+    found.sort(reverse=newest_first)
+    return [key for _, _, key in found]
+
+
+def keys(pairs):
+    return [key for key, _ in pairs]
+
+
+def ids(result):
+    return [line.split(":")[0] for line in result.split("\n")]
+
+
+def add(notes, created, title="t", content="c", tags=()):
+    note = Note(title, content)
+    note.created = note.modified = created
+    note.tags = tuple(tags)
+    key = str(notes.next_id)
+    notes.next_id += 1
+    notes[key] = note
+    return key
+
+
+def random_notes(rnd, count=150):
+    notes = NotesBook()
+    for _ in range(count):
+        add(notes, START + rnd.randrange(60) * DAY // 2)
+    return notes
+
+
+def test_by_time_matches_scan_after_changes():
+    rnd = random.Random(8)
+    notes = random_notes(rnd)
+    for step in range(200):
+        key = rnd.choice(list(notes.data))
+        action = rnd.random()
+        if action < 0.4:
+            notes.edit_note(key, "edited", START + rnd.randrange(60) * DAY // 2)
+        elif action < 0.6:
+            notes.delete_note(key)
+        else:
+            add(notes, START + rnd.randrange(60) * DAY // 2)
+        start = rnd.choice([None, START + rnd.randrange(30) * DAY])
+        end = rnd.choice([None, START + rnd.randrange(30, 61) * DAY // 2])
+        for field in ("created", "modified"):
+            for newest_first in (False, True):
+                assert keys(notes.by_time(start, end, field, newest_first)) == scan(notes, start, end, field, newest_first)
+
+
+def test_index_survives_pickle():
+    notes = random_notes(random.Random(9))
+    copy = pickle.loads(pickle.dumps(notes))
+    assert keys(copy.by_time(field="modified")) == scan(copy, None, None, "modified")
+
+
+def test_notes_between_command():
+    notes = NotesBook()
+    add(notes, to_timestamp(datetime(2024, 3, 1, 10)), "plan", "buy milk", ["home"])
+    add(notes, to_timestamp(datetime(2024, 3, 2, 10)), "work", "call", ["work"])
+    add(notes, to_timestamp(datetime(2024, 3, 5)), "late", "text")
+    notes.edit_note("1", "buy bread", to_timestamp(datetime(2024, 3, 10)))
+    assert ids(notes_between(["2024-03-01", "2024-03-05"], notes)) == ["1", "2"]
+    assert notes_between(["2024-03-01", "2024-03-05", "--tag", "Work"], notes).startswith("2: ")
+    assert notes_between(["--text", "bread", "2024-03-01", "2024-03-05"], notes).startswith("1: ")
+    assert notes_between(["2024-03-09", "2024-03-11", "--modified"], notes).startswith("1: ")
+    assert notes_between(["2024-03-06", "2024-03-09"], notes) == "No notes in this period."
+    assert notes_between(["2024-03-01"], notes).startswith("Usage")
+    assert notes_between(["2024-13-01", "2024-03-05"], notes).startswith("Usage")
+    assert notes_between(["2024-03-01", "2024-03-05", "--tag"], notes).startswith("Usage")
+
+
+def test_recent_notes_command():
+    notes = NotesBook()
+    for day in range(1, 16):
+        add(notes, to_timestamp(datetime(2024, 3, day)), f"note{day}", "text", ["even"] if day % 2 == 0 else [])
+    notes.edit_note("3", "fresh", to_timestamp(datetime(2024, 4, 1)))
+    assert ids(recent_notes([], notes)) == ["3", "15", "14", "13", "12", "11", "10", "9", "8", "7"]
+    assert ids(recent_notes(["2", "--created"], notes)) == ["15", "14"]
+    assert ids(recent_notes(["3", "--tag", "even"], notes)) == ["14", "12", "10"]
+    assert recent_notes(["--text", "missing"], notes) == "No notes found."
+    assert recent_notes(["x"], notes).startswith("Usage")
+    assert recent_notes(["1", "2"], notes).startswith("Usage")
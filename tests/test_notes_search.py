@@ -0,0 +1,81 @@
+import pickle
+import random
+
+from personal_assistant.main import NotesBook, find_notes
+
+ALPHABET = "abcdeAB "
+
+
+def scan(notes, query):
+    # пошук перебором: кількість входжень у назву, текст і теги
+    q = query.lower()
+    found = []
+    for key, note in notes.data.items():
+        count = note.title.lower().count(q) + note.content.lower().count(q) + sum(q in t for t in note.tags)
+        if count:
+            found.append((count, key, note))
+    found.sort(reverse=True, key=lambda item: item[0])
+    return [(key, note) for _, key, note in found]
+
+
+def words(rnd, n):
+    return "".join(rnd.choice(ALPHABET) for _ in range(n))
+
+
+def test_search_matches_scan_after_changes():
+    rnd = random.Random(1)
+    notes = NotesBook()
+    notes._cache.maxsize = 0
+    for _ in range(150):
+        notes.add_note(words(rnd, 5), words(rnd, 40))
+    for _ in range(600):
+        keys = list(notes.data)
+        action = rnd.random()
+        if action < 0.2:
+            notes.add_note(words(rnd, 5), words(rnd, 30))
+        elif action < 0.35:
+            notes.edit_note(rnd.choice(keys), words(rnd, 30))
+        elif action < 0.45:
+            notes.delete_note(rnd.choice(keys))
+        elif action < 0.7:
+            notes.data[rnd.choice(keys)].add_tag(words(rnd, 4))
+        else:
+            note = notes.data[rnd.choice(keys)]
+            if note.tags:
+                note.remove_tag(rnd.choice(note.tags))
+        query = words(rnd, rnd.randint(1, 5))
+        assert notes.search(query) == scan(notes, query), query
+
+
+def test_index_is_rebuilt_after_pickle():
+    notes = NotesBook()
+    notes.add_note("Shopping", "milk and bread")
+    notes.add_note("Work", "quarterly report")
+    copy = pickle.loads(pickle.dumps(notes))
+    assert [k for k, _ in copy.search("report")] == ["2"]
+    copy.add_note("More", "bread again")
+    assert [k for k, _ in copy.search("bread")] == [k for k, _ in scan(copy, "bread")]
+
+
+def test_find_notes_command():
+    notes = NotesBook()
+    notes.add_note("Shopping", "milk")
+    assert find_notes(["milk"], notes).startswith("1: ")
+    assert find_notes(["nothing"], notes) == "No matches."
+    assert find_notes([], notes).startswith("Usage")
+
+
+def test_index_is_built_on_first_long_query():
+    rnd = random.Random(2)
+    notes = NotesBook()
+    notes._cache.maxsize = 0
+    for _ in range(50):
+        notes.add_note(words(rnd, 5), words(rnd, 30))
+    copy = pickle.loads(pickle.dumps(notes))
+    assert copy._index is None
+    copy.edit_note("3", words(rnd, 30))  # зміни до побудови індексу
+    copy.data["4"].add_tag("tag")
+    assert copy.search("ab") == scan(copy, "ab")
+    assert copy._index is None  # короткий запит перевіряє всі нотатки
+    assert copy.search("abc") == scan(copy, "abc")
+    assert copy._index and all(len(gram) == 3 for gram in copy._index)
@@ -0,0 +1,101 @@
+import pickle
+import random
+
+import pytest
+
+from personal_assistant.main import AddressBook, Record, SqliteAddressBook, owner_contact, unique_mode
+
+PHONES = [f"050000000{i}" for i in range(6)]
+EMAILS = [f"u{i}@i.ua" for i in range(4)]
+
+
+def scan_phone(book, phone):
+    return sorted(key for key, r in book.data.items() if phone in [p.value for p in r.phones])
+
+
+def scan_email(book, email):
+    return sorted(key for key, r in book.data.items() if email in [e.value for e in r.emails])
+
+
+def keys(records):
+    return [r.name.value.lower() for r in records]
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def book(request):
+    book = AddressBook() if request.param == "memory" else SqliteAddressBook("t.db")
+    yield book
+    if request.param == "sqlite":
+        book.close()
+
+
+def test_owner_index_matches_scan(book):
+    rnd = random.Random(7)
+    for _ in range(300):
+        name = f"n{rnd.randrange(15)}"
+        record = book.find(name)
+        if record is None:
+            book.add_record(Record(name))
+            continue
+        action = rnd.random()
+        if action < 0.35:
+            record.add_phone(rnd.choice(PHONES))
+        elif action < 0.55 and record.phones:
+            record.edit_phone(rnd.choice(record.phones).value, rnd.choice(PHONES))
+        elif action < 0.75:
+            email = rnd.choice(EMAILS)
+            if email not in record._emails:
+                record.add_email(email)
+        else:
+            book.delete(name)
+        for phone in PHONES:
+            assert keys(book.find_by_phone(phone)) == scan_phone(book, phone)
+        for email in EMAILS:
+            assert keys(book.find_by_email(email)) == scan_email(book, email)
+
+
+def test_index_survives_pickle():
+    book = AddressBook()
+    book.add_record(Record.from_values("Ann", [PHONES[0]], None, None, [EMAILS[0]]))
+    copy = pickle.loads(pickle.dumps(book))
+    assert keys(copy.find_by_phone(PHONES[0])) == ["ann"]
+    assert keys(copy.find_by_email(EMAILS[0].upper())) == ["ann"]
+
+
+def test_unique_mode_rejects_shared_values(book):
+    book.add_record(Record.from_values("Ann", [PHONES[0]], None, None, [EMAILS[0]]))
+    book.add_record(Record("Bob"))
+    assert unique_mode(["on"], book) == "Unique phones/emails: on."
+    bob = book.find("bob")
+    with pytest.raises(ValueError, match="belongs to Ann"):
+        bob.add_phone(PHONES[0])
+    with pytest.raises(ValueError, match="belongs to Ann"):
+        bob.add_email(EMAILS[0])
+    with pytest.raises(ValueError):
+        book.add_record(Record.from_values("Eve", [PHONES[0]]))
+    ann = book.find("ann")
+    ann.add_phone(PHONES[1])
+    ann.edit_phone(PHONES[0], PHONES[2])  # власний номер не конфліктує
+    bob.add_phone(PHONES[0])              # номер звільнився
+    assert keys(book.find_by_phone(PHONES[0])) == ["bob"]
+
+
+def test_rejected_replacement_keeps_old_record(book):
+    book.add_record(Record.from_values("Ann", [PHONES[0]]))
+    book.add_record(Record.from_values("Bob", [PHONES[1]]))
+    book.set_unique(True)
+    with pytest.raises(ValueError, match="belongs to Bob"):
+        book["ann"] = Record.from_values("Ann", [PHONES[1]])
+    assert [p.value for p in book.find("ann").phones] == [PHONES[0]]
+    assert keys(book.find_by_phone(PHONES[0])) == ["ann"]
+    book["ann"] = Record.from_values("Ann", [PHONES[0], PHONES[2]])  # власний номер не конфліктує
+    assert keys(book.find_by_phone(PHONES[2])) == ["ann"]
+
+
+def test_owner_command(book):
+    book.add_record(Record.from_values("Ann", [PHONES[0]], None, None, [EMAILS[0]]))
+    book.add_record(Record.from_values("Bob", [PHONES[0]]))
+    assert owner_contact([PHONES[0]], book) == f"{PHONES[0]}: Ann, Bob"
+    assert owner_contact([EMAILS[0]], book) == f"{EMAILS[0]}: Ann"
+    assert owner_contact([PHONES[5]], book) == f"No contact with {PHONES[5]}."
+    assert unique_mode(["maybe"], book) == "Usage: unique [on|off]"
@@ -0,0 +1,114 @@
+import pytest
+
+from personal_assistant.main import (
+    PAGE_SIZE,
+    AddressBook,
+    NotesBook,
+    Record,
+    Stats,
+    all_contacts,
+    all_notes_func,
+    execute,
+    parse_input,
+)
+
+
+def lines(result):
+    return result.split("\n") if isinstance(result, str) else list(result)
+
+
+@pytest.fixture
+def book():
+    book = AddressBook()
+    for i in range(PAGE_SIZE * 2 + 5):
+        book.add_record(Record(f"user{i:03d}"))
+    return book
+
+
+@pytest.fixture
+def notes():
+    notes = NotesBook()
+    for i in range(PAGE_SIZE + 10):
+        notes.add_note(f"title {i}", f"text {i}")
+    return notes
+
+
+@pytest.fixture
+def stats(monkeypatch):
+    stats = Stats()
+    monkeypatch.setattr("personal_assistant.main.STATS", stats)
+    return stats
+
+
+def test_all_without_flags_lists_everything_sorted(book):
+    out = lines(all_contacts([], book))
+    assert len(out) == len(book)
+    assert out == sorted(out)
+
+
+def test_page_without_size_uses_default(book):
+    out = lines(all_contacts(["--page", "2"], book))
+    assert len(out) == PAGE_SIZE + 1
+    assert out[0].startswith(f"Contact name: user{PAGE_SIZE:03d}")
+    assert out[-1].startswith(f"-- Page 2 of 3 ({len(book)} total).")
+
+
+def test_notes_page_without_size(notes):
+    out = lines(all_notes_func(["--page", "2"], notes))
+    assert out[0].startswith(f"{PAGE_SIZE + 1}: ")
+    assert len(out) == 11
+
+
+def test_size_and_after_cursor(book):
+    out = lines(all_contacts(["--size", "3"], book))
+    assert len(out) == 4
+    assert "Next: all --after user002 --size 3" in out[-1]
+    out = lines(all_contacts(["--after", "user002", "--size", "3"], book))
+    assert out[0].startswith("Contact name: user003")
+
+
+def test_cursor_survives_insertions(book):
+    first = lines(all_contacts(["--size", "2"], book))
+    book.add_record(Record("aaa"))
+    after = lines(all_contacts(["--after", "user001", "--size", "2"], book))
+    assert first[1].startswith("Contact name: user001")
+    assert after[0].startswith("Contact name: user002")
+
+
+def test_bad_flags(book, notes):
+    assert all_contacts(["--page", "0"], book).startswith("Usage: all")
+    assert all_contacts(["--page"], book).startswith("Usage: all")
+    assert all_notes_func(["--after", "x"], notes).startswith("Usage: all-notes")
+    assert lines(all_contacts(["--page", "9"], book)) == ["Nothing to show on this page."]
+
+
+def test_stats_include_streaming_time(stats, book, notes):
+    result = execute("all", [], book, notes)
+    assert stats.ops["all"].calls == 0  # ще не спожито
+    assert len(list(result)) == len(book)
+    assert stats.ops["all"].calls == 1
+
+
+def test_error_while_streaming_becomes_message(stats, book, notes, monkeypatch):
+    def broken(after=None, offset=0):
+        yield book.data["user000"]
+        raise KeyError("gone")
+
+    monkeypatch.setattr(book, "sorted_records", broken)
+    out = list(execute("all", [], book, notes))
+    assert out[-1] == "Contact not found."
+    assert stats.ops["all"].errors == {"KeyError": 1}
+    assert stats.ops["all"].calls == 1
+
+
+def test_cursor_with_spaces_can_be_fed_back():
+    book, notes = AddressBook(), NotesBook()
+    for name in ("Anna", "Anna Bee", "Anna Bee 100%", "Ivan Petrenko", "Олена Коваль", "Zed"):
+        book.add_record(Record(name))
+    seen, command = [], "all --size 1"
+    while command:
+        out = lines(execute(*parse_input(command), book, notes))
+        seen.append(out[0])
+        command = out[-1].partition(" Next: ")[2]
+    assert seen == [str(r) for r in book.sorted_records()]
+    assert "Next: all --after anna%20bee --size 2" in lines(all_contacts(["--size", "2"], book))[-1]
@@ -0,0 +1,86 @@
+import random
+
+import pytest
+
+from personal_assistant import main
+from personal_assistant.main import NotesBook, load_notes, save_notes
+
+WORDS = ["milk", "bread", "trip", "work", "call", "gift"]
+
+
+def serial(notes, method, *args):
+    # той самий запит в одному процесі і без кешу
+    scan, notes._scan = notes._scan, None
+    try:
+        return getattr(NotesBook, method).__wrapped__(notes, *args)
+    finally:
+        notes._scan = scan
+
+
+def keys(results):
+    return [key for key, _ in results]
+
+
+@pytest.fixture
+def parallel(monkeypatch):
+    monkeypatch.setattr(main, "PARALLEL_MIN", 0)
+    books = []
+
+    def enable(notes, workers=3):
+        notes.enable_parallel(workers)
+        books.append(notes)
+        return notes
+
+    yield enable
+    for notes in books:
+        notes.close_parallel()
+
+
+def test_parallel_search_matches_serial(parallel):
+    rnd = random.Random(1)
+    notes = NotesBook()
+    for _ in range(120):
+        key = notes.add_note(rnd.choice(WORDS), " ".join(rnd.sample(WORDS, 3)))
+        for tag in rnd.sample(WORDS, rnd.randint(0, 2)):
+            notes.data[key].add_tag(tag)
+    parallel(notes)
+    for step in range(60):
+        key = rnd.choice(list(notes.data))
+        action = rnd.random()
+        if action < 0.3:
+            notes.edit_note(key, " ".join(rnd.sample(WORDS, 2)))
+        elif action < 0.5:
+            notes.data[key].add_tag(rnd.choice(WORDS))
+        elif action < 0.6:
+            notes.data[key].remove_tag(rnd.choice(WORDS))
+        elif action < 0.7:
+            notes.delete_note(key)
+        else:
+            notes.add_note(rnd.choice(WORDS), rnd.choice(WORDS))
+        query = rnd.choice(WORDS)[:rnd.randint(2, 4)]
+        assert keys(notes.search(query)) == keys(serial(notes, "search", query))
+        tags = rnd.sample(WORDS, 2)
+        assert keys(notes.search_by_tags(tags)) == keys(serial(notes, "search_by_tags", tags))
+
+
+def test_small_books_stay_in_process(parallel, monkeypatch):
+    notes = parallel(NotesBook())
+    notes.add_note("milk", "buy")
+    monkeypatch.setattr(main, "PARALLEL_MIN", 10)
+    assert not notes._parallel()
+    monkeypatch.setattr(main, "PARALLEL_MIN", 1)
+    assert notes._parallel()
+    notes.enable_parallel(1)
+    assert notes._scan is None
+
+
+def test_merge_resends_notes(parallel):
+    save_notes(load_notes("n.pkl"))
+    mine, other = load_notes("n.pkl"), load_notes("n.pkl")
+    parallel(mine)
+    mine.add_note("milk", "buy")
+    other.add_note("trip", "pack")
+    save_notes(other)
+    save_notes(mine)  # зливає чужу нотатку і розсилає книгу процесам заново
+    assert sorted(n.title for _, n in mine.search("trip")) == ["trip"]
+    assert sorted(n.title for _, n in mine.search("milk")) == ["milk"]
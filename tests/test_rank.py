@@ -0,0 +1,99 @@
+import math
+import pickle
+import random
+
+import pytest
+
+from personal_assistant.main import BM25_B, BM25_K1, FIELD_WEIGHTS, NotesBook, _words, search_notes
+
+WORDS = ["milk", "bread", "plan", "trip", "work", "call", "mom", "car", "fix", "gift"]
+
+
+def scan_scores(notes, query):
+    # BM25F, порахований заново по всіх нотатках
+    fields = {key: (_words(n.title), _words(" ".join(n.tags)), _words(n.content)) for key, n in notes.data.items()}
+    n = len(fields)
+    average = [sum(len(f[i]) for f in fields.values()) / n if n else 0 for i in range(3)]
+    scores = {}
+    for word in set(_words(query)):
+        docs = [key for key, f in fields.items() if any(word in part for part in f)]
+        if not docs:
+            continue
+        idf = math.log(1 + (n - len(docs) + 0.5) / (len(docs) + 0.5))
+        for key in docs:
+            weighted = 0.0
+            for weight, part, avg in zip(FIELD_WEIGHTS, fields[key], average):
+                tf = part.count(word)
+                if tf:
+                    weighted += weight * tf / (1 - BM25_B + BM25_B * len(part) / avg)
+            scores[key] = scores.get(key, 0.0) + idf * weighted / (BM25_K1 + weighted)
+    return scores
+
+
+def check_top(notes, query, k):
+    expected = scan_scores(notes, query)
+    found = notes.rank(query, k)
+    assert len(found) == min(k, len(expected))
+    got = [expected[key] for key, _ in found]
+    # спадний порядок і жодна пропущена нотатка не краща за останню показану
+    assert got == sorted(got, reverse=True)
+    best = sorted(expected.values(), reverse=True)[:k]
+    assert got == pytest.approx(best)
+
+
+def random_text(rnd, count):
+    return " ".join(rnd.choice(WORDS) for _ in range(count))
+
+
+@pytest.fixture
+def notes():
+    rnd = random.Random(5)
+    notes = NotesBook()
+    for _ in range(150):
+        key = notes.add_note(random_text(rnd, rnd.randint(1, 3)), random_text(rnd, rnd.randint(0, 12)))
+        for tag in rnd.sample(WORDS, rnd.randint(0, 2)):
+            notes.data[key].add_tag(tag)
+    return notes
+
+
+def test_rank_matches_scan_after_changes(notes):
+    rnd = random.Random(6)
+    for step in range(200):
+        key = rnd.choice(list(notes.data))
+        action = rnd.random()
+        if action < 0.3:
+            notes.edit_note(key, random_text(rnd, rnd.randint(0, 12)))
+        elif action < 0.45:
+            notes.data[key].add_tag(rnd.choice(WORDS))
+        elif action < 0.6:
+            notes.data[key].remove_tag(rnd.choice(WORDS))
+        elif action < 0.7:
+            notes.delete_note(key)
+        else:
+            notes.add_note(random_text(rnd, 2), random_text(rnd, 5))
+        check_top(notes, random_text(rnd, rnd.randint(1, 3)), rnd.choice([1, 3, 10]))
+
+
+def test_rank_survives_pickle(notes):
+    notes.rank("milk")
+    copy = pickle.loads(pickle.dumps(notes))
+    check_top(copy, "milk trip", 10)
+
+
+def test_title_beats_content_and_ties_keep_order():
+    notes = NotesBook()
+    notes.add_note("other", "trip")
+    notes.add_note("trip", "other")
+    notes.add_note("same", "words")
+    notes.add_note("same", "words")
+    assert [key for key, _ in notes.rank("trip")] == ["2", "1"]
+    assert [key for key, _ in notes.rank("same words")] == ["3", "4"]
+    assert notes.rank("absent") == []
+
+
+def test_search_notes_command(notes):
+    assert search_notes(["--top"], notes).startswith("Usage")
+    assert search_notes(["--rank"], notes).startswith("Usage")
+    lines = search_notes(["--top", "3", "milk"], notes).split("\n")
+    assert lines[0] == "Best matches:" and len(lines) == 4
+    assert search_notes(["--rank", "zzz"], notes) == "No results for: 'zzz'"
@@ -0,0 +1,109 @@
+import asyncio
+import os
+import threading
+import time
+
+import pytest
+
+from personal_assistant import main
+from personal_assistant.main import AddressBook, AssistantClient, AssistantServer, NotesBook, parse_address
+
+ADDRESS = "srv.sock"
+
+
+@pytest.fixture
+def server():
+    server = AssistantServer(AddressBook(), NotesBook())
+    loop = asyncio.new_event_loop()
+    task = loop.create_task(server.serve(ADDRESS))
+
+    def run():
+        try:
+            loop.run_until_complete(task)
+        except asyncio.CancelledError:
+            pass
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 5
+    while not os.path.exists(ADDRESS):
+        assert time.monotonic() < deadline, "server did not start"
+        time.sleep(0.01)
+    yield server
+    loop.call_soon_threadsafe(task.cancel)
+    thread.join(5)
+    loop.close()
+
+
+@pytest.fixture
+def connect(server):
+    clients = []
+
+    def connect():
+        client = AssistantClient(ADDRESS)
+        clients.append(client)
+        return client
+
+    yield connect
+    for client in clients:
+        client.close()
+
+
+def ask(client, line):
+    return list(client.send(line))
+
+
+def test_parse_address():
+    assert parse_address("8765") == ("127.0.0.1", 8765)
+    assert parse_address("0.0.0.0:9000") == ("0.0.0.0", 9000)
+    assert parse_address("/tmp/a") == (None, "/tmp/a")
+    assert parse_address("a.sock") == (None, "a.sock")
+    with pytest.raises(ValueError):
+        parse_address("host:port")
+
+
+def test_commands_share_one_book(server, connect):
+    first, second = connect(), connect()
+    assert ask(first, "add John 0501234567") == ["Contact added. Added phones: 0501234567"]
+    assert ask(second, "phone John") == ["John: 0501234567"]
+    assert ask(second, "add-note Plan buy milk") == ["Note 'Plan' added with id 1."]
+    assert ask(first, "show-note 1")[0].startswith("1: ")
+    assert server.book.find("john") is not None
+    assert len(server.notes) == 1
+
+
+def test_replies_end_per_command(connect):
+    client = connect()
+    for i in range(30):
+        ask(client, f"add user{i} 05000000{i:02d}")
+    lines = ask(client, "all")
+    assert len([line for line in lines if line.startswith("Contact name: user")]) >= 10
+    # наступна команда читає свою відповідь, а не хвіст попередньої
+    assert ask(client, "phone user7") == ["user7: 0500000007"]
+
+
+def test_dot_lines_round_trip(connect, monkeypatch):
+    monkeypatch.setattr(main, "execute", lambda command, args, book, notes: [".hidden", "..", "plain", ""])
+    assert ask(connect(), "anything") == [".hidden", "..", "plain", ""]
+
+
+def test_errors_are_replies(connect, monkeypatch):
+    def broken(command, args, book, notes):
+        raise RuntimeError("boom")
+
+    client = connect()
+    monkeypatch.setattr(main, "execute", broken)
+    assert ask(client, "hello") == ["Error: boom"]
+    monkeypatch.undo()
+    assert ask(client, "phone Nobody") != []
+
+
+def test_exit_closes_connection(server, connect):
+    client = connect()
+    assert ask(client, "exit") == ["Good bye!"]
+    with pytest.raises(ConnectionError):
+        ask(client, "hello")
+    deadline = time.monotonic() + 5
+    while server.clients:
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
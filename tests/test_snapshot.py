@@ -0,0 +1,139 @@
+import random
+
+import pytest
+
+from personal_assistant import main
+from personal_assistant.main import (
+    NOTE_ROW_V1, NOTES_MAGIC, SNAPSHOT_HEADER, MappedRows, Record, StringTable, convert_books, convert_snapshot,
+    load_data, load_notes, note_to_row, record_to_row, save_data, save_notes,
+)
+
+
+def rows(book):
+    return {key: record_to_row(record) for key, record in book.data.items()}
+
+
+def note_rows(notes):
+    return {key: note_to_row(note) for key, note in notes.data.items()}
+
+
+def fill_contacts(book, count=60):
+    rnd = random.Random(1)
+    for i in range(count):
+        record = Record(f"Name{i:03d} Тарас")
+        book.add_record(record)
+        for _ in range(rnd.randint(0, 2)):
+            record.add_phone(f"050{rnd.randrange(10 ** 7):07d}")
+        if rnd.random() < 0.5:
+            record.add_birthday(f"{rnd.randint(1, 28):02d}.{rnd.randint(1, 12):02d}.{rnd.randint(1950, 2010)}")
+        if rnd.random() < 0.5:
+            record.add_address(rnd.choice(["Kyiv", "Lviv", "Одеса"]))
+        if rnd.random() < 0.3:
+            record.add_email(f"n{i}@i.ua")
+    book.set_unique(True)
+    return book
+
+
+def fill_notes(notes, count=40):
+    for i in range(count):
+        key = notes.add_note(f"title {i}", f"text {i} нотатка")
+        if i % 3 == 0:
+            notes.data[key].add_tag("work")
+        if i % 5 == 0:
+            notes.data[key].add_tag("home")
+    notes.edit_note("2", "changed")
+    notes.delete_note("40")
+    return notes
+
+
+def test_contacts_round_trip():
+    book = fill_contacts(load_data("a.snap"))
+    save_data(book)
+    again = load_data("a.snap")
+    assert isinstance(again.data, MappedRows)
+    assert rows(again) == rows(book)
+    assert again.unique
+
+
+def test_contacts_are_read_on_demand():
+    save_data(fill_contacts(load_data("a.snap")))
+    book = load_data("a.snap")
+    assert len(book) == 60 and not book.data.loaded
+    assert book.find("name007 тарас").name.value == "Name007 Тарас"
+    assert list(book.data.loaded) == ["name007 тарас"]
+    assert "name100 тарас" not in book.data
+    assert book.find("name100 тарас") is None
+    # пошук будує індекси й декодує решту
+    assert len(book.search("тарас")) == 60
+
+
+def test_changes_after_load_are_saved():
+    save_data(fill_contacts(load_data("a.snap")))
+    book = load_data("a.snap")
+    book.find("name001 тарас").add_phone("0991234567")
+    book.delete("name002 тарас")
+    book.add_record(Record("Zed"))
+    expected = rows(book)
+    save_data(book)
+    assert rows(load_data("a.snap")) == expected
+
+
+def test_notes_round_trip():
+    notes = fill_notes(load_notes("n.snap"))
+    save_notes(notes)
+    again = load_notes("n.snap")
+    assert note_rows(again) == note_rows(notes)
+    assert again.next_id == notes.next_id == 41
+    assert again.data["3"].created == notes.data["3"].created
+    assert [k for k, _ in again.search_by_tags(["work"])] == [k for k, _ in notes.search_by_tags(["work"])]
+    assert again.add_note("new", "note") == "41"
+
+
+def test_format_1_notes_are_read(workdir):
+    # формат 1 не мав часу зміни нотатки
+    strings = StringTable()
+    body = bytearray()
+    for note_id, title in ((1, "first"), (3, "third")):
+        body += NOTE_ROW_V1.pack(note_id, 1700000000, *strings.add(title), *strings.add("text"), *strings.add("a\nb"))
+    header = SNAPSHOT_HEADER.pack(NOTES_MAGIC, 1, 0, 2, 5, 0, 4, SNAPSHOT_HEADER.size + len(body))
+    (workdir / "n.snap").write_bytes(header + bytes(body) + b"".join(strings.parts))
+    notes = load_notes("n.snap")
+    assert list(notes.data) == ["1", "3"]
+    note = notes.data["3"]
+    assert (note.title, note.content, note.tags) == ("third", "text", ("a", "b"))
+    assert note.modified == note.created == 1700000000
+    assert notes.next_id == 4 and notes.version == 5
+
+
+def test_unknown_files_are_rejected(workdir, monkeypatch):
+    (workdir / "bad.snap").write_bytes(b"not a snapshot at all" * 10)
+    with pytest.raises(ValueError, match="not a snapshot"):
+        load_data("bad.snap")
+    save_data(fill_contacts(load_data("a.snap")))
+    monkeypatch.setattr(main, "SNAPSHOT_FORMAT", 1)
+    with pytest.raises(ValueError, match="newer version"):
+        load_data("a.snap")
+
+
+def test_convert_both_ways_keeps_journal_valid():
+    book = load_data("a.pkl", "a.journal")
+    fill_contacts(book, 10)
+    book.journal.compact()
+    book.add_record(Record("Late"))  # лише в журналі
+    expected = rows(book)
+    book.journal.close()
+    convert_snapshot("a.pkl", "a.snap")
+    again = load_data("a.snap", "a.journal")
+    assert rows(again) == expected
+    again.journal.close()
+    convert_snapshot("a.snap", "b.pkl")
+    assert rows(load_data("b.pkl")) == rows(load_data("a.snap"))
+
+
+def test_convert_books(workdir, capsys):
+    save_data(fill_contacts(load_data("addressbook.pkl"), 5))
+    convert_books()
+    out = capsys.readouterr().out
+    assert "Converted 5 contacts to addressbook.snap." in out
+    assert "notes.pkl not found, skipped." in out
+    assert len(load_data("addressbook.snap")) == 5
@@ -0,0 +1,175 @@
+from datetime import date
+import random
+
+from personal_assistant.main import (
+    AddressBook,
+    NotesBook,
+    Record,
+    SqliteAddressBook,
+    SqliteNotesBook,
+    migrate_to_sqlite,
+    open_books,
+    note_to_row,
+    record_to_row,
+    save_data,
+    save_notes,
+)
+
+
+def rows(book):
+    return {key: record_to_row(book.data[key]) for key in book.data}
+
+
+def contact_ops(seed=5):
+    rnd = random.Random(seed)
+    ops = []
+    for i in range(150):
+        name = f"user{rnd.randrange(60)}"
+        value = {
+            0: f"050{rnd.randrange(10**7):07d}",
+            1: f"{rnd.randrange(1, 28):02d}.{rnd.randrange(1, 13):02d}.1990",
+            2: f"Kyiv, Sadova {i}",
+        }.get(i % 5)
+        ops.append((i % 5, name, value))
+    return ops
+
+
+def apply_contacts(book, ops):
+    for action, name, value in ops:
+        record = book.find(name)
+        if record is None:
+            book.add_record(Record(name))
+            record = book.find(name)
+        if action == 0 and len(record.phones) < 3:
+            record.add_phone(value)
+        elif action == 1 and record.birthday is None:
+            record.add_birthday(value)
+        elif action == 2 and record.address is None:
+            record.add_address(value)
+        elif action == 3:
+            book.delete(name)
+
+
+def test_sqlite_book_matches_memory_book():
+    memory, sql = AddressBook(), SqliteAddressBook("t.db")
+    for book in (memory, sql):
+        apply_contacts(book, contact_ops())
+    assert rows(sql) == rows(memory)
+    assert [r.name.value for r in sql.sorted_records()] == [r.name.value for r in memory.sorted_records()]
+    for query in ("user1", "kyiv", "sad", "050"):
+        assert [r.name.value for r in sql.search(query)] == [r.name.value for r in memory.search(query)]
+    start = date(2024, 12, 20)
+    assert sorted(sql._birthday_candidates(start, 30)) == sorted(memory._birthday_candidates(start, 30))
+    sql.close()
+    again = SqliteAddressBook("t.db")
+    assert rows(again) == rows(memory)
+    again.close()
+
+
+def test_sqlite_notes_match_memory_notes():
+    memory, sql = NotesBook(), SqliteNotesBook("t.db")
+    for book in (memory, sql):
+        for i in range(30):
+            key = book.add_note(f"title {i}", f"content number {i} about budget" if i % 3 else "other")
+            book.data[key].add_tag("work" if i % 2 else "home")
+        book.edit_note("4", "edited budget text")
+        book.delete_note("5")
+        book.data["6"].remove_tag("work")
+    for query in ("budget", "title 1", "ed"):
+        assert [k for k, _ in sql.search(query)] == [k for k, _ in memory.search(query)]
+    assert [k for k, _ in sql.search_by_tags(["work"])] == [k for k, _ in memory.search_by_tags(["work"])]
+    assert sql.next_id == memory.next_id
+    sql.close()
+    again = SqliteNotesBook("t.db")
+    assert {k: note_to_row(again.data[k]) for k in again.data} == {k: note_to_row(n) for k, n in memory.data.items()}
+    again.close()
+
+
+def test_records_are_loaded_lazily():
+    book = SqliteAddressBook("t.db")
+    book.add_record(Record("John"))
+    book.close()
+    book = SqliteAddressBook("t.db")
+    assert len(book.data.cache) == 0
+    record = book.find("john")
+    assert record.name.value == "John"
+    assert book.data.cache["john"] is record and book.find("john") is record
+    book.close()
+
+
+def test_migrate_pickles_to_sqlite():
+    book = AddressBook()
+    book.add_record(Record.from_values("Ann", ["0501234567"], 726000, "Lviv", ["a@i.ua"]))
+    save_data(book, "addressbook.pkl")
+    notes = NotesBook()
+    notes.add_note("Hello", "world")
+    save_notes(notes, "notes.pkl")
+    sql_book, sql_notes = migrate_to_sqlite("assistant.db")
+    assert rows(sql_book) == rows(book)
+    assert sql_notes.data["1"].title == "Hello" and sql_notes.next_id == 2
+    sql_book.close()
+    sql_notes.close()
+
+
+def names(records):
+    return [r.name.value for r in records]
+
+
+def fill_search(book):
+    apply_contacts(book, contact_ops())
+    ann = Record("Ann Marie Petrenko")
+    book.add_record(ann)
+    ann.add_phone("0671112233")
+    ann.add_email("ann@ukr.net")
+    ann.add_address("Lviv, Zelena 5")
+    ann.edit_phone("0671112233", "0931112299")
+    book.add_record(Record("Bob"))
+    book.delete("bob")
+
+
+SEARCHES = ("user1", "kyiv", "sad", "050", "ann", "petr", "ukr", "ann@", "1122", "112299", "093", "0671", "lviv 5", "zel")
+
+
+def test_sqlite_search_matches_memory_search():
+    memory, sql = AddressBook(), SqliteAddressBook("t.db")
+    for book in (memory, sql):
+        fill_search(book)
+    for query in SEARCHES:
+        assert names(sql.search(query)) == names(memory.search(query)), query
+    plan = " ".join(row[-1] for row in sql.db.execute(
+        "EXPLAIN QUERY PLAN SELECT key FROM contact_tokens WHERE token >= 'a' AND token < 'b'"))
+    assert "contact_tokens_token" in plan
+    sql.close()
+
+
+def test_tokens_are_filled_for_an_old_database():
+    memory, sql = AddressBook(), SqliteAddressBook("t.db")
+    for book in (memory, sql):
+        fill_search(book)
+    sql.db.execute("DROP TABLE contact_tokens")
+    sql.close()
+    again = SqliteAddressBook("t.db")
+    for query in SEARCHES:
+        # записи читаються з бази пачками
+        assert [record_to_row(r) for r in again.search(query)] == [record_to_row(r) for r in memory.search(query)]
+    again.close()
+
+
+def test_new_database_is_migrated_from_snapshots(capsys):
+    book = AddressBook()
+    book.add_record(Record("Ann"))
+    save_data(book, "addressbook.snap")  # уже перетворено на .snap
+    notes = NotesBook()
+    notes.add_note("Hello", "world")
+    save_notes(notes, "notes.pkl")
+    sql_book, sql_notes = open_books("assistant.db")
+    assert "Migrated 1 contacts and 1 notes to assistant.db." in capsys.readouterr().out
+    assert names(sql_book.data.values()) == ["Ann"] and sql_notes.data["1"].title == "Hello"
+    sql_book.add_record(Record("Bob"))
+    sql_book.close()
+    sql_notes.close()
+    sql_book, sql_notes = open_books("assistant.db")  # існуюча база не перезаписується
+    assert capsys.readouterr().out == ""
+    assert sorted(names(sql_book.data.values())) == ["Ann", "Bob"]
+    sql_book.close()
+    sql_notes.close()
@@ -0,0 +1,45 @@
+import json
+import os
+
+import pytest
+
+from personal_assistant.main import AddressBook, NotesBook, OpStats, Stats, execute, main, show_stats
+
+
+@pytest.fixture
+def stats(monkeypatch):
+    stats = Stats()
+    monkeypatch.setattr("personal_assistant.main.STATS", stats)
+    return stats
+
+
+def test_no_stats_file_by_default(stats, capsys):
+    main(["-c", "add-note todo buy milk"])
+    assert not os.path.exists("stats.json")
+    assert os.listdir(".") and all(not name.endswith(".json") for name in os.listdir("."))
+
+
+def test_stats_file_on_request(stats, capsys):
+    main(["--stats", "s.json", "-c", "add John"])
+    with open("s.json", encoding="utf-8") as f:
+        report = json.load(f)
+    assert report["ops"]["add"]["calls"] == 1
+    assert "load_data" in report["ops"]
+
+
+def test_errors_are_counted_even_when_handled(stats):
+    book, notes = AddressBook(), NotesBook()
+    assert execute("phone", ["nobody"], book, notes) == "Contact not found."
+    execute("add", ["Ann"], book, notes)
+    op = stats.ops["phone"]
+    assert op.calls == 1 and op.errors == {"KeyError": 1}
+    text = show_stats([], book, notes)
+    assert "phone" in text and "errors: KeyError=1" in text
+
+
+def test_percentiles_are_bounded_by_max():
+    op = OpStats()
+    for ms in (1, 2, 3, 4, 100):
+        op.add(ms / 1000)
+    assert op.percentile(50) <= op.percentile(95) <= op.max * 1000
+    assert op.to_dict()["calls"] == 5
@@ -0,0 +1,70 @@
+import pickle
+import random
+
+import pytest
+
+from personal_assistant.main import NotesBook, filter_notes_by_tag, find_by_tag
+
+TAGS = ["a", "b", "c", "d", "e"]
+
+
+def scan_any(notes, tags):
+    # старий пошук: за кількістю збігів тегів
+    tags = {t.strip().lower() for t in tags}
+    found = []
+    for key, note in notes.data.items():
+        count = len(set(note.tags) & tags)
+        if count:
+            found.append((count, key, note))
+    found.sort(reverse=True)
+    return [(key, note) for _, key, note in found]
+
+
+def scan_filter(notes, required, optional, excluded):
+    return sorted(
+        key for key, note in notes.data.items()
+        if all(t in note.tags for t in required)
+        and (not optional or any(t in note.tags for t in optional))
+        and not any(t in note.tags for t in excluded)
+    )
+
+
+@pytest.fixture
+def notes():
+    rnd = random.Random(2)
+    notes = NotesBook()
+    notes._cache.maxsize = 0
+    for _ in range(200):
+        key = notes.add_note("t", "c")
+        for tag in rnd.sample(TAGS, rnd.randint(0, 3)):
+            notes.data[key].add_tag(tag)
+    return notes
+
+
+def test_tag_queries_match_scan_after_changes(notes):
+    rnd = random.Random(3)
+    for _ in range(400):
+        key = rnd.choice(list(notes.data))
+        action = rnd.random()
+        if action < 0.3:
+            notes.data[key].add_tag(rnd.choice(TAGS))
+        elif action < 0.6:
+            notes.data[key].remove_tag(rnd.choice(TAGS))
+        elif action < 0.7:
+            notes.delete_note(key)
+        query = rnd.sample(TAGS, 2)
+        assert notes.search_by_tags(query) == scan_any(notes, query)
+        found = sorted(k for k, _ in notes.filter_by_tags(["a", "+b", "-c"]))
+        assert found == scan_filter(notes, ["b"], ["a"], ["c"])
+
+
+def test_index_survives_pickle(notes):
+    copy = pickle.loads(pickle.dumps(notes))
+    assert sorted(k for k, _ in copy.filter_by_tags(["+a", "-b"])) == scan_filter(copy, ["a"], [], ["b"])
+
+
+def test_tag_commands(notes):
+    assert find_by_tag(["zzz"], notes) == "No notes found with this tag."
+    assert filter_notes_by_tag(["+zzz"], notes) == "No notes match: +zzz"
+    assert filter_notes_by_tag(["+a", "-b"], notes).startswith("Found by tags:")
+    assert filter_notes_by_tag([], notes).startswith("Usage")